@@ -0,0 +1,85 @@
+"""Memory benchmark for contact sets.
+
+Compares the compact contact set with the previous approach of loading
+contacts as model instances grouped by standing in sets.
+
+Run from the repository root with:
+
+    python benchmarks/contact_set_memory.py
+"""
+
+import os
+import pickle
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testauth.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from standingssync.core.contact_set import ContactSet  # noqa: E402
+from standingssync.models import EveContact  # noqa: E402
+
+CONTACTS_COUNTS = [1_000, 10_000, 50_000]
+
+
+def make_rows(count: int) -> list:
+    standings = [-10.0, -5.0, 0.0, 5.0, 10.0]
+    contact_ids = random.sample(range(90_000_000, 98_000_000), count)
+    return [
+        (contact_id, random.choice(standings), random.random() < 0.01)
+        for contact_id in contact_ids
+    ]
+
+
+def legacy_grouped_by_standing(rows: list) -> dict:
+    """Same structure as EveContactQuerySet.grouped_by_standing()
+    without the database round trip.
+    """
+    contacts_by_standing = dict()
+    for pk, (contact_id, standing, is_war_target) in enumerate(rows, start=1):
+        contact = EveContact(
+            id=pk,
+            manager_id=1,
+            eve_entity_id=contact_id,
+            standing=standing,
+            is_war_target=is_war_target,
+        )
+        if contact.standing not in contacts_by_standing:
+            contacts_by_standing[contact.standing] = set()
+        contacts_by_standing[contact.standing].add(contact)
+    return contacts_by_standing
+
+
+def measure(func, rows: list):
+    tracemalloc.start()
+    try:
+        result = func(rows)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def main():
+    random.seed(42)
+    print(f"{'contacts':>8} {'model objects':>14} {'contact set':>12} {'blob':>10}")
+    for count in CONTACTS_COUNTS:
+        rows = make_rows(count)
+        legacy, legacy_size = measure(legacy_grouped_by_standing, rows)
+        contact_set, contact_set_size = measure(ContactSet.from_contacts, rows)
+        blob_size = len(pickle.dumps(contact_set))
+        print(
+            f"{count:>8,} {legacy_size / 1024:>11,.0f} KB "
+            f"{contact_set_size / 1024:>9,.0f} KB {blob_size / 1024:>7,.0f} KB"
+        )
+        del legacy
+
+
+if __name__ == "__main__":
+    main()
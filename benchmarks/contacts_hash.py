@@ -0,0 +1,68 @@
+"""Microbenchmark for hashing contacts.
+
+Compares the canonical contacts hasher with the previous approach of hashing
+the JSON dump of the ESI contacts.
+
+Run from the repository root with:
+
+    python benchmarks/contacts_hash.py
+"""
+
+import hashlib
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from standingssync.core.contacts_hash import ContactsHasher  # noqa: E402
+
+CONTACTS_COUNT = 10_000
+REPEAT = 5
+NUMBER = 10
+
+
+def make_contacts(count: int) -> dict:
+    standings = [-10.0, -5.0, 0.0, 5.0, 10.0]
+    contact_ids = random.sample(range(90_000_000, 98_000_000), count)
+    return {
+        contact_id: {
+            "contact_id": contact_id,
+            "contact_type": "character",
+            "standing": random.choice(standings),
+        }
+        for contact_id in contact_ids
+    }
+
+
+def legacy_hash(contacts: dict) -> str:
+    return hashlib.md5(json.dumps(contacts).encode("utf-8")).hexdigest()
+
+
+def measure(name: str, func) -> None:
+    timings = timeit.repeat(func, repeat=REPEAT, number=NUMBER)
+    best = min(timings) / NUMBER * 1000
+    print(f"{name:<30} {best:8.2f} ms")
+
+
+def main():
+    random.seed(42)
+    contacts = make_contacts(CONTACTS_COUNT)
+    war_target_ids = set(random.sample(list(contacts.keys()), 100))
+    print(f"Hashing {CONTACTS_COUNT:,} contacts (best of {REPEAT}):")
+    measure("legacy md5 over JSON", lambda: legacy_hash(contacts))
+    measure(
+        "version hash",
+        lambda: ContactsHasher.from_esi_contacts(
+            contacts, war_target_ids
+        ).version_hash(),
+    )
+    hasher = ContactsHasher.from_esi_contacts(contacts, war_target_ids)
+    measure("contact fingerprints", hasher.contact_fingerprints)
+    measure("bucket fingerprints", hasher.bucket_fingerprints)
+
+
+if __name__ == "__main__":
+    main()
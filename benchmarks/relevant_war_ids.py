@@ -0,0 +1,111 @@
+"""Benchmark for determining relevant war IDs with a large war history.
+
+Compares loading all finished war IDs into memory with querying
+only the candidate wars in chunks.
+
+Creates a temporary test database and fills it with 700K wars.
+Run from the repository root with:
+
+    python benchmarks/relevant_war_ids.py
+"""
+
+import datetime as dt
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testauth.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.utils.timezone import now  # noqa: E402
+
+from standingssync.models import EveEntity, EveWar  # noqa: E402
+
+WARS_COUNT = 700_000
+CANDIDATES_COUNT = 3_000
+UNFINISHED_RATIO = 0.01
+
+
+def create_wars():
+    aggressor = EveEntity.objects.create(id=99000001, category="alliance")
+    defender = EveEntity.objects.create(id=99000002, category="alliance")
+    declared = now() - dt.timedelta(days=365)
+    finished = now() - dt.timedelta(days=1)
+    batch = []
+    for war_id in range(1, WARS_COUNT + 1):
+        batch.append(
+            EveWar(
+                id=war_id,
+                aggressor=aggressor,
+                defender=defender,
+                declared=declared,
+                started=declared,
+                finished=None if random.random() < UNFINISHED_RATIO else finished,
+                is_mutual=False,
+                is_open_for_allies=False,
+            )
+        )
+        if len(batch) >= 10_000:
+            EveWar.objects.bulk_create(batch)
+            batch = []
+    EveWar.objects.bulk_create(batch)
+
+
+def legacy_relevant_war_ids(war_ids: set) -> set:
+    finished_war_ids = set(EveWar.objects.finished_wars().values_list("id", flat=True))
+    return war_ids.difference(finished_war_ids)
+
+
+def chunked_relevant_war_ids(war_ids: set) -> set:
+    current = now()
+    return war_ids.difference(
+        EveWar.objects._filter_war_ids(
+            war_ids, Q(finished__lte=current) | Q(next_check_at__gt=current)
+        )
+    )
+
+
+def measure(func, war_ids: set):
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func(war_ids)
+        duration = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, duration, peak
+
+
+def main():
+    random.seed(42)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"Creating {WARS_COUNT:,} wars...")
+        create_wars()
+        war_ids = set(range(WARS_COUNT - CANDIDATES_COUNT + 1, WARS_COUNT + 1))
+        print(f"{'method':>8} {'duration':>10} {'peak memory':>12}")
+        results = []
+        for name, func in [
+            ("legacy", legacy_relevant_war_ids),
+            ("chunked", chunked_relevant_war_ids),
+        ]:
+            result, duration, peak = measure(func, war_ids)
+            results.append(result)
+            print(f"{name:>8} {duration * 1000:>7,.0f} ms {peak / 1024:>9,.0f} KB")
+        assert results[0] == results[1]
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
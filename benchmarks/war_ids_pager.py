@@ -0,0 +1,66 @@
+"""Benchmark for paging the ESI wars list.
+
+Compares fetching pages one after the other with the speculative parallel pager
+against a local stand-in, which serves synthetic war IDs with a simulated latency.
+
+Run from the repository root with:
+
+    python benchmarks/war_ids_pager.py
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testauth.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from standingssync.core.war_pager import SpeculativeWarPager  # noqa: E402
+
+PAGE_SIZE = 2000
+LATENCY = 0.05  # seconds per request
+MIN_WAR_ID = 700_000
+MAX_WAR_ID = 760_000
+
+
+class WarsListStandIn:
+    def __init__(self, war_ids) -> None:
+        self.war_ids = sorted(war_ids, reverse=True)
+
+    def __call__(self, max_war_id=None) -> list:
+        time.sleep(LATENCY)
+        if max_war_id:
+            war_ids = [obj for obj in self.war_ids if obj < max_war_id]
+        else:
+            war_ids = self.war_ids
+        return war_ids[:PAGE_SIZE]
+
+
+def main():
+    random.seed(42)
+    war_ids = [
+        obj for obj in range(MIN_WAR_ID - 50_000, MAX_WAR_ID) if random.random() < 0.9
+    ]
+    stand_in = WarsListStandIn(war_ids)
+    expected = {obj for obj in war_ids if obj >= MIN_WAR_ID}
+    print(f"{'workers':>7} {'requests':>8} {'rounds':>6} {'duration':>9}")
+    for max_workers in [1, 2, 4, 8]:
+        pager = SpeculativeWarPager(stand_in, PAGE_SIZE, max_workers=max_workers)
+        started = time.perf_counter()
+        result = pager.fetch(stand_in(), MIN_WAR_ID)
+        duration = time.perf_counter() - started
+        assert {obj for obj in result if obj >= MIN_WAR_ID} == expected
+        print(
+            f"{max_workers:>7} {pager.requests_count + 1:>8} "
+            f"{pager.rounds_count + 1:>6} {duration:>7.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
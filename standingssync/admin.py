@@ -171,6 +171,7 @@ class SyncManagerAdmin(admin.ModelAdmin):
         "version_hash",
         "_sync_ok",
         "last_sync",
+        "next_sync_at",
         "last_error",
     )
     list_display_links = None
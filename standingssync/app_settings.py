@@ -18,43 +18,101 @@ STANDINGSSYNC_WAR_TARGETS_LABEL_NAME = clean_setting(
 # When enabled will replace contacts of synced characters with alliance contacts
 STANDINGSSYNC_REPLACE_CONTACTS = clean_setting("STANDINGSSYNC_REPLACE_CONTACTS", True)
 
-# Smallest war ID to fetch from ESI. All wars with smaller IDs are known to be already finished. This is an optimization to avoid having to fetch >700K wars from ESI.
+# Max number of parallel ESI calls when writing contacts for one character
+STANDINGSSYNC_ESI_CHARACTER_MAX_WORKERS = clean_setting(
+    "STANDINGSSYNC_ESI_CHARACTER_MAX_WORKERS", 4
+)
+
+# Max number of parallel ESI calls when writing contacts
+# for all characters within one worker process
+STANDINGSSYNC_ESI_MAX_WORKERS = clean_setting("STANDINGSSYNC_ESI_MAX_WORKERS", 10)
+
+# Where the state of the ESI error limit is kept.
+# "cache": Django cache, which is shared across all processes
+# "memory": memory of each process
+STANDINGSSYNC_ESI_ERROR_LIMIT_BACKEND = clean_setting(
+    "STANDINGSSYNC_ESI_ERROR_LIMIT_BACKEND",
+    "cache",
+    choices=["cache", "memory"],
+)
+
+# ESI calls are paused until the error limit window resets,
+# when the remaining ESI error budget is at or below this value
+STANDINGSSYNC_ESI_ERROR_LIMIT_PAUSE_THRESHOLD = clean_setting(
+    "STANDINGSSYNC_ESI_ERROR_LIMIT_PAUSE_THRESHOLD", 20
+)
+
+# ESI calls are slowed down,
+# when the remaining ESI error budget is at or below this value
+STANDINGSSYNC_ESI_ERROR_LIMIT_THROTTLE_THRESHOLD = clean_setting(
+    "STANDINGSSYNC_ESI_ERROR_LIMIT_THROTTLE_THRESHOLD", 50
+)
+
+# Max seconds an ESI call is paused due to the ESI error limit
+STANDINGSSYNC_ESI_ERROR_LIMIT_MAX_PAUSE = clean_setting(
+    "STANDINGSSYNC_ESI_ERROR_LIMIT_MAX_PAUSE", 65
+)
+
+# Number of wars updated from ESI by each task.
+# Set to 0 to update each war with it's own task.
+STANDINGSSYNC_WARS_UPDATE_BATCH_SIZE = clean_setting(
+    "STANDINGSSYNC_WARS_UPDATE_BATCH_SIZE", 100
+)
+
+# Max number of parallel ESI calls when updating a batch of wars
+STANDINGSSYNC_WARS_UPDATE_MAX_WORKERS = clean_setting(
+    "STANDINGSSYNC_WARS_UPDATE_MAX_WORKERS", 5
+)
+
+# Smallest war ID to fetch from ESI.
+# All wars with smaller IDs are known to be already finished.
+# Optional override, since the app maintains this value automatically.
 STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID = clean_setting(
-    "STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID", 719979
+    "STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID", None, required_type=int
 )
 
-# IDs of unfinished wars, with IDs below the above minimum threshold
+# IDs of unfinished wars, with IDs below the above minimum threshold.
+# Optional override, since the app maintains these IDs automatically.
 STANDINGSSYNC_SPECIAL_WAR_IDS = clean_setting(
-    "STANDINGSSYNC_SPECIAL_WAR_IDS",
-    [
-        693125,
-        716071,
-        716072,
-        716073,
-        716864,
-        717695,
-        718307,
-        718387,
-        718575,
-        718576,
-        718619,
-        718637,
-        718638,
-        718639,
-        718640,
-        718941,
-        719186,
-        719187,
-        719188,
-        719189,
-        719226,
-        719331,
-        719336,
-        719337,
-        719423,
-        719745,
-        719751,
-        719854,
-        719890,
-    ],
+    "STANDINGSSYNC_SPECIAL_WAR_IDS", None, required_type=list
+)
+
+# Seconds until the lock of a running manager or character sync expires.
+# Should be longer than the longest sync takes.
+STANDINGSSYNC_SYNC_TASK_LOCK_TIMEOUT = clean_setting(
+    "STANDINGSSYNC_SYNC_TASK_LOCK_TIMEOUT", 1800
+)
+
+# Number of characters synced by each task.
+# Set to 0 to sync each character with it's own task.
+STANDINGSSYNC_CHARACTER_SYNC_BATCH_SIZE = clean_setting(
+    "STANDINGSSYNC_CHARACTER_SYNC_BATCH_SIZE", 50
+)
+
+# Max number of characters synced in parallel by each task
+STANDINGSSYNC_CHARACTER_SYNC_MAX_WORKERS = clean_setting(
+    "STANDINGSSYNC_CHARACTER_SYNC_MAX_WORKERS", 4
+)
+
+# When enabled ESI requests for contacts, labels and wars are sent with the ETag
+# of the last response and unchanged responses are not processed again
+STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS = clean_setting(
+    "STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS", True
+)
+
+# Seconds ETags of ESI responses are kept in the cache
+STANDINGSSYNC_ESI_ETAGS_TIMEOUT = clean_setting(
+    "STANDINGSSYNC_ESI_ETAGS_TIMEOUT", 3600 * 24
+)
+
+# Max number of parallel ESI calls when fetching pages of war IDs.
+# Set to 1 to fetch pages one after the other.
+STANDINGSSYNC_WAR_IDS_FETCH_MAX_WORKERS = clean_setting(
+    "STANDINGSSYNC_WAR_IDS_FETCH_MAX_WORKERS", 4, min_value=1
+)
+
+# Seconds between full syncs of war IDs from ESI.
+# In between only war IDs newer than the last seen war ID are fetched.
+STANDINGSSYNC_WAR_IDS_FULL_SYNC_INTERVAL = clean_setting(
+    "STANDINGSSYNC_WAR_IDS_FULL_SYNC_INTERVAL", 3600 * 24
 )
@@ -0,0 +1,189 @@
+"""Compact set of contacts for the sync hot path."""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Binary format: header followed by IDs, standings and war target flags
+# as little endian arrays in the same order
+_HEADER = struct.Struct("<4sBI")
+_MAGIC = b"SSCS"
+_FORMAT_VERSION = 1
+
+
+class ContactSet(Mapping):
+    """Immutable set of contacts with their standings and war target flags.
+
+    Contacts are stored in parallel typed arrays sorted by ID,
+    which needs much less memory than model instances or dicts
+    and allows membership tests with a binary search.
+
+    It is a mapping of contact IDs to standings.
+    """
+
+    __slots__ = ("_ids", "_standings", "_war_target_flags")
+
+    def __init__(
+        self,
+        ids: array = None,
+        standings: array = None,
+        war_target_flags: array = None,
+    ) -> None:
+        self._ids = ids if ids is not None else array("q")
+        self._standings = standings if standings is not None else array("d")
+        self._war_target_flags = (
+            war_target_flags if war_target_flags is not None else array("B")
+        )
+        if not len(self._ids) == len(self._standings) == len(self._war_target_flags):
+            raise ValueError("Arrays must have the same length")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(<{len(self)} contacts>)"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __contains__(self, contact_id) -> bool:
+        return self._index(contact_id) is not None
+
+    def __getitem__(self, contact_id: int) -> float:
+        index = self._index(contact_id)
+        if index is None:
+            raise KeyError(contact_id)
+        return self._standings[index]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ContactSet):
+            return super().__eq__(other)
+        return (
+            self._ids == other._ids
+            and self._standings == other._standings
+            and self._war_target_flags == other._war_target_flags
+        )
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(),)
+
+    def is_war_target(self, contact_id: int) -> bool:
+        """Return True if the contact is a war target, else False."""
+        index = self._index(contact_id)
+        if index is None:
+            raise KeyError(contact_id)
+        return bool(self._war_target_flags[index])
+
+    def contacts(self) -> Iterator[Tuple[int, float, bool]]:
+        """Iterate over all contacts as tuples of ID, standing and war target flag."""
+        for contact_id, standing, flag in zip(
+            self._ids, self._standings, self._war_target_flags
+        ):
+            yield contact_id, standing, bool(flag)
+
+    def war_targets(self) -> Iterator[Tuple[int, float]]:
+        """Iterate over all war targets as tuples of ID and standing."""
+        for contact_id, standing, flag in zip(
+            self._ids, self._standings, self._war_target_flags
+        ):
+            if flag:
+                yield contact_id, standing
+
+    def difference(self, other: Iterable[int]) -> "ContactSet":
+        """Return new set with all contacts, which IDs are not in other."""
+        if isinstance(other, ContactSet):
+            indexes = self._indexes_not_in_sorted(other._ids)
+        else:
+            excluded = set(other)
+            indexes = [
+                index
+                for index, contact_id in enumerate(self._ids)
+                if contact_id not in excluded
+            ]
+        return self._subset(indexes)
+
+    def grouped_by_standing(self) -> Dict[float, array]:
+        """Return contact IDs grouped by standing, in ascending order per group."""
+        result = dict()
+        for contact_id, standing in zip(self._ids, self._standings):
+            try:
+                result[standing].append(contact_id)
+            except KeyError:
+                result[standing] = array("q", [contact_id])
+        return result
+
+    def to_bytes(self) -> bytes:
+        """Serialize this set into a compact binary blob."""
+        parts = [_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(self))]
+        for values in (self._ids, self._standings, self._war_target_flags):
+            if sys.byteorder != "little":
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ContactSet":
+        """Create new set from a binary blob created with to_bytes()."""
+        try:
+            magic, version, count = _HEADER.unpack_from(data)
+        except struct.error as ex:
+            raise ValueError("Invalid contact set data") from ex
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError("Invalid contact set data")
+        arrays = []
+        offset = _HEADER.size
+        for typecode in ("q", "d", "B"):
+            values = array(typecode)
+            size = values.itemsize * count
+            values.frombytes(data[offset : offset + size])
+            if len(values) != count:
+                raise ValueError("Invalid contact set data")
+            if sys.byteorder != "little":
+                values.byteswap()
+            arrays.append(values)
+            offset += size
+        return cls(*arrays)
+
+    @classmethod
+    def from_contacts(cls, contacts: Iterable[Tuple[int, float, bool]]) -> "ContactSet":
+        """Create new set from tuples of ID, standing and war target flag.
+
+        When an ID occurs more than once the last contact wins.
+        """
+        contacts_by_id = {
+            int(contact_id): (float(standing), bool(is_war_target))
+            for contact_id, standing, is_war_target in contacts
+        }
+        ids = array("q", sorted(contacts_by_id.keys()))
+        standings = array("d", (contacts_by_id[contact_id][0] for contact_id in ids))
+        flags = array("B", (contacts_by_id[contact_id][1] for contact_id in ids))
+        return cls(ids, standings, flags)
+
+    def _index(self, contact_id) -> Optional[int]:
+        """Return index of a contact ID or None if not found."""
+        index = bisect_left(self._ids, contact_id)
+        if index < len(self._ids) and self._ids[index] == contact_id:
+            return index
+        return None
+
+    def _indexes_not_in_sorted(self, other_ids: array) -> List[int]:
+        """Return indexes of all IDs, which are not in the sorted other IDs."""
+        indexes = []
+        other_index, other_count = 0, len(other_ids)
+        for index, contact_id in enumerate(self._ids):
+            while other_index < other_count and other_ids[other_index] < contact_id:
+                other_index += 1
+            if other_index >= other_count or other_ids[other_index] != contact_id:
+                indexes.append(index)
+        return indexes
+
+    def _subset(self, indexes: List[int]) -> "ContactSet":
+        return type(self)(
+            array("q", (self._ids[index] for index in indexes)),
+            array("d", (self._standings[index] for index in indexes)),
+            array("B", (self._war_target_flags[index] for index in indexes)),
+        )
@@ -0,0 +1,76 @@
+"""Canonical hashing of contacts."""
+
+import hashlib
+import struct
+from collections import defaultdict
+from typing import Dict, Iterable, Mapping, Tuple
+
+DIGEST_SIZE = 16  # 32 hex chars, which fits into version_hash fields
+FINGERPRINT_SIZE = 8
+
+_RECORD = struct.Struct("<qd?")
+
+
+class ContactsHasher:
+    """Canonical, order independent hashing of contacts.
+
+    Only the contact ID, the standing and the war target flag are hashed.
+    The order in which contacts were added or returned from ESI does not matter.
+
+    Args:
+    - contacts: Standing and war target flag of contacts mapped by contact ID
+    """
+
+    def __init__(self, contacts: Mapping[int, Tuple[float, bool]]) -> None:
+        self._records = dict()
+        self._standings = dict()
+        pack = _RECORD.pack
+        for contact_id, (standing, is_war_target) in contacts.items():
+            contact_id = int(contact_id)
+            standing = float(standing) + 0.0  # also turns -0.0 into 0.0
+            self._records[contact_id] = pack(contact_id, standing, bool(is_war_target))
+            self._standings[contact_id] = standing
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def version_hash(self) -> str:
+        """Return hash over all contacts."""
+        return self._digest(self._records[key] for key in sorted(self._records))
+
+    def contact_fingerprints(self) -> Dict[int, str]:
+        """Return fingerprints for each contact mapped by contact ID."""
+        return {
+            contact_id: hashlib.blake2b(
+                record, digest_size=FINGERPRINT_SIZE
+            ).hexdigest()
+            for contact_id, record in self._records.items()
+        }
+
+    def bucket_fingerprints(self) -> Dict[float, str]:
+        """Return fingerprints for all contacts with the same standing
+        mapped by standing.
+        """
+        buckets = defaultdict(list)
+        for contact_id in sorted(self._records):
+            buckets[self._standings[contact_id]].append(self._records[contact_id])
+        return {
+            standing: self._digest(records) for standing, records in buckets.items()
+        }
+
+    @classmethod
+    def from_esi_contacts(
+        cls, contacts: Mapping[int, dict], war_target_ids: Iterable[int] = None
+    ) -> "ContactsHasher":
+        """Create new object from ESI contacts mapped by contact ID."""
+        war_target_ids = set(war_target_ids) if war_target_ids else set()
+        return cls(
+            {
+                contact_id: (contact["standing"], contact_id in war_target_ids)
+                for contact_id, contact in contacts.items()
+            }
+        )
+
+    @staticmethod
+    def _digest(records: Iterable[bytes]) -> str:
+        return hashlib.blake2b(b"".join(records), digest_size=DIGEST_SIZE).hexdigest()
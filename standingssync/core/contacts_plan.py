@@ -0,0 +1,133 @@
+"""Reconciliation of character contacts with the contacts of a sync manager."""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from app_utils.helpers import chunks
+
+MAX_ITEMS_DELETE = 20
+MAX_ITEMS_WRITE = 100
+
+
+@dataclass(frozen=True)
+class ContactState:
+    """Standing and labels of a contact."""
+
+    standing: float
+    label_ids: FrozenSet[int] = frozenset()
+
+    def __post_init__(self):
+        object.__setattr__(self, "standing", float(self.standing))
+        object.__setattr__(self, "label_ids", frozenset(self.label_ids or []))
+
+    @classmethod
+    def from_esi_dict(cls, contact: dict) -> "ContactState":
+        """Create new object from an ESI contact."""
+        return cls(
+            standing=contact["standing"], label_ids=contact.get("label_ids") or []
+        )
+
+
+@dataclass(frozen=True)
+class ContactsPlan:
+    """Minimal set of ESI operations for turning the current contacts
+    of a character into the desired contacts.
+
+    Contacts are grouped by their target state,
+    since ESI can only write one standing and one set of labels per request.
+    """
+
+    to_delete: FrozenSet[int] = frozenset()
+    to_update: Dict[ContactState, FrozenSet[int]] = field(default_factory=dict)
+    to_add: Dict[ContactState, FrozenSet[int]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.to_delete or self.to_update or self.to_add)
+
+    @property
+    def ids_to_update(self) -> FrozenSet[int]:
+        return self._flatten(self.to_update)
+
+    @property
+    def ids_to_add(self) -> FrozenSet[int]:
+        return self._flatten(self.to_add)
+
+    @property
+    def ids_to_replace(self) -> FrozenSet[int]:
+        """IDs of contacts, which need to be deleted before they can be re-added."""
+        return self.to_delete & self.ids_to_add
+
+    def esi_calls_count(self) -> int:
+        """Return number of ESI calls needed to execute this plan."""
+        count = len(list(chunks(list(self.to_delete), MAX_ITEMS_DELETE)))
+        for contacts in (self.to_update, self.to_add):
+            for contact_ids in contacts.values():
+                count += len(list(chunks(list(contact_ids), MAX_ITEMS_WRITE)))
+        return count
+
+    @classmethod
+    def create(
+        cls,
+        current: Dict[int, ContactState],
+        desired: Dict[int, ContactState],
+    ) -> "ContactsPlan":
+        """Create a new plan from current and desired contacts.
+
+        Contacts, which exist in both and differ in standing or by additional labels
+        are updated in place. Contacts which would loose labels are deleted
+        and re-added, because ESI can not remove labels from existing contacts.
+
+        Args:
+        - current: Current contacts of a character mapped by contact ID
+        - desired: Desired contacts of a character mapped by contact ID
+        """
+        to_delete = set(current.keys()) - set(desired.keys())
+        to_update = defaultdict(set)
+        to_add = defaultdict(set)
+        for contact_id, target in desired.items():
+            try:
+                state = current[contact_id]
+            except KeyError:
+                to_add[target].add(contact_id)
+                continue
+            if state == target:
+                continue
+            if state.label_ids <= target.label_ids:
+                to_update[target].add(contact_id)
+            else:
+                to_delete.add(contact_id)
+                to_add[target].add(contact_id)
+
+        return cls(
+            to_delete=frozenset(to_delete),
+            to_update=cls._freeze(to_update),
+            to_add=cls._freeze(to_add),
+        )
+
+    @staticmethod
+    def _freeze(contacts: dict) -> Dict[ContactState, FrozenSet[int]]:
+        return {state: frozenset(ids) for state, ids in contacts.items()}
+
+    @staticmethod
+    def _flatten(contacts: dict) -> FrozenSet[int]:
+        return frozenset(
+            contact_id
+            for contact_ids in contacts.values()
+            for contact_id in contact_ids
+        )
+
+
+def contacts_from_esi(contacts_raw: Iterable[dict]) -> Dict[int, ContactState]:
+    """Convert raw contacts from ESI into contact states mapped by contact ID."""
+    return {
+        int(contact["contact_id"]): ContactState.from_esi_dict(contact)
+        for contact in contacts_raw
+    }
+
+
+def label_ids_for(is_war_target: bool, war_target_id: Optional[int]) -> frozenset:
+    """Return labels for a contact from the alliance."""
+    if is_war_target and war_target_id:
+        return frozenset([war_target_id])
+    return frozenset()
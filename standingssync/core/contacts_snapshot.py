@@ -0,0 +1,51 @@
+"""Snapshots of the contacts of a sync manager."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Tuple
+
+from .contact_set import ContactSet
+from .standings import EffectiveStandingResolver
+
+
+@dataclass(frozen=True)
+class ContactsSnapshot:
+    """Immutable snapshot of the contacts of a sync manager at a version.
+
+    Args:
+    - version_hash: version of the contacts
+    - contact_set: the contacts
+    """
+
+    version_hash: str
+    contact_set: ContactSet = field(default_factory=ContactSet)
+
+    def __bool__(self) -> bool:
+        return len(self.contact_set) > 0
+
+    def __len__(self) -> int:
+        return len(self.contact_set)
+
+    def contacts(self) -> Iterator[Tuple[int, float, bool]]:
+        """Iterate over all contacts as tuples of ID, standing and war target flag."""
+        return self.contact_set.contacts()
+
+    def war_targets(self) -> Iterator[Tuple[int, float]]:
+        """Iterate over all war targets as tuples of ID and standing."""
+        return self.contact_set.war_targets()
+
+    def standings(self) -> Dict[int, float]:
+        """Return standings mapped by contact ID."""
+        return dict(self.contact_set.items())
+
+    def standing_resolver(self) -> EffectiveStandingResolver:
+        """Return a resolver for effective standings with these contacts."""
+        return EffectiveStandingResolver(self.contact_set)
+
+    @classmethod
+    def from_contacts(
+        cls, version_hash: str, contacts: Iterable[Tuple[int, float, bool]]
+    ) -> "ContactsSnapshot":
+        """Create new snapshot from tuples of ID, standing and war target flag."""
+        return cls(
+            version_hash=version_hash, contact_set=ContactSet.from_contacts(contacts)
+        )
@@ -0,0 +1,248 @@
+"""Conditional ESI requests with ETags."""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from bravado.exception import HTTPNotModified
+
+from django.core.cache import cache
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from .. import __title__
+from ..app_settings import (
+    STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS,
+    STANDINGSSYNC_ESI_ETAGS_TIMEOUT,
+)
+from .esi_governor import EsiErrorLimitGovernor, esi_governor
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+KEY_PREFIX = "standingssync-esi-etag"
+
+# Names of all endpoints with conditional requests
+ENDPOINT_ALLIANCE_CONTACTS = "alliance_contacts"
+ENDPOINT_CHARACTER_CONTACTS = "character_contacts"
+ENDPOINT_CHARACTER_LABELS = "character_labels"
+ENDPOINT_WAR = "war"
+ENDPOINTS = (
+    ENDPOINT_ALLIANCE_CONTACTS,
+    ENDPOINT_CHARACTER_CONTACTS,
+    ENDPOINT_CHARACTER_LABELS,
+    ENDPOINT_WAR,
+)
+
+
+def _header(headers: Optional[Mapping], name: str) -> Optional[str]:
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if str(key).lower() == name:
+            return str(value)
+    return None
+
+
+def _pages(headers: Optional[Mapping]) -> Optional[int]:
+    """Return number of pages reported in headers, 1 if not reported
+    or None if invalid.
+    """
+    try:
+        return int(_header(headers, "x-pages") or 1)
+    except ValueError:
+        return None
+
+
+class EtagStore:
+    """Stores ETags of ESI responses per endpoint and parameters in the cache,
+    optionally with the data of the response.
+
+    Also counts hits and misses of conditional requests per endpoint.
+    """
+
+    def __init__(self, timeout: int = None) -> None:
+        self.timeout = (
+            timeout if timeout is not None else STANDINGSSYNC_ESI_ETAGS_TIMEOUT
+        )
+
+    @staticmethod
+    def key(endpoint: str, params: Mapping) -> str:
+        """Return key for an endpoint with parameters."""
+        params_hash = hashlib.md5(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return f"{KEY_PREFIX}-{endpoint}-{params_hash}"
+
+    def get(self, key: str) -> Optional[tuple]:
+        """Return stored ETag, data and number of pages for a key
+        or None if not found.
+        """
+        try:
+            return cache.get(key)
+        except Exception:
+            logger.warning("Failed to read ETag from cache", exc_info=True)
+            return None
+
+    def set(self, key: str, etag: str, data: Any = None, pages: int = 1) -> None:
+        """Store ETag and optionally the data of the response for a key."""
+        try:
+            cache.set(key, (etag, data, pages), timeout=self.timeout)
+        except Exception:
+            logger.warning("Failed to write ETag to cache", exc_info=True)
+
+    def delete(self, key: str) -> None:
+        """Delete ETag for a key."""
+        try:
+            cache.delete(key)
+        except Exception:
+            logger.warning("Failed to delete ETag from cache", exc_info=True)
+
+    def record(self, endpoint: str, is_hit: bool) -> None:
+        """Count a hit or miss for an endpoint."""
+        key = f"{KEY_PREFIX}-{'hits' if is_hit else 'misses'}-{endpoint}"
+        try:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key)
+        except Exception:
+            logger.warning("Failed to count ETag %s", key, exc_info=True)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hits and misses mapped by endpoint."""
+        result = dict()
+        for endpoint in ENDPOINTS:
+            result[endpoint] = {
+                "hits": cache.get(f"{KEY_PREFIX}-hits-{endpoint}", 0),
+                "misses": cache.get(f"{KEY_PREFIX}-misses-{endpoint}", 0),
+            }
+        return result
+
+
+@dataclass
+class EsiConditionalResult:
+    """Result of a conditional ESI request.
+
+    When the response is not modified, data is only available
+    if the endpoint was requested with keep_data.
+    """
+
+    data: Any
+    headers: Mapping
+    is_modified: bool
+    key: Optional[str] = None
+    etag: Optional[str] = None
+    keep_data: bool = False
+    store: Optional[EtagStore] = field(default=None, repr=False)
+
+    def confirm(self) -> None:
+        """Store the ETag of this response for the next request.
+
+        Should be called after the response has been processed successfully.
+        Responses with multiple pages are not stored,
+        since each page has it's own ETag.
+        """
+        if not self.store or not self.key or not self.etag or not self.is_modified:
+            return
+        if _pages(self.headers) != 1:
+            return
+        self.store.set(
+            self.key, self.etag, self.data if self.keep_data else None, pages=1
+        )
+
+    def invalidate(self) -> None:
+        """Remove stored ETag, e.g. after the resource was changed by us."""
+        if self.store and self.key:
+            self.store.delete(self.key)
+
+
+def conditional_results(
+    endpoint: str,
+    method: Callable,
+    params: dict,
+    token: str = None,
+    keep_data: bool = False,
+    use_etag: bool = True,
+    paginated: bool = False,
+    governor: EsiErrorLimitGovernor = None,
+    store: EtagStore = None,
+    **kwargs,
+) -> EsiConditionalResult:
+    """Fetch results from an ESI endpoint with a conditional request.
+
+    The ETag from the last confirmed response is sent as If-None-Match header.
+    A response with status 304 or the same ETag is reported as not modified.
+
+    Args:
+    - endpoint: name of the endpoint, e.g. for counting hits and misses
+    - method: ESI method to call
+    - params: parameters for the method, which identify the resource
+    - token: access token for the method, if needed
+    - keep_data: whether the data is stored with the ETag,
+        so it is available for not modified responses
+    - use_etag: set to False to always fetch the full response
+    - paginated: whether the endpoint can return multiple pages.
+        The ETag only covers the first page, so a not modified response
+        is only accepted when the resource still has one page.
+    - kwargs: passed to results() of the ESI operation
+    """
+    governor = governor if governor else esi_governor()
+    call_params = {**params, "token": token} if token else dict(params)
+    if not STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS:
+        data, headers = governor.results_with_headers(method(**call_params), **kwargs)
+        return EsiConditionalResult(data=data, headers=headers, is_modified=True)
+
+    store = store if store else EtagStore()
+    key = store.key(endpoint, params)
+    stored = store.get(key) if use_etag else None
+    if stored and keep_data and stored[1] is None:
+        stored = None
+    if stored and paginated and (len(stored) < 3 or stored[2] != 1):
+        stored = None
+    etag, stored_data = stored[:2] if stored else (None, None)
+    if etag:
+        call_params["_request_options"] = {"headers": {"If-None-Match": etag}}
+    try:
+        data, headers = governor.results_with_headers(method(**call_params), **kwargs)
+    except HTTPNotModified as ex:
+        headers = getattr(ex.response, "headers", None) or {}
+        if paginated and _pages(headers) != 1:
+            logger.info(
+                "%s: Number of pages has changed. Fetching full response.", endpoint
+            )
+            store.delete(key)
+            call_params.pop("_request_options")
+            data, headers = governor.results_with_headers(
+                method(**call_params), **kwargs
+            )
+            store.record(endpoint, is_hit=False)
+            return EsiConditionalResult(
+                data=data,
+                headers=headers,
+                is_modified=True,
+                key=key,
+                etag=_header(headers, "etag"),
+                keep_data=keep_data,
+                store=store,
+            )
+        store.record(endpoint, is_hit=True)
+        return EsiConditionalResult(
+            data=stored_data,
+            headers=headers,
+            is_modified=False,
+            key=key,
+            etag=etag,
+            store=store,
+        )
+    new_etag = _header(headers, "etag")
+    is_modified = not etag or new_etag != etag or (paginated and _pages(headers) != 1)
+    store.record(endpoint, is_hit=not is_modified)
+    return EsiConditionalResult(
+        data=data,
+        headers=headers,
+        is_modified=is_modified,
+        key=key,
+        etag=new_etag,
+        keep_data=keep_data,
+        store=store,
+    )
@@ -0,0 +1,23 @@
+"""Cache expiry of ESI responses."""
+
+import datetime as dt
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+
+def expires_from_headers(headers: Optional[Mapping]) -> Optional[dt.datetime]:
+    """Return when the response for these headers expires in the ESI cache
+    or None if it is not known.
+    """
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if str(key).lower() == "expires":
+            try:
+                expires = parsedate_to_datetime(str(value))
+            except (TypeError, ValueError):
+                return None
+            if expires.tzinfo is None:
+                expires = expires.replace(tzinfo=dt.timezone.utc)
+            return expires
+    return None
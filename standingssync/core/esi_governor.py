@@ -0,0 +1,227 @@
+"""Governor for the ESI error limit shared by all ESI calls of this app."""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Mapping, NamedTuple, Optional, Tuple
+
+from bravado.exception import HTTPError
+
+from django.core.cache import cache
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from .. import __title__
+from ..app_settings import (
+    STANDINGSSYNC_ESI_ERROR_LIMIT_BACKEND,
+    STANDINGSSYNC_ESI_ERROR_LIMIT_MAX_PAUSE,
+    STANDINGSSYNC_ESI_ERROR_LIMIT_PAUSE_THRESHOLD,
+    STANDINGSSYNC_ESI_ERROR_LIMIT_THROTTLE_THRESHOLD,
+)
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+HEADER_REMAIN = "x-esi-error-limit-remain"
+HEADER_RESET = "x-esi-error-limit-reset"
+HEADER_DATE = "date"
+
+CACHE_KEY = "standingssync-esi-error-limit"
+
+
+def _parse_http_date(value) -> Optional[float]:
+    """Return HTTP date as epoch seconds or None if invalid."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(str(value)).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class ErrorLimitState(NamedTuple):
+    """Error budget reported by ESI."""
+
+    remain: int
+    reset_at: float  # epoch seconds
+
+    def is_expired(self, now: float) -> bool:
+        return now >= self.reset_at
+
+    def merge(self, other: "ErrorLimitState") -> "ErrorLimitState":
+        """Merge with another state from the same or a different window.
+
+        Within the same window the smaller budget wins,
+        since reports from parallel callers can arrive out of order.
+        """
+        if other.reset_at > self.reset_at + 1:
+            return other
+        if self.reset_at > other.reset_at + 1:
+            return self
+        return other if other.remain < self.remain else self
+
+
+class MemoryBackend:
+    """Keeps the error limit state in memory of the current process."""
+
+    def __init__(self) -> None:
+        self._state = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[ErrorLimitState]:
+        return self._state
+
+    def update(self, state: ErrorLimitState) -> ErrorLimitState:
+        with self._lock:
+            self._state = self._state.merge(state) if self._state else state
+            return self._state
+
+
+class CacheBackend:
+    """Keeps the error limit state in the Django cache,
+    so it is shared across processes.
+    """
+
+    def __init__(self, key: str = CACHE_KEY) -> None:
+        self.key = key
+
+    def get(self) -> Optional[ErrorLimitState]:
+        value = cache.get(self.key)
+        return ErrorLimitState(*value) if value else None
+
+    def update(self, state: ErrorLimitState) -> ErrorLimitState:
+        current = self.get()
+        new_state = current.merge(state) if current else state
+        timeout = max(1, int(new_state.reset_at - time.time()) + 1)
+        cache.set(self.key, tuple(new_state), timeout=timeout)
+        return new_state
+
+
+class EsiErrorLimitGovernor:
+    """Throttles or pauses ESI calls when the ESI error budget is running low.
+
+    The state is updated from the error limit headers of each ESI response
+    and shared between all callers through the backend.
+
+    Args:
+    - backend: where the state is stored, e.g. Django cache or memory
+    - pause_threshold: callers are paused until the window resets
+        when the remaining budget is at or below this value
+    - throttle_threshold: callers are slowed down
+        when the remaining budget is at or below this value
+    - max_pause: max seconds to wait before a call
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        pause_threshold: int = None,
+        throttle_threshold: int = None,
+        max_pause: float = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        self.backend = backend if backend else CacheBackend()
+        self.pause_threshold = (
+            pause_threshold
+            if pause_threshold is not None
+            else STANDINGSSYNC_ESI_ERROR_LIMIT_PAUSE_THRESHOLD
+        )
+        self.throttle_threshold = (
+            throttle_threshold
+            if throttle_threshold is not None
+            else STANDINGSSYNC_ESI_ERROR_LIMIT_THROTTLE_THRESHOLD
+        )
+        self.max_pause = (
+            max_pause
+            if max_pause is not None
+            else STANDINGSSYNC_ESI_ERROR_LIMIT_MAX_PAUSE
+        )
+        self._clock = clock
+        self._sleep = sleep
+
+    def delay(self) -> float:
+        """Return seconds a caller should wait before the next call."""
+        state = self.backend.get()
+        now = self._clock()
+        if not state or state.is_expired(now):
+            return 0.0
+        if state.remain <= self.pause_threshold:
+            return min(state.reset_at - now, self.max_pause)
+        if state.remain <= self.throttle_threshold:
+            # spread the remaining budget evenly across the rest of the window
+            window = state.reset_at - now
+            return min(window / max(1, state.remain - self.pause_threshold), window)
+        return 0.0
+
+    def wait(self) -> float:
+        """Wait as needed before the next call and return seconds waited."""
+        seconds = self.delay()
+        if seconds > 0:
+            logger.warning(
+                "ESI error limit is low. Waiting %.1f seconds before next call.",
+                seconds,
+            )
+            self._sleep(seconds)
+        return seconds
+
+    def record_headers(self, headers: Mapping) -> Optional[ErrorLimitState]:
+        """Update the state from the headers of an ESI response.
+
+        The window is measured from the date of the response,
+        so that stale headers, e.g. from responses served from cache,
+        do not overwrite the current state.
+        """
+        if not headers:
+            return None
+        headers = {str(key).lower(): value for key, value in headers.items()}
+        try:
+            remain = int(headers[HEADER_REMAIN])
+            reset = int(headers[HEADER_RESET])
+        except (KeyError, TypeError, ValueError):
+            return None
+        now = self._clock()
+        response_at = _parse_http_date(headers.get(HEADER_DATE))
+        reset_at = (min(response_at, now) if response_at else now) + reset
+        if reset_at <= now:
+            logger.debug("Ignoring error limit headers from a past window")
+            return None
+        return self.backend.update(ErrorLimitState(remain=remain, reset_at=reset_at))
+
+    def results(self, operation, **kwargs) -> Any:
+        """Wait as needed, then fetch results from an ESI operation
+        and record the error limit reported with its response.
+        """
+        data, _ = self.results_with_headers(operation, **kwargs)
+        return data
+
+    def results_with_headers(self, operation, **kwargs) -> Tuple[Any, Mapping]:
+        """Same as results(), but also return the headers of the response."""
+        self.wait()
+        operation.request_config.also_return_response = True
+        try:
+            data, response = operation.results(**kwargs)
+        except HTTPError as ex:
+            self.record_headers(getattr(ex.response, "headers", None))
+            raise
+        headers = getattr(response, "headers", None) or {}
+        self.record_headers(headers)
+        return data, headers
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def esi_governor() -> EsiErrorLimitGovernor:
+    """Return the governor used for all ESI calls of this app."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            backend = (
+                MemoryBackend()
+                if STANDINGSSYNC_ESI_ERROR_LIMIT_BACKEND == "memory"
+                else CacheBackend()
+            )
+            _governor = EsiErrorLimitGovernor(backend=backend)
+        return _governor
@@ -0,0 +1,261 @@
+"""Concurrent execution of ESI write calls for character contacts."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.helpers import chunks
+from app_utils.logging import LoggerAddTag
+
+from .. import __title__
+from ..app_settings import (
+    STANDINGSSYNC_ESI_CHARACTER_MAX_WORKERS,
+    STANDINGSSYNC_ESI_MAX_WORKERS,
+)
+from .contacts_plan import MAX_ITEMS_DELETE, MAX_ITEMS_WRITE, ContactsPlan, ContactState
+from .esi_governor import EsiErrorLimitGovernor, esi_governor
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+_global_semaphore = None
+_global_semaphore_lock = threading.Lock()
+
+
+def global_semaphore() -> threading.BoundedSemaphore:
+    """Return the semaphore limiting concurrent ESI write calls in this process."""
+    global _global_semaphore
+    with _global_semaphore_lock:
+        if _global_semaphore is None:
+            _global_semaphore = threading.BoundedSemaphore(
+                max(1, STANDINGSSYNC_ESI_MAX_WORKERS)
+            )
+        return _global_semaphore
+
+
+class EsiWriteError(Exception):
+    """One or more ESI write calls have failed."""
+
+    def __init__(self, errors: List["EsiCallError"]) -> None:
+        self.errors = errors
+        details = "; ".join(str(error) for error in errors)
+        super().__init__(f"{len(errors)} ESI write call(s) failed: {details}")
+
+
+@dataclass(frozen=True)
+class EsiCall:
+    """A write call to ESI for a chunk of contacts."""
+
+    operation: str
+    contact_ids: Tuple[int, ...]
+    state: Optional[ContactState] = None
+
+
+@dataclass(frozen=True)
+class EsiCallError:
+    """A failed ESI write call."""
+
+    call: EsiCall
+    exception: Exception
+
+    def __str__(self) -> str:
+        return (
+            f"{self.call.operation} for {len(self.call.contact_ids)} contacts: "
+            f"{type(self.exception).__name__}: {self.exception}"
+        )
+
+
+@dataclass
+class EsiWriteResult:
+    """Result of executing a plan with ESI write calls."""
+
+    calls_count: int = 0
+    skipped_count: int = 0  # contacts not re-added, because their deletion failed
+    errors: List[EsiCallError] = field(default_factory=list)
+
+    @property
+    def is_ok(self) -> bool:
+        return not self.errors and not self.skipped_count
+
+    def raise_for_errors(self) -> None:
+        """Raise an exception if any of the ESI calls has failed."""
+        if self.errors:
+            raise EsiWriteError(self.errors)
+
+
+class ContactsWritePipeline:
+    """Execute all ESI write calls of a contacts plan with bounded concurrency.
+
+    Calls are executed in two phases. First all contacts are deleted,
+    then contacts are updated and added. Deletions are always done first,
+    so that characters with many contacts do not hit the max number of contacts.
+    Calls within each phase are sent in parallel.
+    Contacts which are deleted and re-added are not re-added,
+    when their own deletion has failed.
+    The number of parallel calls is limited per character (max_workers)
+    and for all characters in the current process (semaphore).
+
+    Args:
+    - delete_method: ESI method for deleting contacts
+    - put_method: ESI method for updating contacts
+    - post_method: ESI method for adding contacts
+    - max_workers: max number of parallel calls for this pipeline
+    - semaphore: semaphore to limit parallel calls across pipelines
+    - governor: governor for the ESI error limit
+    """
+
+    def __init__(
+        self,
+        delete_method: Callable,
+        put_method: Callable,
+        post_method: Callable,
+        max_workers: int = None,
+        semaphore: threading.Semaphore = None,
+        governor: EsiErrorLimitGovernor = None,
+    ) -> None:
+        self._methods = {
+            "delete": delete_method,
+            "put": put_method,
+            "post": post_method,
+        }
+        self.max_workers = (
+            max_workers if max_workers else STANDINGSSYNC_ESI_CHARACTER_MAX_WORKERS
+        )
+        self._semaphore = semaphore if semaphore else global_semaphore()
+        self._governor = governor if governor else esi_governor()
+        self._lock = threading.Lock()
+
+    def execute(
+        self, character_id: int, access_token: str, plan: ContactsPlan
+    ) -> EsiWriteResult:
+        """Execute all calls for a plan and return the collected result."""
+        delete_calls, write_calls, readd_calls = self._create_calls(plan)
+        result = EsiWriteResult()
+        if self.max_workers <= 1:
+            self._run_phase(character_id, access_token, delete_calls, result, None)
+            write_calls += self._allowed_readd_calls(character_id, readd_calls, result)
+            self._run_phase(character_id, access_token, write_calls, result, None)
+            return result
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="standingssync-esi"
+        ) as executor:
+            self._run_phase(character_id, access_token, delete_calls, result, executor)
+            write_calls += self._allowed_readd_calls(character_id, readd_calls, result)
+            self._run_phase(character_id, access_token, write_calls, result, executor)
+        return result
+
+    @staticmethod
+    def _create_calls(
+        plan: ContactsPlan,
+    ) -> Tuple[List[EsiCall], List[EsiCall], List[EsiCall]]:
+        """Create calls from plan.
+
+        Returns:
+        - Calls for deleting contacts, which must run first
+        - Calls for updating and adding contacts
+        - Calls for re-adding deleted contacts
+        """
+        ids_to_replace = plan.ids_to_replace
+        delete_calls = [
+            EsiCall("delete", tuple(chunk))
+            for chunk in chunks(sorted(ids_to_replace), MAX_ITEMS_DELETE)
+        ]
+        delete_calls += [
+            EsiCall("delete", tuple(chunk))
+            for chunk in chunks(
+                sorted(plan.to_delete - ids_to_replace), MAX_ITEMS_DELETE
+            )
+        ]
+        write_calls = []
+        for state, ids in plan.to_update.items():
+            write_calls += [
+                EsiCall("put", tuple(chunk), state)
+                for chunk in chunks(sorted(ids), MAX_ITEMS_WRITE)
+            ]
+        readd_calls = []
+        for state, ids in plan.to_add.items():
+            write_calls += [
+                EsiCall("post", tuple(chunk), state)
+                for chunk in chunks(sorted(ids - ids_to_replace), MAX_ITEMS_WRITE)
+            ]
+            readd_calls += [
+                EsiCall("post", tuple(chunk), state)
+                for chunk in chunks(sorted(ids & ids_to_replace), MAX_ITEMS_WRITE)
+            ]
+        return delete_calls, write_calls, readd_calls
+
+    def _run_phase(self, character_id, access_token, calls, result, executor) -> None:
+        """Run calls and wait until all have completed."""
+        if not executor:
+            for call in calls:
+                self._run_and_record(character_id, access_token, call, result)
+            return
+        futures = [
+            executor.submit(
+                self._run_and_record, character_id, access_token, call, result
+            )
+            for call in calls
+        ]
+        wait(futures)
+
+    def _allowed_readd_calls(self, character_id, readd_calls, result) -> List[EsiCall]:
+        """Return calls for re-adding contacts without contacts,
+        which could not be deleted.
+        """
+        if not readd_calls:
+            return []
+        with self._lock:
+            failed_ids = {
+                contact_id
+                for error in result.errors
+                if error.call.operation == "delete"
+                for contact_id in error.call.contact_ids
+            }
+        if not failed_ids:
+            return readd_calls
+        allowed_calls = []
+        skipped_count = 0
+        for call in readd_calls:
+            contact_ids = tuple(
+                obj for obj in call.contact_ids if obj not in failed_ids
+            )
+            skipped_count += len(call.contact_ids) - len(contact_ids)
+            if contact_ids:
+                allowed_calls.append(EsiCall(call.operation, contact_ids, call.state))
+        if skipped_count:
+            logger.warning(
+                "%s: Skipping re-adding of %d contacts, "
+                "because deleting them has failed",
+                character_id,
+                skipped_count,
+            )
+            with self._lock:
+                result.skipped_count += skipped_count
+        return allowed_calls
+
+    def _run_and_record(self, character_id, access_token, call, result) -> None:
+        try:
+            self._run(character_id, access_token, call)
+        except Exception as ex:
+            logger.warning(
+                "%s: ESI call %s failed: %s", character_id, call.operation, ex
+            )
+            with self._lock:
+                result.errors.append(EsiCallError(call=call, exception=ex))
+        finally:
+            with self._lock:
+                result.calls_count += 1
+
+    def _run(self, character_id: int, access_token: str, call: EsiCall) -> None:
+        params = {
+            "token": access_token,
+            "character_id": character_id,
+            "contact_ids": list(call.contact_ids),
+        }
+        if call.state:
+            params["standing"] = call.state.standing
+            params["label_ids"] = sorted(call.state.label_ids)
+        with self._semaphore:
+            self._governor.results(self._methods[call.operation](**params))
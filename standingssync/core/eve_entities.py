@@ -0,0 +1,34 @@
+"""Helpers for working with EveEntity objects."""
+
+from typing import Iterable, Set
+
+from eveuniverse.models import EveEntity
+
+BULK_BATCH_SIZE = 500
+
+
+def bulk_get_or_create_eve_entities(
+    ids: Iterable[int], batch_size: int = BULK_BATCH_SIZE
+) -> Set[int]:
+    """Ensure EveEntity objects exist for all given IDs with a constant number of queries.
+
+    Missing entities are created without a name
+    and can be resolved later, e.g. with ``EveEntity.objects.bulk_update_new_esi()``.
+
+    Returns:
+    - IDs of newly created entities
+    """
+    ids = set(map(int, ids))
+    if not ids:
+        return set()
+    existing_ids = set(
+        EveEntity.objects.filter(id__in=ids).values_list("id", flat=True)
+    )
+    new_ids = ids - existing_ids
+    if new_ids:
+        EveEntity.objects.bulk_create(
+            [EveEntity(id=entity_id) for entity_id in new_ids],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+    return new_ids
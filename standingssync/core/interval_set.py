@@ -0,0 +1,189 @@
+"""Compact set of IDs, which mostly form contiguous runs."""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Set
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Binary format: header followed by starts and ends
+# as little endian arrays in the same order
+_HEADER = struct.Struct("<4sBI")
+_MAGIC = b"SSIS"
+_FORMAT_VERSION = 1
+
+
+class IntervalSet(Set):
+    """Immutable set of integers stored as sorted, non overlapping intervals.
+
+    Needs much less memory than a set of ints when IDs form long runs,
+    e.g. war IDs, and allows fast union, difference and membership tests.
+
+    Intervals are half open, i.e. the end is not included.
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self, starts: array = None, ends: array = None) -> None:
+        self._starts = starts if starts is not None else array("q")
+        self._ends = ends if ends is not None else array("q")
+        if len(self._starts) != len(self._ends):
+            raise ValueError("Arrays must have the same length")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(<{len(self)} IDs in {self.interval_count} runs>)"
+
+    def __len__(self) -> int:
+        return sum(end - start for start, end in zip(self._starts, self._ends))
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end)
+
+    def __contains__(self, value) -> bool:
+        index = bisect_right(self._starts, value) - 1
+        return index >= 0 and value < self._ends[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, IntervalSet):
+            return self._starts == other._starts and self._ends == other._ends
+        return super().__eq__(other)
+
+    def __or__(self, other: Iterable[int]) -> "IntervalSet":
+        return self.union(other)
+
+    def __sub__(self, other: Iterable[int]) -> "IntervalSet":
+        return self.difference(other)
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(),)
+
+    @property
+    def interval_count(self) -> int:
+        """Number of intervals in this set."""
+        return len(self._starts)
+
+    def min(self) -> Optional[int]:
+        """Return smallest ID or None if the set is empty."""
+        return self._starts[0] if self._starts else None
+
+    def max(self) -> Optional[int]:
+        """Return largest ID or None if the set is empty."""
+        return self._ends[-1] - 1 if self._ends else None
+
+    def intervals(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over all intervals as tuples of start and end."""
+        return zip(self._starts, self._ends)
+
+    def union(self, *others: Iterable[int]) -> "IntervalSet":
+        """Return new set with the IDs of this set and all others."""
+        intervals = list(self.intervals())
+        for other in others:
+            intervals += list(self._as_interval_set(other).intervals())
+        return self.from_intervals(intervals)
+
+    def difference(self, *others: Iterable[int]) -> "IntervalSet":
+        """Return new set with the IDs of this set, which are not in the others."""
+        result = self
+        for other in others:
+            result = result._difference(self._as_interval_set(other))
+        return result
+
+    def to_list(self) -> List[List[int]]:
+        """Return intervals as list of start and last ID, e.g. for JSON."""
+        return [[start, end - 1] for start, end in self.intervals()]
+
+    def to_bytes(self) -> bytes:
+        """Serialize this set into a compact binary blob."""
+        parts = [_HEADER.pack(_MAGIC, _FORMAT_VERSION, self.interval_count)]
+        for values in (self._starts, self._ends):
+            if sys.byteorder != "little":
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "IntervalSet":
+        """Create new set from a binary blob created with to_bytes()."""
+        try:
+            magic, version, count = _HEADER.unpack_from(data)
+        except struct.error as ex:
+            raise ValueError("Invalid interval set data") from ex
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError("Invalid interval set data")
+        arrays = []
+        offset = _HEADER.size
+        for _ in range(2):
+            values = array("q")
+            size = values.itemsize * count
+            values.frombytes(data[offset : offset + size])
+            if len(values) != count:
+                raise ValueError("Invalid interval set data")
+            if sys.byteorder != "little":
+                values.byteswap()
+            arrays.append(values)
+            offset += size
+        return cls(*arrays)
+
+    @classmethod
+    def from_list(cls, data: Iterable[Iterable[int]]) -> "IntervalSet":
+        """Create new set from a list created with to_list()."""
+        return cls.from_intervals((start, last + 1) for start, last in data)
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "IntervalSet":
+        """Create new set from IDs in any order."""
+        if isinstance(ids, IntervalSet):
+            return ids
+        starts, ends = array("q"), array("q")
+        for value in sorted(set(ids)):
+            if ends and ends[-1] == value:
+                ends[-1] = value + 1
+            else:
+                starts.append(value)
+                ends.append(value + 1)
+        return cls(starts, ends)
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Tuple[int, int]]) -> "IntervalSet":
+        """Create new set from half open intervals,
+        which may overlap and can be in any order.
+        """
+        starts, ends = array("q"), array("q")
+        for start, end in sorted(intervals):
+            if start >= end:
+                continue
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return cls(starts, ends)
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable[int]) -> "IntervalSet":
+        return cls.from_ids(iterable)
+
+    @classmethod
+    def _as_interval_set(cls, other: Iterable[int]) -> "IntervalSet":
+        return other if isinstance(other, IntervalSet) else cls.from_ids(other)
+
+    def _difference(self, other: "IntervalSet") -> "IntervalSet":
+        starts, ends = array("q"), array("q")
+        other_index, other_count = 0, other.interval_count
+        for start, end in self.intervals():
+            while other_index < other_count and other._ends[other_index] <= start:
+                other_index += 1
+            index = other_index
+            while index < other_count and other._starts[index] < end:
+                if other._starts[index] > start:
+                    starts.append(start)
+                    ends.append(other._starts[index])
+                start = max(start, other._ends[index])
+                index += 1
+            if start < end:
+                starts.append(start)
+                ends.append(end)
+        return type(self)(starts, ends)
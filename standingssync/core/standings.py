@@ -0,0 +1,55 @@
+"""Resolving effective standings of characters."""
+
+from typing import Dict, Iterable, Mapping
+
+from allianceauth.eveonline.models import EveCharacter
+
+NEUTRAL_STANDING = 0.0
+
+
+class EffectiveStandingResolver:
+    """Resolve effective standings of characters from contact standings.
+
+    The effective standing is the standing of the character if there is one,
+    else the standing of it's corporation and else of it's alliance.
+
+    Args:
+    - standings: standings of contacts mapped by contact ID
+    """
+
+    def __init__(self, standings: Mapping[int, float]) -> None:
+        self._standings = standings
+
+    def effective_standing(self, character: EveCharacter) -> float:
+        """Return effective standing for a character."""
+        for entity_id in (
+            character.character_id,
+            character.corporation_id,
+            character.alliance_id,
+        ):
+            if entity_id:
+                try:
+                    return self._standings[entity_id]
+                except KeyError:
+                    pass
+        return NEUTRAL_STANDING
+
+    def effective_standings(
+        self, characters: Iterable[EveCharacter]
+    ) -> Dict[int, float]:
+        """Return effective standings for characters mapped by character ID."""
+        return {
+            character.character_id: self.effective_standing(character)
+            for character in characters
+        }
+
+    @staticmethod
+    def entity_ids_for(characters: Iterable[EveCharacter]) -> set:
+        """Return IDs of all entities relevant for resolving given characters."""
+        entity_ids = set()
+        for character in characters:
+            entity_ids.add(character.character_id)
+            entity_ids.add(character.corporation_id)
+            if character.alliance_id:
+                entity_ids.add(character.alliance_id)
+        return entity_ids
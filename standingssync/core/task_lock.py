@@ -0,0 +1,110 @@
+"""Cluster-wide single-flight locks for tasks, backed by the Django cache."""
+
+import uuid
+from typing import Optional
+
+from django.core.cache import cache
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from .. import __title__
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+KEY_PREFIX = "standingssync-task-lock"
+
+
+class TaskLock:
+    """Ensures only one instance of a task runs for the same object at a time.
+
+    Duplicate runs, which are requested while the task is running,
+    are coalesced into one rerun after the current run has finished.
+
+    Args:
+    - name: name of the task
+    - pk: primary key of the object the task is running for
+    - timeout: seconds until the lock expires, e.g. when a worker died
+    """
+
+    def __init__(self, name: str, pk: int, timeout: int) -> None:
+        self.name = name
+        self.pk = pk
+        self.timeout = timeout
+        self._token = uuid.uuid4().hex
+
+    def __str__(self) -> str:
+        return f"{self.name}-{self.pk}"
+
+    @property
+    def _lock_key(self) -> str:
+        return f"{KEY_PREFIX}-{self.name}-{self.pk}"
+
+    @property
+    def _rerun_key(self) -> str:
+        return f"{KEY_PREFIX}-{self.name}-{self.pk}-rerun"
+
+    @property
+    def _force_key(self) -> str:
+        return f"{KEY_PREFIX}-{self.name}-{self.pk}-force"
+
+    @property
+    def _skipped_key(self) -> str:
+        return f"{KEY_PREFIX}-{self.name}-skipped"
+
+    def acquire(self) -> bool:
+        """Try to acquire the lock and return True if successful."""
+        return cache.add(self._lock_key, self._token, timeout=self.timeout)
+
+    def release(self) -> Optional[bool]:
+        """Release the lock if it is still owned.
+
+        Rerun requests are counted, so requests arriving while the lock
+        is released are never lost and will trigger a rerun at the latest
+        when the next run releases the lock.
+
+        Returns:
+        - None if no rerun was requested, else the force flag for the rerun
+        """
+        if cache.get(self._lock_key) == self._token:
+            cache.delete(self._lock_key)
+        reruns = self._consume(self._rerun_key)
+        forced = self._consume(self._force_key)
+        if not reruns and not forced:
+            return None
+        return bool(forced)
+
+    def skip(self, force_sync: bool = False) -> None:
+        """Skip a duplicate run and request a rerun after the current run."""
+        self._incr(self._rerun_key, timeout=self.timeout)
+        if force_sync:
+            self._incr(self._force_key, timeout=self.timeout)
+        self._incr(self._skipped_key, timeout=None)
+        logger.info("%s: Task is already running. Skipping duplicate run.", self)
+
+    def skipped_count(self) -> int:
+        """Return number of skipped duplicate runs of this task."""
+        return cache.get(self._skipped_key, 0)
+
+    @staticmethod
+    def _incr(key: str, timeout: Optional[int]) -> None:
+        cache.add(key, 0, timeout=timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=timeout)
+
+    @staticmethod
+    def _consume(key: str) -> int:
+        """Consume all counted requests of a key and return their number.
+
+        Only subtracts the requests which have been seen,
+        so concurrent requests are kept for the next run.
+        """
+        count = cache.get(key) or 0
+        if count:
+            try:
+                cache.decr(key, count)
+            except ValueError:
+                pass
+        return count
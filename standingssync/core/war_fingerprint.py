@@ -0,0 +1,39 @@
+"""Fingerprints of war payloads from ESI."""
+
+import datetime as dt
+import hashlib
+import json
+from typing import Any, Iterable
+
+DIGEST_SIZE = 16  # 32 hex chars
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(dt.timezone.utc)
+        return value.isoformat()
+    return value
+
+
+def war_fingerprint(
+    aggressor_id: int, defender_id: int, ally_ids: Iterable[int], **fields
+) -> str:
+    """Return fingerprint for the normalized payload of a war.
+
+    The order of allies and the timezone of dates do not matter.
+
+    Args:
+    - aggressor_id: ID of the aggressor
+    - defender_id: ID of the defender
+    - ally_ids: IDs of all allies
+    - fields: all other fields of the war
+    """
+    payload = {
+        "aggressor_id": int(aggressor_id),
+        "defender_id": int(defender_id),
+        "ally_ids": sorted(int(obj) for obj in ally_ids),
+        **{key: _normalize(value) for key, value in fields.items()},
+    }
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=DIGEST_SIZE).hexdigest()
@@ -0,0 +1,109 @@
+"""Speculative parallel paging of the ESI wars list."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from .. import __title__
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+
+class SpeculativeWarPager:
+    """Fetches pages of war IDs with several requests at once.
+
+    The wars list returns war IDs in descending order below a cursor,
+    so each page depends on the smallest ID of the previous page.
+    Since war IDs are dense, the pager estimates the cursors of the next pages
+    from the ID range of the last pages and requests them in parallel.
+    Estimated pages slightly overlap and any gaps between pages
+    are filled with exact requests in the next round.
+
+    Args:
+    - fetch_page: function returning the page of war IDs
+        below the given cursor or the newest war IDs if the cursor is None
+    - page_size: max number of war IDs per page
+    - max_workers: max number of parallel requests.
+        Set to 1 to fetch pages one after the other.
+    - overlap: share of each estimated page, which overlaps with the next page
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[Optional[int]], List[int]],
+        page_size: int,
+        max_workers: int = 4,
+        overlap: float = 0.1,
+    ) -> None:
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_workers = max(1, max_workers)
+        self.overlap = overlap
+        self.requests_count = 0
+        self.rounds_count = 0
+
+    def fetch(self, first_page: List[int], min_war_id: int) -> Set[int]:
+        """Fetch pages following the first page and return all war IDs.
+
+        Stops when all war IDs down to min_war_id have been fetched
+        or the end of the list has been reached.
+        """
+        war_ids = set(first_page)
+        if self._is_last_page(first_page) or min(first_page) <= min_war_id:
+            return war_ids
+        covered_min = min(first_page)  # all war IDs from here on are fetched
+        span = max(first_page) - covered_min + 1
+        pool: Dict[int, List[int]] = dict()
+        while True:
+            step = max(1, int(span * (1 - self.overlap)))
+            cursors = [covered_min] + [
+                cursor
+                for cursor in (
+                    covered_min - step * num for num in range(1, self.max_workers)
+                )
+                if cursor > min_war_id and cursor not in pool
+            ]
+            previous_covered_min = covered_min
+            pages = self._fetch_pages(cursors)
+            self.rounds_count += 1
+            for page in pages.values():
+                war_ids.update(page)
+            pool.update(pages)
+            spans = [max(page) - min(page) + 1 for page in pages.values() if page]
+            if spans:
+                span = max(1, sum(spans) // len(spans))
+
+            while True:
+                candidates = [cursor for cursor in pool if cursor >= covered_min]
+                if not candidates:
+                    break
+                if any(self._is_last_page(pool[cursor]) for cursor in candidates):
+                    return war_ids
+                lowest = min(min(pool[cursor]) for cursor in candidates)
+                for cursor in candidates:
+                    del pool[cursor]
+                if lowest >= covered_min:
+                    break
+                covered_min = lowest
+                if covered_min <= min_war_id:
+                    return war_ids
+
+            if covered_min >= previous_covered_min:
+                logger.warning(
+                    "Paging of war IDs stopped at %d, since no progress was made",
+                    covered_min,
+                )
+                return war_ids
+
+    def _is_last_page(self, page: List[int]) -> bool:
+        return len(page) < self.page_size
+
+    def _fetch_pages(self, cursors: List[int]) -> Dict[int, List[int]]:
+        self.requests_count += len(cursors)
+        if len(cursors) == 1:
+            return {cursors[0]: list(self.fetch_page(cursors[0]))}
+        with ThreadPoolExecutor(max_workers=len(cursors)) as executor:
+            pages = executor.map(self.fetch_page, cursors)
+            return {cursor: list(page) for cursor, page in zip(cursors, pages)}
@@ -0,0 +1,31 @@
+"""Scheduling of war updates from ESI."""
+
+import datetime as dt
+from typing import Optional
+
+
+def calc_war_next_check_at(
+    started: Optional[dt.datetime],
+    finished: Optional[dt.datetime],
+    expires: Optional[dt.datetime],
+    now: dt.datetime,
+) -> Optional[dt.datetime]:
+    """Return when a war should be checked again on ESI or None if it is due now.
+
+    The next check depends on the state of the war:
+    - finishing wars incl. retracted wars can no longer change
+        and need no further checks, since they are finished at the given time
+    - wars which have not yet started are checked again when they start
+    - all other wars are checked again when they expire in the ESI cache
+
+    Args:
+    - started: when the war starts or started
+    - finished: when the war finishes or finished
+    - expires: when the war expires in the ESI cache
+    - now: current time
+    """
+    if finished:
+        return finished
+    if started and started > now:
+        return max(started, expires) if expires else started
+    return expires
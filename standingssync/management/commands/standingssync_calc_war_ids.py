@@ -2,7 +2,8 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db.models import Min
 
 from ... import __title__, __version__
-from ...models import EveWar
+from ...core.esi_governor import esi_governor
+from ...models import EveWar, EveWarSyncState
 from ...providers import esi
 
 
@@ -18,7 +19,7 @@ class Command(BaseCommand):
                 "Please update wars from ESI before running this command."
             )
 
-        war_ids = esi.client.Wars.get_wars().results()
+        war_ids = esi_governor().results(esi.client.Wars.get_wars())
         min_unfinished_war_id = EveWar.objects.filter(
             id__gte=min(war_ids), finished__isnull=True
         ).aggregate(Min("id"))["id__min"]
@@ -27,7 +28,13 @@ class Command(BaseCommand):
             .order_by("id")
             .values_list("id", flat=True)
         )
-        self.stdout.write("Calculated new war ID values for settings are:")
+        state = EveWarSyncState.load()
+        self.stdout.write(
+            "War ID values maintained by the app are: "
+            f"minimum unfinished war ID = {state.min_unfinished_war_id}, "
+            f"special war IDs = {state.special_war_ids}"
+        )
+        self.stdout.write("Calculated new war ID values for optional settings are:")
         self.stdout.write(
             f"STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID = {min_unfinished_war_id}"
         )
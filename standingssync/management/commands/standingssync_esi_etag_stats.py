@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ... import __title__, __version__
+from ...core.esi_etags import EtagStore
+
+
+class Command(BaseCommand):
+    help = "Shows hits and misses of conditional ESI requests per endpoint."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"*** {__title__} v{__version__} - ESI ETag stats ***")
+        for endpoint, stats in EtagStore().stats().items():
+            total = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / total * 100 if total else 0
+            self.stdout.write(
+                f"{endpoint}: {stats['hits']:,} hits, {stats['misses']:,} misses "
+                f"({hit_rate:.0f}% hit rate)"
+            )
@@ -1,21 +1,44 @@
-from typing import List, Set
+import datetime as dt
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 
+from django.contrib.auth.models import Permission
 from django.db import models, transaction
-from django.db.models import Exists, OuterRef
+from django.db.models import Exists, OuterRef, Q
 from django.utils.timezone import now
+from esi.models import Token
 
 from allianceauth.services.hooks import get_extension_logger
+from app_utils.django import users_with_permission
+from app_utils.helpers import chunks
 from app_utils.logging import LoggerAddTag
 
 from . import __title__
-from .app_settings import (
-    STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID,
-    STANDINGSSYNC_SPECIAL_WAR_IDS,
-)
+from .app_settings import STANDINGSSYNC_WAR_IDS_FETCH_MAX_WORKERS
+from .core.contact_set import ContactSet
+from .core.esi_etags import ENDPOINT_WAR, EsiConditionalResult, conditional_results
+from .core.esi_expires import expires_from_headers
+from .core.esi_governor import esi_governor
+from .core.eve_entities import bulk_get_or_create_eve_entities
+from .core.interval_set import IntervalSet
+from .core.war_fingerprint import war_fingerprint
+from .core.war_pager import SpeculativeWarPager
+from .core.war_schedule import calc_war_next_check_at
 from .providers import esi
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
+WAR_ESI_FIELDS = [
+    "declared",
+    "finished",
+    "is_mutual",
+    "is_open_for_allies",
+    "retracted",
+    "started",
+]
+
 
 class EveContactQuerySet(models.QuerySet):
     def grouped_by_standing(self) -> dict:
@@ -27,14 +50,183 @@ class EveContactQuerySet(models.QuerySet):
             contacts_by_standing[contact.standing].add(contact)
         return contacts_by_standing
 
+    def contact_set(self) -> ContactSet:
+        """Return contacts as compact contact set without creating model objects."""
+        return ContactSet.from_contacts(
+            self.values_list("eve_entity_id", "standing", "is_war_target")
+        )
+
+
+class ContactsChangeSet(NamedTuple):
+    """Counts of changes from an update of contacts."""
+
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self) -> str:
+        return f"{self.added} added, {self.removed} removed, {self.changed} changed"
+
 
 class EveContactManagerBase(models.Manager):
-    pass
+    def update_for_manager(
+        self,
+        manager: models.Model,
+        contacts: Dict[int, dict],
+        war_target_ids: Set[int],
+        batch_size: int = 500,
+    ) -> ContactsChangeSet:
+        """Update the stored contacts of a sync manager incrementally.
+
+        Only new, removed and changed contacts are written to the database.
+        Should be run within a transaction.
+
+        Args:
+        - manager: Sync manager the contacts belong to
+        - contacts: ESI contacts mapped by contact ID
+        - war_target_ids: IDs of contacts which are war targets
+
+        Returns:
+        - counts of applied changes
+        """
+        existing_contacts = {
+            obj.eve_entity_id: obj
+            for obj in self.filter(manager=manager).only(
+                "pk", "eve_entity_id", "standing", "is_war_target"
+            )
+        }
+        new_contacts = []
+        changed_contacts = []
+        for contact_id, contact in contacts.items():
+            standing = float(contact["standing"])
+            is_war_target = contact_id in war_target_ids
+            obj = existing_contacts.pop(contact_id, None)
+            if obj is None:
+                new_contacts.append(
+                    self.model(
+                        manager=manager,
+                        eve_entity_id=contact_id,
+                        standing=standing,
+                        is_war_target=is_war_target,
+                    )
+                )
+            elif obj.standing != standing or obj.is_war_target != is_war_target:
+                obj.standing = standing
+                obj.is_war_target = is_war_target
+                changed_contacts.append(obj)
+
+        if existing_contacts:
+            self.filter(pk__in=[obj.pk for obj in existing_contacts.values()]).delete()
+        if new_contacts:
+            self.bulk_create(new_contacts, batch_size=batch_size)
+        if changed_contacts:
+            self.bulk_update(
+                changed_contacts,
+                fields=["standing", "is_war_target"],
+                batch_size=batch_size,
+            )
+        return ContactsChangeSet(
+            added=len(new_contacts),
+            removed=len(existing_contacts),
+            changed=len(changed_contacts),
+        )
 
 
 EveContactManager = EveContactManagerBase.from_queryset(EveContactQuerySet)
 
 
+class SyncManagerQuerySet(models.QuerySet):
+    def due(self) -> models.QuerySet:
+        """Return sync managers, which alliance contacts have expired in ESI."""
+        return self.filter(Q(next_sync_at__isnull=True) | Q(next_sync_at__lte=now()))
+
+
+SyncManagerManager = models.Manager.from_queryset(SyncManagerQuerySet)
+
+
+class SyncedCharacterQuerySet(models.QuerySet):
+    def select_related_for_sync(self) -> models.QuerySet:
+        """Select all related objects needed for syncing characters."""
+        return self.select_related(
+            "character_ownership__character",
+            "character_ownership__user",
+            "manager__alliance",
+        )
+
+    def valid_tokens(self) -> Dict[int, Token]:
+        """Return valid tokens with the scopes needed for syncing
+        mapped by PK of synced character.
+
+        Characters without a valid token are not included.
+        """
+        owners = {
+            (user_id, character_id): pk
+            for pk, user_id, character_id in self.values_list(
+                "pk",
+                "character_ownership__user_id",
+                "character_ownership__character__character_id",
+            )
+        }
+        if not owners:
+            return dict()
+        tokens = (
+            Token.objects.filter(
+                character_id__in={character_id for _, character_id in owners}
+            )
+            .require_scopes(self.model.get_esi_scopes())
+            .require_valid()
+            .order_by("pk")
+        )
+        result = dict()
+        for token in tokens:
+            pk = owners.get((token.user_id, token.character_id))
+            if pk is not None and pk not in result:
+                result[pk] = token
+        return result
+
+    def user_ids_with_permission(self) -> Set[int]:
+        """Return IDs of the users of these characters,
+        which have permission to sync characters.
+        """
+        permission = Permission.objects.get(
+            content_type__app_label=self.model._meta.app_label,
+            codename="add_syncedcharacter",
+        )
+        return set(
+            users_with_permission(permission)
+            .filter(
+                is_active=True,
+                pk__in=self.values("character_ownership__user_id"),
+            )
+            .values_list("pk", flat=True)
+        )
+
+
+SyncedCharacterManager = models.Manager.from_queryset(SyncedCharacterQuerySet)
+
+
+class WarsUpdateResult(NamedTuple):
+    """Result of updating a batch of wars from ESI."""
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    changed_alliances: int = 0
+    duration: float = 0.0  # seconds
+
+    def __str__(self) -> str:
+        return (
+            f"{self.created} created, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.failed} failed, "
+            f"{self.changed_alliances} alliances with changed war targets "
+            f"in {self.duration:.2f} seconds"
+        )
+
+
 class EveWarQuerySet(models.QuerySet):
     def annotate_active_wars(self) -> models.QuerySet:
         from .models import EveWar
@@ -53,64 +245,332 @@ class EveWarQuerySet(models.QuerySet):
 
 
 class EveWarManagerBase(models.Manager):
-    def war_targets(self, alliance_id: int) -> List[models.Model]:
-        """Return list of current war targets for given alliance as EveEntity objects
-        or an empty list if there are None.
-        """
-        war_targets = list()
-        active_wars = self.active_wars()
-        # case 1 alliance is aggressor
-        for war in active_wars:
-            if war.aggressor_id == alliance_id:
-                war_targets.append(war.defender)
-                if war.allies:
-                    war_targets += list(war.allies.all())
-
-        # case 2 alliance is defender
-        for war in active_wars:
-            if war.defender_id == alliance_id:
-                war_targets.append(war.aggressor)
-
-        # case 3 alliance is ally
-        for war in active_wars:
-            if war.allies.filter(id=alliance_id).exists():
-                war_targets.append(war.aggressor)
-
-        return war_targets
+    def war_targets(self, alliance_id: int) -> models.QuerySet:
+        """Return current war targets for given alliance as EveEntity objects."""
+        from .models import EveEntity, EveWarTarget
+
+        return EveEntity.objects.filter(
+            id__in=EveWarTarget.objects.active()
+            .filter(alliance_id=alliance_id)
+            .values("target_id")
+        )
+
+    def war_target_ids(self, alliance_id: int) -> Set[int]:
+        """Return IDs of current war targets for given alliance."""
+        from .models import EveWarTarget
+
+        return set(
+            EveWarTarget.objects.active()
+            .filter(alliance_id=alliance_id)
+            .values_list("target_id", flat=True)
+        )
 
     def update_or_create_from_esi(self, id: int):
         """Updates existing or creates new objects from ESI with given ID."""
-        from .models import EveEntity
+        result = self._fetch_war_from_esi(id)
+        if not result.is_modified:
+            logger.info("War %s is not modified", id)
+            self._update_next_check_at_for_unchanged({id: result})
+            return
+        war, ally_ids = self._war_from_esi(id, result)
+        self._bulk_write_wars({id: war}, {id: ally_ids})
+        result.confirm()
+
+    def update_or_create_from_esi_bulk(
+        self, war_ids: Iterable[int], max_workers: int = 1, batch_size: int = 500
+    ) -> WarsUpdateResult:
+        """Updates existing or creates new objects from ESI for given IDs in bulk.
+
+        War details are fetched with up to max_workers parallel requests
+        and then written to the database with a constant number of queries.
+        Wars which can not be fetched or are invalid are counted as failed.
+        Wars which are not modified since the last update are not written.
+        """
+        started = time.perf_counter()
+        war_ids = sorted(set(war_ids))
+        results, failed = self._fetch_wars_from_esi(war_ids, max_workers)
+        modified_results = {
+            war_id: result for war_id, result in results.items() if result.is_modified
+        }
+        wars = dict()
+        allies = dict()
+        for war_id, result in modified_results.items():
+            try:
+                wars[war_id], allies[war_id] = self._war_from_esi(war_id, result)
+            except (KeyError, ValueError):
+                logger.warning("Invalid data for war %s", war_id, exc_info=True)
+                failed += 1
 
-        logger.info("Retrieving war details for ID %s", id)
-        war_info = esi.client.Wars.get_wars_war_id(war_id=id).results(ignore_cache=True)
-        aggressor, _ = EveEntity.objects.get_or_create(
-            id=self._extract_id_from_war_participant(war_info["aggressor"])
+        created, updated, unchanged, changed_alliance_ids = self._bulk_write_wars(
+            wars, allies, batch_size
         )
-        defender, _ = EveEntity.objects.get_or_create(
-            id=self._extract_id_from_war_participant(war_info["defender"])
+        for war_id in wars.keys():
+            modified_results[war_id].confirm()
+        self._update_next_check_at_for_unchanged(
+            {
+                war_id: result
+                for war_id, result in results.items()
+                if not result.is_modified
+            },
+            batch_size=batch_size,
         )
+        return WarsUpdateResult(
+            created=created,
+            updated=updated,
+            unchanged=len(results) - len(modified_results) + unchanged,
+            failed=failed,
+            changed_alliances=len(changed_alliance_ids),
+            duration=time.perf_counter() - started,
+        )
+
+    def _war_from_esi(
+        self, war_id: int, result: EsiConditionalResult
+    ) -> Tuple[models.Model, Set[int]]:
+        """Return new war object and the IDs of it's allies from an ESI result.
+
+        Raises KeyError or ValueError for invalid data.
+        """
+        war_info = result.data
+        aggressor_id = self._extract_id_from_war_participant(war_info["aggressor"])
+        defender_id = self._extract_id_from_war_participant(war_info["defender"])
+        ally_ids = {
+            self._extract_id_from_war_participant(ally_info)
+            for ally_info in war_info.get("allies") or []
+        }
+        war_fields = self._war_fields_from_esi(war_info)
+        war = self.model(
+            id=war_id,
+            aggressor_id=aggressor_id,
+            defender_id=defender_id,
+            **war_fields,
+            next_check_at=self._next_check_at(war_info, result.headers),
+            esi_fingerprint=war_fingerprint(
+                aggressor_id, defender_id, ally_ids, **war_fields
+            ),
+        )
+        return war, ally_ids
+
+    def _bulk_write_wars(
+        self,
+        wars: Dict[int, models.Model],
+        allies: Dict[int, Set[int]],
+        batch_size: int = 500,
+    ) -> Tuple[int, int, int, Set[int]]:
+        """Write wars with their allies to the database in bulk.
+
+        Wars which payload has not changed since they were last written
+        are skipped and only get their next check updated.
+        All participants are created as needed in one pass
+        and only added or removed allies are written.
+
+        Returns:
+        - number of created wars
+        - number of updated wars
+        - number of unchanged wars
+        - IDs of alliances, which war targets have changed
+        """
+        from .models import EveWarTarget
+
+        if not wars:
+            return 0, 0, 0, set()
+        stored_fingerprints = dict(
+            self.filter(id__in=wars.keys()).values_list("id", "esi_fingerprint")
+        )
+        unchanged_wars = [
+            war
+            for war in wars.values()
+            if stored_fingerprints.get(war.id) == war.esi_fingerprint
+        ]
+        if unchanged_wars:
+            self.bulk_update(
+                unchanged_wars, fields=["next_check_at"], batch_size=batch_size
+            )
+            unchanged_ids = {war.id for war in unchanged_wars}
+            wars = {
+                war_id: war
+                for war_id, war in wars.items()
+                if war_id not in unchanged_ids
+            }
+            allies = {
+                war_id: ally_ids
+                for war_id, ally_ids in allies.items()
+                if war_id not in unchanged_ids
+            }
+            if not wars:
+                return 0, 0, len(unchanged_wars), set()
+        entity_ids = {war.aggressor_id for war in wars.values()}
+        entity_ids |= {war.defender_id for war in wars.values()}
+        for ally_ids in allies.values():
+            entity_ids |= ally_ids
+        bulk_get_or_create_eve_entities(entity_ids)
         with transaction.atomic():
-            war, _ = self.update_or_create(
-                id=id,
-                defaults={
-                    "aggressor": aggressor,
-                    "declared": war_info["declared"],
-                    "defender": defender,
-                    "is_mutual": war_info["mutual"],
-                    "is_open_for_allies": war_info["open_for_allies"],
-                    "retracted": war_info.get("retracted"),
-                    "started": war_info.get("started"),
-                    "finished": war_info.get("finished"),
-                },
+            existing_ids = set(stored_fingerprints.keys())
+            new_wars = [war for war in wars.values() if war.id not in existing_ids]
+            changed_wars = [war for war in wars.values() if war.id in existing_ids]
+            # another batch can create the same wars in the meantime
+            self.bulk_create(new_wars, batch_size=batch_size, ignore_conflicts=True)
+            if new_wars:
+                new_wars, changed_wars = self._resolve_created_concurrently(
+                    new_wars, changed_wars
+                )
+            self.bulk_update(
+                changed_wars,
+                fields=[
+                    "aggressor",
+                    "defender",
+                    *WAR_ESI_FIELDS,
+                    "next_check_at",
+                    "esi_fingerprint",
+                ],
+                batch_size=batch_size,
             )
-            war.allies.clear()
-            if war_info.get("allies"):
-                for ally_info in war_info.get("allies"):
-                    eve_entity, _ = EveEntity.objects.get_or_create(
-                        id=self._extract_id_from_war_participant(ally_info)
-                    )
-                    war.allies.add(eve_entity)
+            self._bulk_write_allies(
+                allies, {war.id for war in changed_wars}, batch_size
+            )
+            changed_alliance_ids = EveWarTarget.objects.update_for_wars(
+                wars.keys(), batch_size=batch_size
+            )
+        return (
+            len(new_wars),
+            len(changed_wars),
+            len(unchanged_wars),
+            changed_alliance_ids,
+        )
+
+    def _resolve_created_concurrently(
+        self, new_wars: List[models.Model], changed_wars: List[models.Model]
+    ) -> Tuple[List[models.Model], List[models.Model]]:
+        """Find new wars, which have been created by another batch
+        with a different payload and need to be updated instead.
+
+        Returns:
+        - created wars
+        - wars to update
+        """
+        stored_fingerprints = dict(
+            self.filter(id__in=[war.id for war in new_wars]).values_list(
+                "id", "esi_fingerprint"
+            )
+        )
+        created_wars = []
+        for war in new_wars:
+            if stored_fingerprints.get(war.id) == war.esi_fingerprint:
+                created_wars.append(war)
+            else:
+                changed_wars.append(war)
+        return created_wars, changed_wars
+
+    def _bulk_write_allies(
+        self, allies: Dict[int, Set[int]], existing_ids: Set[int], batch_size: int
+    ) -> None:
+        """Add and remove allies of wars to match the given allies.
+
+        Only wars with the given existing IDs can have stored allies.
+        """
+        AlliesRelation = self.model.allies.through
+        current_allies = defaultdict(set)
+        obsolete_pks = []
+        if existing_ids:
+            for pk, war_id, ally_id in AlliesRelation.objects.filter(
+                evewar_id__in=existing_ids
+            ).values_list("pk", "evewar_id", "eveentity_id"):
+                current_allies[war_id].add(ally_id)
+                if war_id in allies and ally_id not in allies[war_id]:
+                    obsolete_pks.append(pk)
+        if obsolete_pks:
+            AlliesRelation.objects.filter(pk__in=obsolete_pks).delete()
+        AlliesRelation.objects.bulk_create(
+            [
+                AlliesRelation(evewar_id=war_id, eveentity_id=ally_id)
+                for war_id, ally_ids in allies.items()
+                for ally_id in ally_ids - current_allies[war_id]
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,  # allies can be added by another batch
+        )
+
+    def _fetch_wars_from_esi(
+        self, war_ids: List[int], max_workers: int
+    ) -> Tuple[Dict[int, EsiConditionalResult], int]:
+        """Fetch details for wars from ESI.
+
+        Returns:
+        - results with war details mapped by war ID
+        - number of wars which could not be fetched
+        """
+        war_infos = dict()
+        failed = 0
+        if max_workers <= 1:
+            for war_id in war_ids:
+                try:
+                    war_infos[war_id] = self._fetch_war_from_esi(war_id)
+                except Exception:
+                    logger.warning("Failed to fetch war %s", war_id, exc_info=True)
+                    failed += 1
+            return war_infos, failed
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._fetch_war_from_esi, war_id): war_id
+                for war_id in war_ids
+            }
+            for future in as_completed(futures):
+                war_id = futures[future]
+                try:
+                    war_infos[war_id] = future.result()
+                except Exception:
+                    logger.warning("Failed to fetch war %s", war_id, exc_info=True)
+                    failed += 1
+        return war_infos, failed
+
+    @staticmethod
+    def _fetch_war_from_esi(war_id: int) -> EsiConditionalResult:
+        logger.info("Retrieving war details for ID %s", war_id)
+        return conditional_results(
+            ENDPOINT_WAR,
+            esi.client.Wars.get_wars_war_id,
+            params={"war_id": war_id},
+            ignore_cache=True,
+        )
+
+    def _update_next_check_at_for_unchanged(
+        self, results: Dict[int, EsiConditionalResult], batch_size: int = 500
+    ) -> None:
+        """Update when unchanged wars are checked again, based on stored wars."""
+        if not results:
+            return
+        wars = list(
+            self.filter(id__in=results.keys()).only("id", "started", "finished")
+        )
+        current = now()
+        for war in wars:
+            war.next_check_at = calc_war_next_check_at(
+                started=war.started,
+                finished=war.finished,
+                expires=expires_from_headers(results[war.id].headers),
+                now=current,
+            )
+        self.bulk_update(wars, fields=["next_check_at"], batch_size=batch_size)
+
+    @staticmethod
+    def _next_check_at(war_info: dict, headers) -> Optional[dt.datetime]:
+        return calc_war_next_check_at(
+            started=war_info.get("started"),
+            finished=war_info.get("finished"),
+            expires=expires_from_headers(headers),
+            now=now(),
+        )
+
+    @staticmethod
+    def _war_fields_from_esi(war_info: dict) -> dict:
+        return {
+            "declared": war_info["declared"],
+            "is_mutual": war_info["mutual"],
+            "is_open_for_allies": war_info["open_for_allies"],
+            "retracted": war_info.get("retracted"),
+            "started": war_info.get("started"),
+            "finished": war_info.get("finished"),
+        }
 
     @staticmethod
     def _extract_id_from_war_participant(participant: dict) -> int:
@@ -120,42 +580,207 @@ class EveWarManagerBase(models.Manager):
             raise ValueError(f"Invalid participant: {participant}")
         return alliance_id or corporation_id
 
-    def calc_relevant_war_ids(self) -> Set[int]:
+    def calc_relevant_war_ids(self) -> IntervalSet:
         """Determine IDs from unfinished and new wars."""
         logger.info("Fetching wars from ESI")
+        from .models import EveWarSyncState
+
         war_ids = self.fetch_war_ids_from_esi()
-        war_ids = war_ids.union(set(STANDINGSSYNC_SPECIAL_WAR_IDS))
-        finished_war_ids = set(self.finished_wars().values_list("id", flat=True))
-        war_ids = set(war_ids)
-        return war_ids.difference(finished_war_ids)
+        war_ids = war_ids | EveWarSyncState.load().effective_special_war_ids()
+        current = now()
+        return war_ids.difference(
+            self._filter_war_ids(
+                war_ids, Q(finished__lte=current) | Q(next_check_at__gt=current)
+            )
+        )
+
+    def finished_war_ids(self, war_ids: Iterable[int]) -> Set[int]:
+        """Return IDs of given wars, which are finished."""
+        return self._filter_war_ids(war_ids, Q(finished__lte=now()))
+
+    def _filter_war_ids(
+        self, war_ids: Iterable[int], condition: Q, chunk_size: int = 500
+    ) -> Set[int]:
+        """Return IDs of given wars, which match the condition.
+
+        Only the given wars are queried in chunks,
+        so the effort does not depend on the number of stored wars.
+        """
+        matching_war_ids = set()
+        for war_ids_chunk in chunks(sorted(war_ids), chunk_size):
+            matching_war_ids.update(
+                self.filter(id__in=war_ids_chunk)
+                .filter(condition)
+                .values_list("id", flat=True)
+            )
+        return matching_war_ids
 
     @staticmethod
-    def fetch_war_ids_from_esi(max_items: int = 2000) -> Set[int]:
+    def fetch_war_ids_from_esi(max_items: int = 2000) -> IntervalSet:
         """Fetch IDs for new and unfinished wars from ESI.
 
         Will ignore older wars which are known to be already finished.
+
+        Only pages with wars newer than the last seen war are fetched
+        and combined with the stored IDs of open wars.
+        All pages are fetched again periodically to reconcile the stored IDs.
         """
-        logger.info("Fetching war IDs from ESI")
-        war_ids = []
-        war_ids_page = esi.client.Wars.get_wars().results(ignore_cache=True)
-        while True:
-            war_ids += war_ids_page
-            if (
-                len(war_ids_page) < max_items
-                or min(war_ids_page) < STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID
-            ):
-                break
-            max_war_id = min(war_ids)
-            war_ids_page = esi.client.Wars.get_wars(max_war_id=max_war_id).results(
-                ignore_cache=True
-            )
-        return set(
-            [
-                war_id
-                for war_id in war_ids
-                if war_id >= STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID
+        from .models import EveWar, EveWarSyncState
+
+        state = EveWarSyncState.load()
+        is_full_sync = state.is_full_sync_due()
+        min_unfinished_war_id = state.effective_min_unfinished_war_id()
+        min_war_id = (
+            min_unfinished_war_id
+            if is_full_sync
+            else max(state.max_war_id, min_unfinished_war_id)
+        )
+        logger.info("Fetching %s war IDs from ESI", "all" if is_full_sync else "new")
+        first_page, headers = esi_governor().results_with_headers(
+            esi.client.Wars.get_wars(), ignore_cache=True
+        )
+        pager = SpeculativeWarPager(
+            fetch_page=lambda max_war_id: esi_governor().results(
+                esi.client.Wars.get_wars(max_war_id=max_war_id), ignore_cache=True
+            ),
+            page_size=max_items,
+            max_workers=STANDINGSSYNC_WAR_IDS_FETCH_MAX_WORKERS,
+        )
+        war_ids = pager.fetch(first_page, min_war_id)
+        logger.info(
+            "Fetched %d war IDs with %d requests in %d rounds",
+            len(war_ids),
+            pager.requests_count + 1,
+            pager.rounds_count + 1,
+        )
+
+        new_war_ids = IntervalSet.from_ids(
+            war_id for war_id in war_ids if war_id >= min_unfinished_war_id
+        )
+        if is_full_sync:
+            open_war_ids = new_war_ids
+            state.last_full_sync_at = now()
+        else:
+            open_war_ids = new_war_ids | state.open_war_id_set()
+        open_war_ids -= EveWar.objects.finished_war_ids(open_war_ids)
+        if war_ids:
+            state.max_war_id = max(max(war_ids), state.max_war_id or 0)
+        state.open_war_ids = open_war_ids.to_list()
+        state.next_sync_at = expires_from_headers(headers)
+        state.save(
+            update_fields=[
+                "max_war_id",
+                "open_war_ids",
+                "last_full_sync_at",
+                "next_sync_at",
             ]
         )
+        return open_war_ids
 
 
 EveWarManager = EveWarManagerBase.from_queryset(EveWarQuerySet)
+
+
+class EveWarTargetQuerySet(models.QuerySet):
+    def active(self) -> models.QuerySet:
+        """Return war targets which are currently active."""
+        current = now()
+        return self.filter(active_from__lt=current).filter(
+            Q(active_until__isnull=True) | Q(active_until__gt=current)
+        )
+
+
+class EveWarTargetManagerBase(models.Manager):
+    def update_for_wars(
+        self, war_ids: Iterable[int], batch_size: int = 500
+    ) -> Set[int]:
+        """Update war targets for given wars from the stored wars.
+
+        War targets which are no longer part of a war are kept,
+        but their activity ends now.
+        This allows to find all alliances with changed war targets later.
+
+        Returns:
+        - IDs of alliances with changed war targets
+        """
+        from .models import EveWar
+
+        war_ids = set(war_ids)
+        if not war_ids:
+            return set()
+        wanted = dict()
+        wars = EveWar.objects.filter(id__in=war_ids, started__isnull=False)
+        allies = defaultdict(set)
+        for war_id, ally_id in EveWar.allies.through.objects.filter(
+            evewar_id__in=war_ids
+        ).values_list("evewar_id", "eveentity_id"):
+            allies[war_id].add(ally_id)
+        for war_id, aggressor_id, defender_id, started, finished in wars.values_list(
+            "id", "aggressor_id", "defender_id", "started", "finished"
+        ):
+            window = (started, finished)
+            for ally_id in {defender_id} | allies[war_id]:
+                wanted[(war_id, aggressor_id, ally_id)] = window
+                wanted[(war_id, ally_id, aggressor_id)] = window
+
+        current = now()
+        changed_alliance_ids = set()
+        changed_objs = []
+        for obj in self.filter(war_id__in=war_ids):
+            key = (obj.war_id, obj.alliance_id, obj.target_id)
+            window = wanted.pop(key, None)
+            if window is None:
+                if obj.active_until is None or obj.active_until > current:
+                    obj.active_until = current
+                else:
+                    continue
+            elif (obj.active_from, obj.active_until) != window:
+                obj.active_from, obj.active_until = window
+            else:
+                continue
+            obj.updated_at = current
+            changed_objs.append(obj)
+            changed_alliance_ids.add(obj.alliance_id)
+
+        new_objs = [
+            self.model(
+                war_id=war_id,
+                alliance_id=alliance_id,
+                target_id=target_id,
+                active_from=active_from,
+                active_until=active_until,
+                updated_at=current,
+            )
+            for (war_id, alliance_id, target_id), (
+                active_from,
+                active_until,
+            ) in wanted.items()
+        ]
+        changed_alliance_ids |= {obj.alliance_id for obj in new_objs}
+        self.bulk_create(new_objs, batch_size=batch_size, ignore_conflicts=True)
+        self.bulk_update(
+            changed_objs,
+            fields=["active_from", "active_until", "updated_at"],
+            batch_size=batch_size,
+        )
+        return changed_alliance_ids
+
+    def alliance_ids_changed_since(self, since: dt.datetime) -> Set[int]:
+        """Return IDs of alliances whose current war targets changed since a time.
+
+        This includes war targets which have been updated
+        and war targets which became active or inactive in the meantime.
+        """
+        current = now()
+        return set(
+            self.filter(
+                Q(updated_at__gte=since)
+                | Q(active_from__gte=since, active_from__lte=current)
+                | Q(active_until__gte=since, active_until__lte=current)
+            )
+            .values_list("alliance_id", flat=True)
+            .distinct()
+        )
+
+
+EveWarTargetManager = EveWarTargetManagerBase.from_queryset(EveWarTargetQuerySet)
@@ -0,0 +1,69 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveuniverse", "0007_evetype_description"),
+        ("standingssync", "0001_initial_new_2"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EveWarTarget",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("active_from", models.DateTimeField()),
+                ("active_until", models.DateTimeField(default=None, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                (
+                    "alliance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="eveuniverse.eveentity",
+                    ),
+                ),
+                (
+                    "target",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="eveuniverse.eveentity",
+                    ),
+                ),
+                (
+                    "war",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="targets",
+                        to="standingssync.evewar",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="evewartarget",
+            index=models.Index(
+                fields=["alliance", "active_from", "active_until"],
+                name="standingssync_wt_active_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="evewartarget",
+            constraint=models.UniqueConstraint(
+                fields=("war", "alliance", "target"), name="fk_eve_war_target"
+            ),
+        ),
+    ]
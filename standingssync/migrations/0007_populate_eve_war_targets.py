@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def populate_war_targets(apps, schema_editor):
+    EveWar = apps.get_model("standingssync", "EveWar")
+    EveWarTarget = apps.get_model("standingssync", "EveWarTarget")
+    AlliesRelation = EveWar.allies.through
+    allies = dict()
+    for war_id, ally_id in AlliesRelation.objects.values_list(
+        "evewar_id", "eveentity_id"
+    ):
+        allies.setdefault(war_id, set()).add(ally_id)
+    war_targets = dict()
+    for war_id, aggressor_id, defender_id, started, finished in (
+        EveWar.objects.filter(started__isnull=False)
+        .values_list("id", "aggressor_id", "defender_id", "started", "finished")
+        .iterator()
+    ):
+        for other_id in {defender_id} | allies.get(war_id, set()):
+            for alliance_id, target_id in [
+                (aggressor_id, other_id),
+                (other_id, aggressor_id),
+            ]:
+                war_targets[(war_id, alliance_id, target_id)] = EveWarTarget(
+                    war_id=war_id,
+                    alliance_id=alliance_id,
+                    target_id=target_id,
+                    active_from=started,
+                    active_until=finished,
+                )
+    EveWarTarget.objects.bulk_create(war_targets.values(), batch_size=500)
+
+
+def remove_war_targets(apps, schema_editor):
+    EveWarTarget = apps.get_model("standingssync", "EveWarTarget")
+    EveWarTarget.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingssync", "0006_add_eve_war_target"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_war_targets, remove_war_targets),
+    ]
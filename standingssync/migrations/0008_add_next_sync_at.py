@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingssync", "0007_populate_eve_war_targets"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EveWarSyncState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("next_sync_at", models.DateTimeField(default=None, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="syncmanager",
+            name="next_sync_at",
+            field=models.DateTimeField(db_index=True, default=None, null=True),
+        ),
+    ]
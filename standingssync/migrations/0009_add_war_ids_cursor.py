@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingssync", "0008_add_next_sync_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evewarsyncstate",
+            name="last_full_sync_at",
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="evewarsyncstate",
+            name="max_war_id",
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="evewarsyncstate",
+            name="open_war_ids",
+            field=models.JSONField(default=list),
+        ),
+    ]
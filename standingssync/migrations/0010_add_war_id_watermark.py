@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:11
+
+from django.db import migrations, models
+
+import standingssync.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingssync", "0009_add_war_ids_cursor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evewarsyncstate",
+            name="min_unfinished_war_id",
+            field=models.PositiveIntegerField(default=719979),
+        ),
+        migrations.AddField(
+            model_name="evewarsyncstate",
+            name="special_war_ids",
+            field=models.JSONField(
+                default=standingssync.models.default_special_war_ids
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingssync", "0010_add_war_id_watermark"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evewar",
+            name="next_check_at",
+            field=models.DateTimeField(db_index=True, default=None, null=True),
+        ),
+    ]
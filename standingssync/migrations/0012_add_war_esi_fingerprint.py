@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingssync", "0011_add_war_next_check_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evewar",
+            name="esi_fingerprint",
+            field=models.CharField(default="", max_length=32),
+        ),
+    ]
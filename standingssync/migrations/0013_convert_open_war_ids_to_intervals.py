@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def forward(apps, schema_editor):
+    EveWarSyncState = apps.get_model("standingssync", "EveWarSyncState")
+    for state in EveWarSyncState.objects.all():
+        intervals = []
+        for war_id in sorted(set(state.open_war_ids)):
+            if intervals and intervals[-1][1] + 1 == war_id:
+                intervals[-1][1] = war_id
+            else:
+                intervals.append([war_id, war_id])
+        state.open_war_ids = intervals
+        state.save(update_fields=["open_war_ids"])
+
+
+def reverse(apps, schema_editor):
+    EveWarSyncState = apps.get_model("standingssync", "EveWarSyncState")
+    for state in EveWarSyncState.objects.all():
+        state.open_war_ids = [
+            war_id
+            for first, last in state.open_war_ids
+            for war_id in range(first, last + 1)
+        ]
+        state.save(update_fields=["open_war_ids"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingssync", "0012_add_war_esi_fingerprint"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, reverse),
+    ]
@@ -1,7 +1,7 @@
-import hashlib
-import json
-from typing import Optional
+import datetime as dt
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+from django.core.cache import cache
 from django.db import models, transaction
 from django.utils.timezone import now
 from esi.errors import TokenExpiredError, TokenInvalidError
@@ -12,21 +12,55 @@ from allianceauth.authentication.models import CharacterOwnership
 from allianceauth.eveonline.models import EveAllianceInfo, EveCharacter
 from allianceauth.notifications import notify
 from allianceauth.services.hooks import get_extension_logger
-from app_utils.helpers import chunks
 from app_utils.logging import LoggerAddTag
 
 from . import __title__
 from .app_settings import (
     STANDINGSSYNC_ADD_WAR_TARGETS,
     STANDINGSSYNC_CHAR_MIN_STANDING,
+    STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID,
     STANDINGSSYNC_REPLACE_CONTACTS,
+    STANDINGSSYNC_SPECIAL_WAR_IDS,
+    STANDINGSSYNC_WAR_IDS_FULL_SYNC_INTERVAL,
     STANDINGSSYNC_WAR_TARGETS_LABEL_NAME,
 )
-from .managers import EveContactManager, EveWarManager
+from .core.contacts_hash import ContactsHasher
+from .core.contacts_plan import (
+    ContactsPlan,
+    ContactState,
+    contacts_from_esi,
+    label_ids_for,
+)
+from .core.contacts_snapshot import ContactsSnapshot
+from .core.esi_etags import (
+    ENDPOINT_ALLIANCE_CONTACTS,
+    ENDPOINT_CHARACTER_CONTACTS,
+    ENDPOINT_CHARACTER_LABELS,
+    EsiConditionalResult,
+    conditional_results,
+)
+from .core.esi_expires import expires_from_headers
+from .core.esi_pipeline import ContactsWritePipeline
+from .core.eve_entities import bulk_get_or_create_eve_entities
+from .core.interval_set import IntervalSet
+from .core.standings import EffectiveStandingResolver
+from .managers import (
+    EveContactManager,
+    EveWarManager,
+    EveWarTargetManager,
+    SyncedCharacterManager,
+    SyncManagerManager,
+)
 from .providers import esi
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
+# Max number of entity IDs to filter contacts by. Above all contacts are loaded.
+MAX_ENTITY_IDS_FILTER = 1000
+
+# Timeout for contact snapshots in the cache in seconds
+CONTACTS_SNAPSHOT_CACHE_TIMEOUT = 3600 * 24
+
 
 class _SyncBaseModel(models.Model):
     """Base for sync models"""
@@ -68,6 +102,10 @@ class SyncManager(_SyncBaseModel):
         CharacterOwnership, on_delete=models.SET_NULL, null=True, default=None
     )
     last_error = models.IntegerField(choices=Error.choices, default=Error.NONE)
+    # when the alliance contacts expire in the ESI cache
+    next_sync_at = models.DateTimeField(null=True, default=None, db_index=True)
+
+    objects = SyncManagerManager()
 
     def __str__(self):
         if self.character_ownership is not None:
@@ -76,27 +114,128 @@ class SyncManager(_SyncBaseModel):
             character_name = "None"
         return "{} ({})".format(self.alliance.alliance_name, character_name)
 
+    def contacts_snapshot(self) -> ContactsSnapshot:
+        """Return snapshot of the contacts at the current version.
+
+        The snapshot is shared through the cache
+        and created from the database on a cache miss.
+        """
+        cache_key = self._contacts_snapshot_cache_key()
+        try:
+            snapshot = cache.get(cache_key)
+        except Exception:
+            logger.warning("%s: Failed to read contacts snapshot from cache", self)
+            snapshot = None
+        if snapshot is None:
+            snapshot = self._store_contacts_snapshot()
+        return snapshot
+
+    def _store_contacts_snapshot(self) -> ContactsSnapshot:
+        """Create snapshot of the contacts at the current version from the database
+        and store it in the cache.
+
+        The version hash and the contacts are read together
+        while the manager is locked, so the snapshot is always stored
+        under the version hash matching its contacts.
+        """
+        with transaction.atomic():
+            version_hash = (
+                SyncManager.objects.select_for_update()
+                .values_list("version_hash", flat=True)
+                .get(pk=self.pk)
+            )
+            contact_set = self.contacts.contact_set()
+        snapshot = ContactsSnapshot(version_hash=version_hash, contact_set=contact_set)
+        try:
+            cache.set(
+                self._contacts_snapshot_cache_key(version_hash),
+                snapshot,
+                timeout=CONTACTS_SNAPSHOT_CACHE_TIMEOUT,
+            )
+        except Exception:
+            logger.warning("%s: Failed to write contacts snapshot to cache", self)
+        return snapshot
+
+    def _contacts_snapshot_cache_key(self, version_hash: str = None) -> str:
+        if version_hash is None:
+            version_hash = self.version_hash
+        return f"standingssync-contacts-snapshot-{self.pk}-{version_hash}"
+
+    def deactivate_ineligible_characters(self) -> Set[int]:
+        """Deactivate all synced characters, which are no longer blue
+        with this alliance and notify their users.
+
+        Needs a constant number of queries apart from the notifications.
+
+        Returns:
+        - PKs of deactivated synced characters
+        """
+        snapshot = self.contacts_snapshot()
+        if not snapshot:
+            return set()
+        synced_characters = {
+            obj.character_ownership.character.character_id: obj
+            for obj in self.synced_characters.select_related(
+                "character_ownership__character", "character_ownership__user"
+            )
+        }
+        standings = snapshot.standing_resolver().effective_standings(
+            obj.character_ownership.character for obj in synced_characters.values()
+        )
+        eligible_ids = {
+            character_id
+            for character_id, standing in standings.items()
+            if standing >= STANDINGSSYNC_CHAR_MIN_STANDING
+        }
+        ineligible_ids = synced_characters.keys() - eligible_ids
+        if not ineligible_ids:
+            return set()
+        messages = {
+            synced_characters[character_id]: (
+                "your character is no longer blue with the alliance. "
+                f"The standing value is: {standings[character_id]:.1f} "
+            )
+            for character_id in ineligible_ids
+        }
+        logger.info(
+            "%s: Deactivating sync for %d characters, which are no longer blue",
+            self,
+            len(messages),
+        )
+        SyncedCharacter.deactivate_sync_bulk(messages)
+        return {obj.pk for obj in messages.keys()}
+
     def get_effective_standing(self, character: EveCharacter) -> float:
         """return the effective standing with this alliance"""
+        return self.get_effective_standings([character])[character.character_id]
 
-        contact_found = None
-        try:
-            contact_found = self.contacts.get(eve_entity_id=character.character_id)
-        except EveContact.DoesNotExist:
-            try:
-                contact_found = self.contacts.get(
-                    eve_entity_id=character.corporation_id
-                )
-            except EveContact.DoesNotExist:
-                if character.alliance_id:
-                    try:
-                        contact_found = self.contacts.get(
-                            eve_entity_id=character.alliance_id
-                        )
-                    except EveContact.DoesNotExist:
-                        pass
+    def get_effective_standings(
+        self, characters: Iterable[EveCharacter]
+    ) -> Dict[int, float]:
+        """return the effective standings with this alliance for many characters
+        mapped by character ID. Needs a single query.
+        """
+        characters = list(characters)
+        entity_ids = EffectiveStandingResolver.entity_ids_for(characters)
+        if len(entity_ids) > MAX_ENTITY_IDS_FILTER:
+            entity_ids = None  # cheaper to load all contacts
+        resolver = self.effective_standing_resolver(entity_ids)
+        return resolver.effective_standings(characters)
+
+    def effective_standing_resolver(
+        self, entity_ids: Iterable[int] = None
+    ) -> EffectiveStandingResolver:
+        """return resolver for effective standings with this alliance.
 
-        return contact_found.standing if contact_found is not None else 0.0
+        Args:
+        - entity_ids: only load contacts for these entities, all contacts if None
+        """
+        contacts = self.contacts.all()
+        if entity_ids is not None:
+            contacts = contacts.filter(eve_entity_id__in=entity_ids)
+        return EffectiveStandingResolver(
+            dict(contacts.values_list("eve_entity_id", "standing"))
+        )
 
     def update_from_esi(self, force_sync: bool = False) -> Optional[str]:
         """Update this sync manager from ESi
@@ -155,13 +294,23 @@ class SyncManager(_SyncBaseModel):
     def _perform_update_from_esi(self, token, force_sync) -> str:
         # get alliance contacts
         alliance_id = self.character_ownership.character.alliance_id
-        contacts_raw = esi.client.Contacts.get_alliances_alliance_id_contacts(
-            token=token.valid_access_token(), alliance_id=alliance_id
-        ).results()
-        contacts = {int(row["contact_id"]): row for row in contacts_raw}
+        result = self._fetch_alliance_contacts(token, alliance_id)
+        if not result.is_modified:
+            if (
+                not force_sync
+                and self.version_hash
+                and not self._war_targets_changed(alliance_id)
+            ):
+                logger.info("%s: Alliance contacts are not modified.", self)
+                self.next_sync_at = expires_from_headers(result.headers)
+                return self.version_hash
+            result = self._fetch_alliance_contacts(token, alliance_id, use_etag=False)
+
+        next_sync_at = expires_from_headers(result.headers)
+        contacts = {int(row["contact_id"]): row for row in result.data}
 
         if STANDINGSSYNC_ADD_WAR_TARGETS:
-            war_targets = EveWar.objects.war_targets(alliance_id)
+            war_targets = list(EveWar.objects.war_targets(alliance_id))
             for war_target in war_targets:
                 contacts[war_target.id] = self._to_esi_dict(war_target, -10.0)
             war_target_ids = {war_target.id for war_target in war_targets}
@@ -169,7 +318,7 @@ class SyncManager(_SyncBaseModel):
             war_target_ids = set()
 
         # determine if contacts have changed by comparing their hashes
-        new_version_hash = self._calculate_version_hash(contacts)
+        new_version_hash = self._calculate_version_hash(contacts, war_target_ids)
         if force_sync or new_version_hash != self.version_hash:
             logger.info(
                 "%s: Storing alliance update with %d contacts", self, len(contacts)
@@ -181,24 +330,51 @@ class SyncManager(_SyncBaseModel):
                 "contact_type": "alliance",
                 "standing": 10,
             }
+            bulk_get_or_create_eve_entities(contacts.keys())
             with transaction.atomic():
                 self.version_hash = new_version_hash
                 self.save()
-                self.contacts.all().delete()
-                contacts = [
-                    EveContact(
-                        manager=self,
-                        eve_entity=EveEntity.objects.get_or_create(id=contact_id)[0],
-                        standing=contact["standing"],
-                        is_war_target=contact_id in war_target_ids,
-                    )
-                    for contact_id, contact in contacts.items()
-                ]
-                EveContact.objects.bulk_create(contacts, batch_size=500)
+                change_set = EveContact.objects.update_for_manager(
+                    manager=self, contacts=contacts, war_target_ids=war_target_ids
+                )
+            logger.info("%s: Stored alliance contacts: %s", self, change_set)
+            self._store_contacts_snapshot()
         else:
             logger.info("%s: Alliance contacts are unchanged.", self)
+        self.next_sync_at = next_sync_at
+        result.confirm()
         return new_version_hash
 
+    @staticmethod
+    def _fetch_alliance_contacts(
+        token: Token, alliance_id: int, use_etag: bool = True
+    ) -> EsiConditionalResult:
+        return conditional_results(
+            ENDPOINT_ALLIANCE_CONTACTS,
+            esi.client.Contacts.get_alliances_alliance_id_contacts,
+            params={"alliance_id": alliance_id},
+            token=token.valid_access_token(),
+            use_etag=use_etag,
+            paginated=True,
+        )
+
+    def _war_targets_changed(self, alliance_id: int) -> bool:
+        """Return True if the current war targets of the alliance
+        differ from the stored war targets, else False.
+
+        Compares with the stored contacts instead of checking for changes
+        since the last sync, so changes made during or before a failed sync
+        are not lost.
+        """
+        if not STANDINGSSYNC_ADD_WAR_TARGETS:
+            return False
+        stored_ids = set(
+            self.contacts.filter(is_war_target=True).values_list(
+                "eve_entity_id", flat=True
+            )
+        )
+        return EveWar.objects.war_target_ids(alliance_id) != stored_ids
+
     @staticmethod
     def _to_esi_dict(eve_entity: EveEntity, standing: float) -> dict:
         """Convert EveEntity to ESI contact dict."""
@@ -209,9 +385,9 @@ class SyncManager(_SyncBaseModel):
         }
 
     @staticmethod
-    def _calculate_version_hash(contacts: dict) -> str:
+    def _calculate_version_hash(contacts: dict, war_target_ids: set = None) -> str:
         """Calculate hash for contacts."""
-        return hashlib.md5(json.dumps(contacts).encode("utf-8")).hexdigest()
+        return ContactsHasher.from_esi_contacts(contacts, war_target_ids).version_hash()
 
     @classmethod
     def get_esi_scopes(cls) -> list:
@@ -238,6 +414,8 @@ class SyncedCharacter(_SyncBaseModel):
     last_error = models.IntegerField(choices=Error.choices, default=Error.NONE)
     has_war_targets_label = models.BooleanField(default=None, null=True)
 
+    objects = SyncedCharacterManager()
+
     def __str__(self):
         return self.character_ownership.character.character_name
 
@@ -252,7 +430,12 @@ class SyncedCharacter(_SyncBaseModel):
             return "OK"
         return "Not synced yet"
 
-    def update(self, force_sync: bool = False) -> bool:
+    def update(
+        self,
+        force_sync: bool = False,
+        token: Optional[Token] = None,
+        has_permission: Optional[bool] = None,
+    ) -> bool:
         """updates in-game contacts for given character
 
         Will delete the sync character if necessary,
@@ -260,15 +443,20 @@ class SyncedCharacter(_SyncBaseModel):
 
         Args:
         - force_sync: will ignore version_hash if set to true
+        - token: prefetched valid token, will be fetched if not provided
+        - has_permission: prefetched permission of the user,
+            will be checked if not provided
 
         Returns:
         - False if the sync character was deleted, True otherwise
         """
         # abort if owner does not have sufficient permissions
         logger.info("%s: Updating contacts", self)
-        if not self.character_ownership.user.has_perm(
-            "standingssync.add_syncedcharacter"
-        ):
+        if has_permission is None:
+            has_permission = self.character_ownership.user.has_perm(
+                "standingssync.add_syncedcharacter"
+            )
+        if not has_permission:
             logger.info(
                 "%s: sync deactivated due to insufficient user permissions", self
             )
@@ -282,15 +470,17 @@ class SyncedCharacter(_SyncBaseModel):
             )
             return True
 
-        token = self._fetch_token()
         if not token:
-            return False
+            token = self._fetch_token()
+            if not token:
+                return False
 
-        if not self.manager.contacts.exists():
+        snapshot = self.manager.contacts_snapshot()
+        if not snapshot:
             logger.info("%s: No contacts to sync", self)
             return True
 
-        character_eff_standing = self.manager.get_effective_standing(
+        character_eff_standing = snapshot.standing_resolver().effective_standing(
             self.character_ownership.character
         )
         if character_eff_standing < STANDINGSSYNC_CHAR_MIN_STANDING:
@@ -308,103 +498,56 @@ class SyncedCharacter(_SyncBaseModel):
 
         character_id = self.character_ownership.character.character_id
         logger.info("%s: Fetching current contacts", self)
-        character_contacts_raw = (
-            esi.client.Contacts.get_characters_character_id_contacts(
-                token=token.valid_access_token(), character_id=character_id
-            ).results()
+        contacts_result = conditional_results(
+            ENDPOINT_CHARACTER_CONTACTS,
+            esi.client.Contacts.get_characters_character_id_contacts,
+            params={"character_id": character_id},
+            token=token.valid_access_token(),
+            keep_data=True,
+            paginated=True,
         )
-        character_contacts = {
-            contact["contact_id"]: contact for contact in character_contacts_raw
-        }
+        contacts_result.confirm()
+        current_contacts = contacts_from_esi(contacts_result.data)
         logger.info("%s: Fetching current labels", self)
-        labels_raw = esi.client.Contacts.get_characters_character_id_contacts_labels(
-            character_id=character_id, token=token.valid_access_token()
-        ).results()
-        war_target_id = self._determine_war_target_id(labels_raw)
+        labels_result = conditional_results(
+            ENDPOINT_CHARACTER_LABELS,
+            esi.client.Contacts.get_characters_character_id_contacts_labels,
+            params={"character_id": character_id},
+            token=token.valid_access_token(),
+            keep_data=True,
+        )
+        labels_result.confirm()
+        war_target_id = self._determine_war_target_id(labels_result.data)
         if war_target_id:
             logger.debug("%s: Has war target label", self)
             self.has_war_targets_label = True
-            self.save()
-            ids_to_delete = [
-                contact_id
-                for contact_id, contact in character_contacts.items()
-                if contact["label_ids"] and war_target_id in contact["label_ids"]
-            ]
-            if ids_to_delete:
-                logger.info("%s: Removing old war target contacts", self)
-                self._esi_delete_contacts(
-                    character_id=character_id, token=token, contact_ids=ids_to_delete
-                )
-                for contact_id in ids_to_delete:
-                    del character_contacts[contact_id]
         else:
             logger.debug("%s: Does not have war target label", self)
             self.has_war_targets_label = False
-            self.save()
+        self.save()
 
         if STANDINGSSYNC_REPLACE_CONTACTS:
-            logger.info("%s: Deleting current contacts", self)
-            self._esi_delete_contacts(
-                character_id=character_id,
-                token=token,
-                contact_ids=list(character_contacts.keys()),
+            desired_contacts = self._desired_contacts_replace(
+                snapshot, character_id, war_target_id
             )
-            if STANDINGSSYNC_ADD_WAR_TARGETS and war_target_id:
-                logger.info("%s: Writing alliance contacts and war targets", self)
-                self._esi_update(
-                    character_id=character_id,
-                    token=token,
-                    contacts_by_standing=self.manager.contacts.exclude(
-                        eve_entity_id=character_id
-                    )
-                    .filter(is_war_target=False)
-                    .grouped_by_standing(),
-                    esi_method=esi.client.Contacts.post_characters_character_id_contacts,
-                )
-                self._esi_update(
-                    character_id=character_id,
-                    token=token,
-                    contacts_by_standing=self.manager.contacts.filter(
-                        is_war_target=True
-                    ).grouped_by_standing(),
-                    esi_method=esi.client.Contacts.post_characters_character_id_contacts,
-                    label_ids=[war_target_id],
-                )
-            else:
-                logger.info("%s: Writing alliance contacts", self)
-                self._esi_update(
-                    character_id=character_id,
-                    token=token,
-                    contacts_by_standing=self.manager.contacts.exclude(
-                        eve_entity_id=character_id
-                    ).grouped_by_standing(),
-                    esi_method=esi.client.Contacts.post_characters_character_id_contacts,
-                )
         else:
-            contacts = self.manager.contacts.filter(is_war_target=True)
-            if contacts.exists():
-                logger.info("%s: Update existing contacts to war target", self)
-                contacts_by_standing = contacts.filter(
-                    eve_entity_id__in=character_contacts.keys()
-                ).grouped_by_standing()
-                self._esi_update(
-                    character_id=character_id,
-                    token=token,
-                    contacts_by_standing=contacts_by_standing,
-                    esi_method=esi.client.Contacts.put_characters_character_id_contacts,
-                    label_ids=[war_target_id] if war_target_id else None,
-                )
-                logger.info("%s: Add new war target contacts", self)
-                contacts_by_standing = contacts.exclude(
-                    eve_entity_id__in=character_contacts.keys()
-                ).grouped_by_standing()
-                self._esi_update(
-                    character_id=character_id,
-                    token=token,
-                    contacts_by_standing=contacts_by_standing,
-                    esi_method=esi.client.Contacts.post_characters_character_id_contacts,
-                    label_ids=[war_target_id] if war_target_id else None,
-                )
+            desired_contacts = self._desired_contacts_war_targets_only(
+                snapshot, current_contacts, war_target_id
+            )
+        plan = ContactsPlan.create(current=current_contacts, desired=desired_contacts)
+        if plan:
+            logger.info(
+                "%s: Updating contacts: %d to delete, %d to update, %d to add",
+                self,
+                len(plan.to_delete),
+                len(plan.ids_to_update),
+                len(plan.ids_to_add),
+            )
+            # contacts of the character are changed by us, so the ETag is outdated
+            contacts_result.invalidate()
+            self._esi_execute_plan(character_id=character_id, token=token, plan=plan)
+        else:
+            logger.info("%s: Contacts are already up-to-date", self)
 
         # store updated version hash with character
         self.version_hash = self.manager.version_hash
@@ -425,38 +568,61 @@ class SyncedCharacter(_SyncBaseModel):
         return war_target_id
 
     @staticmethod
-    def _esi_delete_contacts(character_id: int, token: Token, contact_ids: list):
-        max_items = 20
-        contact_ids_chunks = chunks(contact_ids, max_items)
-        for contact_ids_chunk in contact_ids_chunks:
-            esi.client.Contacts.delete_characters_character_id_contacts(
-                token=token.valid_access_token(),
-                character_id=character_id,
-                contact_ids=contact_ids_chunk,
-            ).results()
+    def _desired_contacts_replace(
+        snapshot: ContactsSnapshot, character_id: int, war_target_id: Optional[int]
+    ) -> Dict[int, ContactState]:
+        """Return desired contacts when replacing all contacts of a character."""
+        add_war_target_label = STANDINGSSYNC_ADD_WAR_TARGETS and war_target_id
+        return {
+            contact_id: ContactState(
+                standing=standing,
+                label_ids=label_ids_for(
+                    is_war_target, war_target_id if add_war_target_label else None
+                ),
+            )
+            for contact_id, standing, is_war_target in snapshot.contacts()
+            if contact_id != character_id
+        }
 
     @staticmethod
-    def _esi_update(
-        character_id: int,
-        token: Token,
-        contacts_by_standing: dict,
-        esi_method,
-        label_ids: list = None,
-        max_items: int = 100,
-    ):
-        for standing in contacts_by_standing:
-            contact_ids_chunks = chunks(
-                [contact.eve_entity_id for contact in contacts_by_standing[standing]],
-                max_items,
+    def _desired_contacts_war_targets_only(
+        snapshot: ContactsSnapshot,
+        current_contacts: Dict[int, ContactState],
+        war_target_id: Optional[int],
+    ) -> Dict[int, ContactState]:
+        """Return desired contacts when only updating war targets of a character.
+
+        Outdated war targets are identified by the war targets label.
+        """
+        desired_contacts = {
+            contact_id: state
+            for contact_id, state in current_contacts.items()
+            if not war_target_id or war_target_id not in state.label_ids
+        }
+        for contact_id, standing in snapshot.war_targets():
+            current_state = desired_contacts.get(contact_id)
+            label_ids = label_ids_for(True, war_target_id)
+            if current_state:
+                label_ids |= current_state.label_ids
+            desired_contacts[contact_id] = ContactState(
+                standing=standing, label_ids=label_ids
             )
-            for contact_ids_chunk in contact_ids_chunks:
-                esi_method(
-                    token=token.valid_access_token(),
-                    character_id=character_id,
-                    contact_ids=contact_ids_chunk,
-                    standing=standing,
-                    label_ids=label_ids if label_ids else [],
-                ).results()
+        return desired_contacts
+
+    @staticmethod
+    def _esi_execute_plan(character_id: int, token: Token, plan: ContactsPlan):
+        """Execute all ESI calls of a plan."""
+        pipeline = ContactsWritePipeline(
+            delete_method=esi.client.Contacts.delete_characters_character_id_contacts,
+            put_method=esi.client.Contacts.put_characters_character_id_contacts,
+            post_method=esi.client.Contacts.post_characters_character_id_contacts,
+        )
+        result = pipeline.execute(
+            character_id=character_id,
+            access_token=token.valid_access_token(),
+            plan=plan,
+        )
+        result.raise_for_errors()
 
     def _fetch_token(self) -> Optional[Token]:
         try:
@@ -487,18 +653,37 @@ class SyncedCharacter(_SyncBaseModel):
         return token
 
     def _deactivate_sync(self, message):
+        title, message = self._deactivation_notification(message)
+        notify(self.character_ownership.user, title, message)
+        self.delete()
+
+    def _deactivation_notification(self, message) -> Tuple[str, str]:
+        """Return title and message for notifying about a deactivated sync."""
         message = (
             "Standings Sync has been deactivated for your "
             f"character {self}, because {message}.\n"
             "Feel free to activate sync for your character again, "
             "once the issue has been resolved."
         )
-        notify(
-            self.character_ownership.user,
-            f"Standings Sync deactivated for {self}",
-            message,
-        )
-        self.delete()
+        return f"Standings Sync deactivated for {self}", message
+
+    @classmethod
+    def deactivate_sync_bulk(cls, messages: Dict["SyncedCharacter", str]) -> None:
+        """Deactivate sync for many characters and notify their users.
+
+        Deactivates all characters with one query.
+        Users are notified one by one through the notifications API,
+        so that limits, caches and signals of notifications are respected.
+
+        Args:
+        - messages: reason for deactivation mapped by synced character
+        """
+        if not messages:
+            return
+        cls.objects.filter(pk__in=[obj.pk for obj in messages.keys()]).delete()
+        for synced_character, message in messages.items():
+            title, message = synced_character._deactivation_notification(message)
+            notify(synced_character.character_ownership.user, title, message)
 
     @staticmethod
     def get_esi_scopes() -> list:
@@ -543,8 +728,189 @@ class EveWar(models.Model):
     is_open_for_allies = models.BooleanField()
     retracted = models.DateTimeField(null=True, default=None)
     started = models.DateTimeField(null=True, default=None, db_index=True)
+    # when the war should be checked again on ESI, None if it is due now
+    next_check_at = models.DateTimeField(null=True, default=None, db_index=True)
+    # fingerprint of the ESI payload, when the war was last written
+    esi_fingerprint = models.CharField(max_length=32, default="")
 
     objects = EveWarManager()
 
     def __str__(self) -> str:
         return f"{self.aggressor} vs. {self.defender}"
+
+
+class EveWarTarget(models.Model):
+    """A war target of an alliance from an EveOnline war.
+
+    This is an index for quickly looking up current war targets,
+    which is maintained whenever a war is stored.
+    """
+
+    alliance = models.ForeignKey(EveEntity, on_delete=models.CASCADE, related_name="+")
+    target = models.ForeignKey(EveEntity, on_delete=models.CASCADE, related_name="+")
+    war = models.ForeignKey(EveWar, on_delete=models.CASCADE, related_name="targets")
+    active_from = models.DateTimeField()
+    active_until = models.DateTimeField(null=True, default=None)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = EveWarTargetManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["war", "alliance", "target"], name="fk_eve_war_target"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["alliance", "active_from", "active_until"],
+                name="standingssync_wt_active_idx",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.alliance_id} -> {self.target_id} ({self.war_id})"
+
+
+# Smallest ID of unfinished wars, when the state was first created.
+DEFAULT_MIN_UNFINISHED_WAR_ID = 719979
+
+
+def default_special_war_ids() -> List[int]:
+    """Return IDs of unfinished wars below the default minimum war ID."""
+    return [
+        693125,
+        716071,
+        716072,
+        716073,
+        716864,
+        717695,
+        718307,
+        718387,
+        718575,
+        718576,
+        718619,
+        718637,
+        718638,
+        718639,
+        718640,
+        718941,
+        719186,
+        719187,
+        719188,
+        719189,
+        719226,
+        719331,
+        719336,
+        719337,
+        719423,
+        719745,
+        719751,
+        719854,
+        719890,
+    ]
+
+
+class EveWarSyncState(models.Model):
+    """State of syncing wars from ESI.
+
+    There is only one object, which is accessed with `load()`.
+    """
+
+    # when the list of wars expires in the ESI cache
+    next_sync_at = models.DateTimeField(null=True, default=None)
+    # highest war ID seen on ESI
+    max_war_id = models.PositiveIntegerField(null=True, default=None)
+    # IDs of wars seen on ESI, which were not yet known to be finished.
+    # Stored as intervals of first and last ID.
+    open_war_ids = models.JSONField(default=list)
+    # when the war IDs were last fetched completely from ESI
+    last_full_sync_at = models.DateTimeField(null=True, default=None)
+    # all wars with smaller IDs are known to be finished, except special wars
+    min_unfinished_war_id = models.PositiveIntegerField(
+        default=DEFAULT_MIN_UNFINISHED_WAR_ID
+    )
+    # IDs of unfinished wars below the minimum unfinished war ID
+    special_war_ids = models.JSONField(default=default_special_war_ids)
+
+    def __str__(self) -> str:
+        return f"next sync at {self.next_sync_at}"
+
+    def is_due(self) -> bool:
+        """Return True if wars should be synced now, else False."""
+        return self.next_sync_at is None or self.next_sync_at <= now()
+
+    def is_full_sync_due(self) -> bool:
+        """Return True if all war IDs should be fetched again, else False."""
+        return (
+            self.max_war_id is None
+            or self.last_full_sync_at is None
+            or self.last_full_sync_at
+            + dt.timedelta(seconds=STANDINGSSYNC_WAR_IDS_FULL_SYNC_INTERVAL)
+            <= now()
+        )
+
+    def effective_min_unfinished_war_id(self) -> int:
+        """Return minimum unfinished war ID, which can be overridden by a setting."""
+        if STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID is not None:
+            return STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID
+        return self.min_unfinished_war_id
+
+    def effective_special_war_ids(self) -> IntervalSet:
+        """Return special war IDs, which can be overridden by a setting."""
+        if STANDINGSSYNC_SPECIAL_WAR_IDS is not None:
+            return IntervalSet.from_ids(STANDINGSSYNC_SPECIAL_WAR_IDS)
+        return IntervalSet.from_ids(self.special_war_ids)
+
+    def open_war_id_set(self) -> IntervalSet:
+        """Return IDs of open wars."""
+        return IntervalSet.from_list(self.open_war_ids)
+
+    @classmethod
+    def load(cls) -> "EveWarSyncState":
+        """Return the state object."""
+        obj, _ = cls.objects.get_or_create(pk=1)
+        return obj
+
+    @classmethod
+    def update_war_id_watermark(cls) -> "EveWarSyncState":
+        """Advance the minimum unfinished war ID and remove finished special wars
+        based on the stored wars.
+
+        The minimum is never advanced past an open war,
+        which has not yet been stored or is not yet finished.
+        """
+        cls.load()
+        with transaction.atomic():
+            state = cls.objects.select_for_update().get(pk=1)
+            special_war_ids = set(state.special_war_ids)
+            special_war_ids.difference_update(
+                EveWar.objects.finished_war_ids(special_war_ids)
+            )
+            old_min_war_id = state.min_unfinished_war_id
+            open_war_ids = state.open_war_id_set() - IntervalSet.from_intervals(
+                [(0, old_min_war_id)]
+            )
+            open_war_ids -= EveWar.objects.finished_war_ids(open_war_ids)
+            min_stored_war_id = (
+                EveWar.objects.filter(id__gte=old_min_war_id)
+                .exclude(finished__lte=now())
+                .aggregate(models.Min("id"))["id__min"]
+            )
+            candidates = [obj for obj in (open_war_ids.min(), min_stored_war_id) if obj]
+            if candidates:
+                new_min_war_id = min(candidates)
+            elif state.max_war_id:
+                new_min_war_id = state.max_war_id + 1
+            else:
+                new_min_war_id = old_min_war_id
+            state.min_unfinished_war_id = max(new_min_war_id, old_min_war_id)
+            state.special_war_ids = sorted(special_war_ids)
+            state.save(update_fields=["min_unfinished_war_id", "special_war_ids"])
+        if state.min_unfinished_war_id != old_min_war_id:
+            logger.info(
+                "Advanced minimum unfinished war ID from %d to %d",
+                old_min_war_id,
+                state.min_unfinished_war_id,
+            )
+        return state
@@ -1,14 +1,29 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Dict, List
+
 from celery import shared_task
 
+from django.db import connections
 from eveuniverse.core.esitools import is_esi_online
 from eveuniverse.models import EveEntity
 from eveuniverse.tasks import update_unresolved_eve_entities
 
 from allianceauth.services.hooks import get_extension_logger
+from app_utils.helpers import chunks
 from app_utils.logging import LoggerAddTag
 
 from . import __title__
-from .models import EveWar, SyncedCharacter, SyncManager
+from .app_settings import (
+    STANDINGSSYNC_CHARACTER_SYNC_BATCH_SIZE,
+    STANDINGSSYNC_CHARACTER_SYNC_MAX_WORKERS,
+    STANDINGSSYNC_SYNC_TASK_LOCK_TIMEOUT,
+    STANDINGSSYNC_WARS_UPDATE_BATCH_SIZE,
+    STANDINGSSYNC_WARS_UPDATE_MAX_WORKERS,
+)
+from .core.task_lock import TaskLock
+from .models import EveWar, EveWarSyncState, SyncedCharacter, SyncManager
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
@@ -23,8 +38,11 @@ def run_regular_sync():
         logger.warning("ESI is not online. aborting")
         return
 
-    update_all_wars.apply_async(priority=DEFAULT_TASK_PRIORITY)
-    for sync_manager_pk in SyncManager.objects.values_list("pk", flat=True):
+    if EveWarSyncState.load().is_due():
+        update_all_wars.apply_async(priority=DEFAULT_TASK_PRIORITY)
+    else:
+        logger.info("Wars are not due for update yet")
+    for sync_manager_pk in SyncManager.objects.due().values_list("pk", flat=True):
         run_manager_sync.apply_async(
             args=[sync_manager_pk], priority=DEFAULT_TASK_PRIORITY
         )
@@ -39,9 +57,26 @@ def run_manager_sync(manager_pk: int, force_sync: bool = False) -> bool:
     - force_sync: will ignore version_hash if set to true
 
     Returns:
-    - True on success or False on error
+    - True on success or False on error or when the sync is already running
     """
+    lock = TaskLock(
+        "run_manager_sync", manager_pk, STANDINGSSYNC_SYNC_TASK_LOCK_TIMEOUT
+    )
+    if not lock.acquire():
+        lock.skip(force_sync)
+        return False
+    try:
+        return _run_manager_sync(manager_pk, force_sync)
+    finally:
+        rerun_force_sync = lock.release()
+        if rerun_force_sync is not None:
+            run_manager_sync.apply_async(
+                kwargs={"manager_pk": manager_pk, "force_sync": rerun_force_sync},
+                priority=DEFAULT_TASK_PRIORITY,
+            )
+
 
+def _run_manager_sync(manager_pk: int, force_sync: bool) -> bool:
     sync_manager = SyncManager.objects.get(pk=manager_pk)
     try:
         new_version_hash = sync_manager.update_from_esi(force_sync)
@@ -55,17 +90,27 @@ def run_manager_sync(manager_pk: int, force_sync: bool = False) -> bool:
     if not new_version_hash:
         return False
 
+    sync_manager.deactivate_ineligible_characters()
     if force_sync:
         alts_need_syncing = sync_manager.synced_characters.values_list("pk", flat=True)
     else:
         alts_need_syncing = sync_manager.synced_characters.exclude(
             version_hash=new_version_hash
         ).values_list("pk", flat=True)
-    for character_pk in alts_need_syncing:
-        run_character_sync.apply_async(
-            kwargs={"sync_char_pk": character_pk, "force_sync": force_sync},
-            priority=DEFAULT_TASK_PRIORITY,
-        )
+    if STANDINGSSYNC_CHARACTER_SYNC_BATCH_SIZE > 0:
+        for character_pks in chunks(
+            sorted(alts_need_syncing), STANDINGSSYNC_CHARACTER_SYNC_BATCH_SIZE
+        ):
+            run_character_syncs.apply_async(
+                kwargs={"sync_char_pks": character_pks, "force_sync": force_sync},
+                priority=DEFAULT_TASK_PRIORITY,
+            )
+    else:
+        for character_pk in alts_need_syncing:
+            run_character_sync.apply_async(
+                kwargs={"sync_char_pk": character_pk, "force_sync": force_sync},
+                priority=DEFAULT_TASK_PRIORITY,
+            )
 
     return True
 
@@ -79,9 +124,27 @@ def run_character_sync(sync_char_pk: int, force_sync: bool = False) -> bool:
     - force_sync: will ignore version_hash if set to true
 
     Returns:
-    - False if sync failed and the sync character was deleted, True otherwise
+    - False if sync failed and the sync character was deleted
+        or when the sync is already running, True otherwise
     """
+    lock = TaskLock(
+        "run_character_sync", sync_char_pk, STANDINGSSYNC_SYNC_TASK_LOCK_TIMEOUT
+    )
+    if not lock.acquire():
+        lock.skip(force_sync)
+        return False
+    try:
+        return _run_character_sync(sync_char_pk, force_sync)
+    finally:
+        rerun_force_sync = lock.release()
+        if rerun_force_sync is not None:
+            run_character_sync.apply_async(
+                kwargs={"sync_char_pk": sync_char_pk, "force_sync": rerun_force_sync},
+                priority=DEFAULT_TASK_PRIORITY,
+            )
 
+
+def _run_character_sync(sync_char_pk: int, force_sync: bool) -> bool:
     synced_character = SyncedCharacter.objects.get(pk=sync_char_pk)
     try:
         return synced_character.update(force_sync)
@@ -91,15 +154,138 @@ def run_character_sync(sync_char_pk: int, force_sync: bool = False) -> bool:
         raise ex
 
 
+class CharacterSyncOutcome(str, Enum):
+    """Outcome of a character sync within a batch."""
+
+    OK = "ok"
+    DEACTIVATED = "deactivated"
+    SKIPPED = "skipped"
+    ERROR = "error"
+    NOT_FOUND = "not_found"
+
+
+@shared_task
+def run_character_syncs(
+    sync_char_pks: List[int], force_sync: bool = False
+) -> Dict[int, str]:
+    """updates in-game contacts for a batch of characters
+
+    All characters are loaded with their related objects, tokens and permissions
+    in a few queries. The syncs are run in parallel with bounded concurrency.
+
+    Args:
+    - sync_char_pks: primary keys of sync characters to run sync for
+    - force_sync: will ignore version_hash if set to true
+
+    Returns:
+    - outcome of each sync mapped by primary key of sync character
+    """
+    synced_characters_qs = SyncedCharacter.objects.filter(pk__in=sync_char_pks)
+    synced_characters = list(synced_characters_qs.select_related_for_sync())
+    tokens = synced_characters_qs.valid_tokens()
+    user_ids_with_permission = synced_characters_qs.user_ids_with_permission()
+    outcomes = {pk: CharacterSyncOutcome.NOT_FOUND for pk in sync_char_pks}
+
+    def sync_character(synced_character: SyncedCharacter) -> CharacterSyncOutcome:
+        return _run_character_sync_in_batch(
+            synced_character=synced_character,
+            force_sync=force_sync,
+            token=tokens.get(synced_character.pk),
+            has_permission=(
+                synced_character.character_ownership.user_id in user_ids_with_permission
+            ),
+        )
+
+    def sync_character_in_thread(synced_character):
+        try:
+            return sync_character(synced_character)
+        finally:
+            connections.close_all()
+
+    max_workers = min(STANDINGSSYNC_CHARACTER_SYNC_MAX_WORKERS, len(synced_characters))
+    if max_workers <= 1:
+        for synced_character in synced_characters:
+            outcomes[synced_character.pk] = sync_character(synced_character)
+    else:
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="standingssync-sync"
+        ) as executor:
+            for synced_character, outcome in zip(
+                synced_characters,
+                executor.map(sync_character_in_thread, synced_characters),
+            ):
+                outcomes[synced_character.pk] = outcome
+
+    logger.info(
+        "Synced batch of %d characters: %s",
+        len(sync_char_pks),
+        dict(Counter(outcome.value for outcome in outcomes.values())),
+    )
+    return {pk: outcome.value for pk, outcome in outcomes.items()}
+
+
+def _run_character_sync_in_batch(
+    synced_character: SyncedCharacter, force_sync: bool, token, has_permission: bool
+) -> CharacterSyncOutcome:
+    lock = TaskLock(
+        "run_character_sync", synced_character.pk, STANDINGSSYNC_SYNC_TASK_LOCK_TIMEOUT
+    )
+    if not lock.acquire():
+        lock.skip(force_sync)
+        return CharacterSyncOutcome.SKIPPED
+    try:
+        is_ok = synced_character.update(
+            force_sync, token=token, has_permission=has_permission
+        )
+    except Exception as ex:
+        logger.error(
+            "%s: An unexpected error ocurred: %s", synced_character, ex, exc_info=True
+        )
+        synced_character.set_sync_status(SyncedCharacter.Error.UNKNOWN)
+        return CharacterSyncOutcome.ERROR
+    finally:
+        rerun_force_sync = lock.release()
+        if rerun_force_sync is not None:
+            run_character_sync.apply_async(
+                kwargs={
+                    "sync_char_pk": synced_character.pk,
+                    "force_sync": rerun_force_sync,
+                },
+                priority=DEFAULT_TASK_PRIORITY,
+            )
+    return CharacterSyncOutcome.OK if is_ok else CharacterSyncOutcome.DEACTIVATED
+
+
 @shared_task
 def update_all_wars():
+    EveWarSyncState.update_war_id_watermark()
     relevant_war_ids = EveWar.objects.calc_relevant_war_ids()
     logger.info("Fetching details for %s wars from ESI", len(relevant_war_ids))
-    for war_id in relevant_war_ids:
-        update_war.apply_async(args=[war_id], priority=DEFAULT_TASK_PRIORITY)
+    if STANDINGSSYNC_WARS_UPDATE_BATCH_SIZE > 0:
+        for war_ids in chunks(
+            sorted(relevant_war_ids), STANDINGSSYNC_WARS_UPDATE_BATCH_SIZE
+        ):
+            update_wars.apply_async(args=[war_ids], priority=DEFAULT_TASK_PRIORITY)
+    else:
+        for war_id in relevant_war_ids:
+            update_war.apply_async(args=[war_id], priority=DEFAULT_TASK_PRIORITY)
     update_unresolved_eve_entities.apply_async(priority=DEFAULT_TASK_PRIORITY)
 
 
 @shared_task
 def update_war(war_id: int):
     EveWar.objects.update_or_create_from_esi(war_id)
+
+
+@shared_task
+def update_wars(war_ids: List[int]) -> dict:
+    """Update a batch of wars from ESI.
+
+    Returns:
+    - counts of created, updated and failed wars and the duration in seconds
+    """
+    result = EveWar.objects.update_or_create_from_esi_bulk(
+        war_ids, max_workers=STANDINGSSYNC_WARS_UPDATE_MAX_WORKERS
+    )
+    logger.info("Updated batch of %d wars: %s", len(war_ids), result)
+    return result._asdict()
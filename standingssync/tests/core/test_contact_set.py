@@ -0,0 +1,95 @@
+import pickle
+from unittest import TestCase
+
+from ...core.contact_set import ContactSet
+
+
+class TestContactSet(TestCase):
+    def setUp(self) -> None:
+        self.contact_set = ContactSet.from_contacts(
+            [(3001, -10, True), (1002, 5, False), (1001, 10.0, False)]
+        )
+
+    def test_should_be_sorted_by_id(self):
+        self.assertListEqual(list(self.contact_set), [1001, 1002, 3001])
+        self.assertListEqual(
+            list(self.contact_set.contacts()),
+            [(1001, 10.0, False), (1002, 5.0, False), (3001, -10.0, True)],
+        )
+
+    def test_should_support_membership(self):
+        self.assertIn(1002, self.contact_set)
+        self.assertNotIn(1003, self.contact_set)
+        self.assertNotIn(9999, self.contact_set)
+        self.assertNotIn(1, ContactSet())
+
+    def test_should_map_ids_to_standings(self):
+        self.assertEqual(self.contact_set[1002], 5.0)
+        self.assertEqual(self.contact_set.get(1003), None)
+        with self.assertRaises(KeyError):
+            self.contact_set[1003]
+
+    def test_should_return_war_target_flag(self):
+        self.assertTrue(self.contact_set.is_war_target(3001))
+        self.assertFalse(self.contact_set.is_war_target(1001))
+        self.assertListEqual(list(self.contact_set.war_targets()), [(3001, -10.0)])
+
+    def test_should_keep_last_contact_for_duplicate_ids(self):
+        # when
+        contact_set = ContactSet.from_contacts([(1001, 5, False), (1001, 10, True)])
+        # then
+        self.assertListEqual(list(contact_set.contacts()), [(1001, 10.0, True)])
+
+    def test_should_return_difference_with_contact_set(self):
+        # given
+        other = ContactSet.from_contacts([(1002, 0, False), (2001, 0, False)])
+        # when
+        result = self.contact_set.difference(other)
+        # then
+        self.assertListEqual(
+            list(result.contacts()), [(1001, 10.0, False), (3001, -10.0, True)]
+        )
+
+    def test_should_return_difference_with_ids(self):
+        # when
+        result = self.contact_set.difference({1001, 3001, 4001})
+        # then
+        self.assertListEqual(list(result.contacts()), [(1002, 5.0, False)])
+
+    def test_should_group_by_standing(self):
+        # given
+        contact_set = ContactSet.from_contacts(
+            [(1003, 5, False), (1001, 5, False), (1002, -5, True)]
+        )
+        # when
+        result = contact_set.grouped_by_standing()
+        # then
+        self.assertDictEqual(
+            {standing: list(ids) for standing, ids in result.items()},
+            {5.0: [1001, 1003], -5.0: [1002]},
+        )
+
+    def test_should_serialize_to_bytes_and_back(self):
+        # when
+        data = self.contact_set.to_bytes()
+        # then
+        self.assertEqual(len(data), 9 + 3 * 17)
+        self.assertEqual(ContactSet.from_bytes(data), self.contact_set)
+
+    def test_should_serialize_empty_set(self):
+        self.assertEqual(ContactSet.from_bytes(ContactSet().to_bytes()), ContactSet())
+
+    def test_should_raise_error_for_invalid_data(self):
+        with self.assertRaises(ValueError):
+            ContactSet.from_bytes(b"invalid")
+        with self.assertRaises(ValueError):
+            ContactSet.from_bytes(self.contact_set.to_bytes()[:-1])
+
+    def test_should_pickle_as_binary_blob(self):
+        # when
+        result = pickle.loads(pickle.dumps(self.contact_set))
+        # then
+        self.assertEqual(result, self.contact_set)
+
+    def test_should_compare_with_dicts(self):
+        self.assertEqual(self.contact_set, {1001: 10.0, 1002: 5.0, 3001: -10.0})
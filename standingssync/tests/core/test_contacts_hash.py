@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+from ...core.contacts_hash import ContactsHasher
+
+
+class TestContactsHasher(TestCase):
+    def test_should_return_same_hash_regardless_of_order(self):
+        # given
+        contacts_1 = {1001: (10.0, False), 1002: (-5.0, False), 1003: (-10.0, True)}
+        contacts_2 = {1003: (-10.0, True), 1001: (10, False), 1002: (-5, False)}
+        # when
+        hash_1 = ContactsHasher(contacts_1).version_hash()
+        hash_2 = ContactsHasher(contacts_2).version_hash()
+        # then
+        self.assertEqual(hash_1, hash_2)
+        self.assertEqual(len(hash_1), 32)
+
+    def test_should_return_different_hash_when_standing_changed(self):
+        # given
+        hasher_1 = ContactsHasher({1001: (10.0, False)})
+        hasher_2 = ContactsHasher({1001: (5.0, False)})
+        # when/then
+        self.assertNotEqual(hasher_1.version_hash(), hasher_2.version_hash())
+
+    def test_should_return_different_hash_when_war_target_flag_changed(self):
+        # given
+        hasher_1 = ContactsHasher({1001: (-10.0, False)})
+        hasher_2 = ContactsHasher({1001: (-10.0, True)})
+        # when/then
+        self.assertNotEqual(hasher_1.version_hash(), hasher_2.version_hash())
+
+    def test_should_treat_negative_zero_as_zero(self):
+        # given
+        hasher_1 = ContactsHasher({1001: (0.0, False)})
+        hasher_2 = ContactsHasher({1001: (-0.0, False)})
+        # when/then
+        self.assertEqual(hasher_1.version_hash(), hasher_2.version_hash())
+
+    def test_should_return_contact_fingerprints(self):
+        # given
+        hasher_1 = ContactsHasher({1001: (10.0, False), 1002: (5.0, False)})
+        hasher_2 = ContactsHasher({1001: (10.0, False), 1002: (-5.0, False)})
+        # when
+        result_1 = hasher_1.contact_fingerprints()
+        result_2 = hasher_2.contact_fingerprints()
+        # then
+        self.assertEqual(result_1.keys(), {1001, 1002})
+        self.assertEqual(result_1[1001], result_2[1001])
+        self.assertNotEqual(result_1[1002], result_2[1002])
+
+    def test_should_return_bucket_fingerprints(self):
+        # given
+        hasher_1 = ContactsHasher(
+            {1001: (10.0, False), 1002: (10.0, False), 1003: (-10.0, False)}
+        )
+        hasher_2 = ContactsHasher(
+            {1002: (10.0, False), 1001: (10.0, False), 1003: (-10.0, True)}
+        )
+        # when
+        result_1 = hasher_1.bucket_fingerprints()
+        result_2 = hasher_2.bucket_fingerprints()
+        # then
+        self.assertEqual(result_1.keys(), {10.0, -10.0})
+        self.assertEqual(result_1[10.0], result_2[10.0])
+        self.assertNotEqual(result_1[-10.0], result_2[-10.0])
+
+    def test_should_create_from_esi_contacts(self):
+        # given
+        contacts = {
+            1001: {"contact_id": 1001, "contact_type": "character", "standing": 10.0},
+            3001: {"contact_id": 3001, "contact_type": "alliance", "standing": -10.0},
+        }
+        # when
+        hasher = ContactsHasher.from_esi_contacts(contacts, war_target_ids={3001})
+        # then
+        expected = ContactsHasher({1001: (10.0, False), 3001: (-10.0, True)})
+        self.assertEqual(hasher.version_hash(), expected.version_hash())
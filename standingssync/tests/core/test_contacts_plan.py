@@ -0,0 +1,113 @@
+from unittest import TestCase
+
+from ...core.contacts_plan import ContactsPlan, ContactState, contacts_from_esi
+
+
+class TestContactState(TestCase):
+    def test_should_normalize_values(self):
+        # when
+        obj = ContactState(standing=5, label_ids=[1, 2])
+        # then
+        self.assertEqual(obj.standing, 5.0)
+        self.assertEqual(obj.label_ids, frozenset([1, 2]))
+
+    def test_should_create_from_esi_dict(self):
+        # when
+        obj = ContactState.from_esi_dict(
+            {"contact_id": 1001, "standing": -5, "label_ids": None}
+        )
+        # then
+        self.assertEqual(obj, ContactState(-5.0))
+
+    def test_should_convert_contacts_from_esi(self):
+        # given
+        contacts_raw = [
+            {"contact_id": 1001, "standing": 10.0, "label_ids": [1]},
+            {"contact_id": 1002, "standing": -10.0},
+        ]
+        # when
+        result = contacts_from_esi(contacts_raw)
+        # then
+        expected = {1001: ContactState(10.0, [1]), 1002: ContactState(-10.0)}
+        self.assertDictEqual(result, expected)
+
+
+class TestContactsPlan(TestCase):
+    def test_should_do_nothing_when_contacts_are_equal(self):
+        # given
+        contacts = {1001: ContactState(10.0), 1002: ContactState(-10.0, [1])}
+        # when
+        plan = ContactsPlan.create(current=contacts, desired=dict(contacts))
+        # then
+        self.assertFalse(plan)
+        self.assertEqual(plan.esi_calls_count(), 0)
+
+    def test_should_delete_obsolete_contacts(self):
+        # given
+        current = {1001: ContactState(10.0), 1002: ContactState(5.0)}
+        desired = {1001: ContactState(10.0)}
+        # when
+        plan = ContactsPlan.create(current=current, desired=desired)
+        # then
+        self.assertSetEqual(plan.to_delete, {1002})
+        self.assertDictEqual(plan.to_update, {})
+        self.assertDictEqual(plan.to_add, {})
+
+    def test_should_add_new_contacts_grouped_by_state(self):
+        # given
+        current = {}
+        desired = {
+            1001: ContactState(10.0),
+            1002: ContactState(10.0),
+            1003: ContactState(-10.0, [1]),
+        }
+        # when
+        plan = ContactsPlan.create(current=current, desired=desired)
+        # then
+        self.assertSetEqual(plan.to_delete, set())
+        self.assertDictEqual(
+            plan.to_add,
+            {ContactState(10.0): {1001, 1002}, ContactState(-10.0, [1]): {1003}},
+        )
+        self.assertEqual(plan.esi_calls_count(), 2)
+
+    def test_should_update_changed_standing(self):
+        # given
+        current = {1001: ContactState(10.0), 1002: ContactState(5.0)}
+        desired = {1001: ContactState(10.0), 1002: ContactState(-5.0)}
+        # when
+        plan = ContactsPlan.create(current=current, desired=desired)
+        # then
+        self.assertDictEqual(plan.to_update, {ContactState(-5.0): {1002}})
+        self.assertFalse(plan.to_delete)
+        self.assertFalse(plan.to_add)
+
+    def test_should_update_when_label_is_added(self):
+        # given
+        current = {1001: ContactState(-10.0)}
+        desired = {1001: ContactState(-10.0, [1])}
+        # when
+        plan = ContactsPlan.create(current=current, desired=desired)
+        # then
+        self.assertDictEqual(plan.to_update, {ContactState(-10.0, [1]): {1001}})
+        self.assertFalse(plan.to_delete)
+
+    def test_should_replace_when_label_is_removed(self):
+        # given
+        current = {1001: ContactState(-10.0, [1])}
+        desired = {1001: ContactState(-10.0)}
+        # when
+        plan = ContactsPlan.create(current=current, desired=desired)
+        # then
+        self.assertSetEqual(plan.to_delete, {1001})
+        self.assertDictEqual(plan.to_add, {ContactState(-10.0): {1001}})
+        self.assertSetEqual(plan.ids_to_replace, {1001})
+
+    def test_should_count_esi_calls_with_chunking(self):
+        # given
+        current = {contact_id: ContactState(5.0) for contact_id in range(1, 42)}
+        desired = {contact_id: ContactState(10.0) for contact_id in range(100, 301)}
+        # when
+        plan = ContactsPlan.create(current=current, desired=desired)
+        # then
+        self.assertEqual(plan.esi_calls_count(), 3 + 3)
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+from unittest import TestCase
+
+from ...core.contacts_snapshot import ContactsSnapshot
+
+
+class TestContactsSnapshot(TestCase):
+    def setUp(self) -> None:
+        self.snapshot = ContactsSnapshot.from_contacts(
+            "abc",
+            [(1001, 10, False), (1002, 10.0, False), (3001, -10, True)],
+        )
+
+    def test_should_have_length(self):
+        self.assertEqual(len(self.snapshot), 3)
+
+    def test_should_return_all_contacts(self):
+        self.assertListEqual(
+            list(self.snapshot.contacts()),
+            [(1001, 10.0, False), (1002, 10.0, False), (3001, -10.0, True)],
+        )
+
+    def test_should_return_war_targets(self):
+        self.assertListEqual(list(self.snapshot.war_targets()), [(3001, -10.0)])
+
+    def test_should_return_standings(self):
+        self.assertDictEqual(
+            self.snapshot.standings(), {1001: 10.0, 1002: 10.0, 3001: -10.0}
+        )
+
+    def test_should_be_false_when_empty(self):
+        self.assertFalse(ContactsSnapshot.from_contacts("abc", []))
+        self.assertTrue(self.snapshot)
+
+    def test_should_resolve_effective_standings(self):
+        # given
+        character = SimpleNamespace(
+            character_id=9001, corporation_id=3001, alliance_id=1001
+        )
+        # when
+        result = self.snapshot.standing_resolver().effective_standing(character)
+        # then
+        self.assertEqual(result, -10.0)
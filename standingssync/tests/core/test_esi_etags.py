@@ -0,0 +1,162 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ...core.esi_etags import EtagStore, conditional_results
+from ...core.esi_governor import EsiErrorLimitGovernor, MemoryBackend
+from ..utils import EsiEndpointStub
+
+MODULE_PATH = "standingssync.core.esi_etags"
+
+
+@patch(MODULE_PATH + ".STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS", True)
+class TestConditionalResults(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.governor = EsiErrorLimitGovernor(backend=MemoryBackend())
+
+    def fetch(self, endpoint, **kwargs):
+        return conditional_results(
+            "dummy", endpoint, {"id": 1}, governor=self.governor, **kwargs
+        )
+
+    def test_should_return_modified_data_on_first_request(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        # when
+        result = self.fetch(endpoint)
+        # then
+        self.assertTrue(result.is_modified)
+        self.assertListEqual(result.data, [1, 2])
+        self.assertNotIn("_request_options", endpoint.calls[0])
+
+    def test_should_report_not_modified_after_confirm(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint).confirm()
+        # when
+        result = self.fetch(endpoint)
+        # then
+        self.assertFalse(result.is_modified)
+        self.assertIsNone(result.data)
+        self.assertDictEqual(
+            endpoint.calls[1]["_request_options"],
+            {"headers": {"If-None-Match": "abc"}},
+        )
+
+    def test_should_not_send_etag_when_not_confirmed(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint)
+        # when
+        result = self.fetch(endpoint)
+        # then
+        self.assertTrue(result.is_modified)
+
+    def test_should_report_modified_when_etag_changed(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint).confirm()
+        endpoint.data = [3]
+        endpoint.etag = "def"
+        # when
+        result = self.fetch(endpoint)
+        # then
+        self.assertTrue(result.is_modified)
+        self.assertListEqual(result.data, [3])
+
+    def test_should_return_stored_data_when_not_modified(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint, keep_data=True).confirm()
+        # when
+        result = self.fetch(endpoint, keep_data=True)
+        # then
+        self.assertFalse(result.is_modified)
+        self.assertListEqual(result.data, [1, 2])
+
+    def test_should_not_store_etag_for_multiple_pages(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2], headers={"X-Pages": 2})
+        self.fetch(endpoint).confirm()
+        # when
+        result = self.fetch(endpoint)
+        # then
+        self.assertTrue(result.is_modified)
+
+    def test_should_refetch_paginated_when_second_page_added(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint, keep_data=True, paginated=True).confirm()
+        endpoint.data = [1, 2, 3]  # page 2 was added, page 1 is unchanged
+        endpoint.headers = {"X-Pages": 2}
+        # when
+        result = self.fetch(endpoint, keep_data=True, paginated=True)
+        # then
+        self.assertTrue(result.is_modified)
+        self.assertEqual(result.data, [1, 2, 3])
+        self.assertNotIn("_request_options", endpoint.calls[-1])
+
+    def test_should_not_send_etag_for_paginated_when_stored_without_pages(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        cache.set(EtagStore.key("dummy", {"id": 1}), ("abc", [1]))  # legacy entry
+        # when
+        result = self.fetch(endpoint, keep_data=True, paginated=True)
+        # then
+        self.assertTrue(result.is_modified)
+        self.assertEqual(result.data, [1, 2])
+
+    def test_should_reuse_paginated_data_when_still_single_page(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint, keep_data=True, paginated=True).confirm()
+        # when
+        result = self.fetch(endpoint, keep_data=True, paginated=True)
+        # then
+        self.assertFalse(result.is_modified)
+        self.assertEqual(result.data, [1, 2])
+
+    def test_should_not_send_etag_after_invalidate(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint).confirm()
+        self.fetch(endpoint).invalidate()
+        # when
+        result = self.fetch(endpoint)
+        # then
+        self.assertTrue(result.is_modified)
+
+    def test_should_always_fetch_full_response_without_etag(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint).confirm()
+        # when
+        result = self.fetch(endpoint, use_etag=False)
+        # then
+        self.assertTrue(result.is_modified)
+        self.assertListEqual(result.data, [1, 2])
+
+    def test_should_count_hits_and_misses(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        # when
+        conditional_results(
+            "war", endpoint, {"id": 1}, governor=self.governor
+        ).confirm()
+        conditional_results("war", endpoint, {"id": 1}, governor=self.governor)
+        conditional_results("war", endpoint, {"id": 2}, governor=self.governor)
+        # then
+        self.assertDictEqual(EtagStore().stats()["war"], {"hits": 1, "misses": 2})
+
+    def test_should_fetch_normally_when_disabled(self):
+        # given
+        endpoint = EsiEndpointStub([1, 2])
+        self.fetch(endpoint).confirm()
+        # when
+        with patch(MODULE_PATH + ".STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS", False):
+            result = self.fetch(endpoint)
+        # then
+        self.assertTrue(result.is_modified)
+        self.assertNotIn("_request_options", endpoint.calls[1])
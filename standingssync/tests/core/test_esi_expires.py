@@ -0,0 +1,21 @@
+import datetime as dt
+from unittest import TestCase
+
+from ...core.esi_expires import expires_from_headers
+
+
+class TestExpiresFromHeaders(TestCase):
+    def test_should_return_expires(self):
+        # when
+        result = expires_from_headers({"expires": "Sun, 18 Oct 2026 12:00:00 GMT"})
+        # then
+        self.assertEqual(
+            result, dt.datetime(2026, 10, 18, 12, 0, tzinfo=dt.timezone.utc)
+        )
+
+    def test_should_return_none_when_header_is_missing(self):
+        self.assertIsNone(expires_from_headers({"x-pages": 1}))
+        self.assertIsNone(expires_from_headers(None))
+
+    def test_should_return_none_when_header_is_invalid(self):
+        self.assertIsNone(expires_from_headers({"Expires": "invalid"}))
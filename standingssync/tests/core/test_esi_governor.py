@@ -0,0 +1,206 @@
+import datetime as dt
+from email.utils import format_datetime
+from unittest import TestCase
+
+from django.core.cache import cache
+from django.test import TestCase as DjangoTestCase
+
+from app_utils.esi_testing import BravadoOperationStub, build_http_error
+
+from ...core.esi_governor import (
+    CacheBackend,
+    ErrorLimitState,
+    EsiErrorLimitGovernor,
+    MemoryBackend,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def create_governor(clock: FakeClock, backend=None) -> EsiErrorLimitGovernor:
+    return EsiErrorLimitGovernor(
+        backend=backend if backend else MemoryBackend(),
+        pause_threshold=20,
+        throttle_threshold=50,
+        max_pause=65,
+        clock=clock.time,
+        sleep=clock.sleep,
+    )
+
+
+def http_date(timestamp: float) -> str:
+    return format_datetime(
+        dt.datetime.fromtimestamp(timestamp, tz=dt.timezone.utc), usegmt=True
+    )
+
+
+def error_limit_headers(remain: int, reset: int) -> dict:
+    return {"X-Esi-Error-Limit-Remain": remain, "X-Esi-Error-Limit-Reset": reset}
+
+
+class TestEsiErrorLimitGovernor(TestCase):
+    def test_should_not_wait_without_state(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        # when
+        result = governor.wait()
+        # then
+        self.assertEqual(result, 0)
+        self.assertListEqual(clock.sleeps, [])
+
+    def test_should_not_wait_when_budget_is_high(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        governor.record_headers(error_limit_headers(100, 30))
+        # when
+        result = governor.wait()
+        # then
+        self.assertEqual(result, 0)
+
+    def test_should_throttle_when_budget_is_low(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        governor.record_headers(error_limit_headers(30, 40))
+        # when
+        result = governor.wait()
+        # then
+        self.assertAlmostEqual(result, 4.0)  # 40 seconds / 10 remaining calls
+
+    def test_should_pause_until_reset_when_budget_is_exhausted(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        governor.record_headers(error_limit_headers(5, 42))
+        # when
+        result = governor.wait()
+        # then
+        self.assertAlmostEqual(result, 42)
+        self.assertEqual(governor.wait(), 0)  # window has reset
+
+    def test_should_keep_lowest_budget_within_same_window(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        governor.record_headers(error_limit_headers(10, 30))
+        # when
+        state = governor.record_headers(error_limit_headers(80, 30))
+        # then
+        self.assertEqual(state.remain, 10)
+
+    def test_should_use_budget_from_new_window(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        governor.record_headers(error_limit_headers(10, 5))
+        clock.now += 10
+        # when
+        state = governor.record_headers(error_limit_headers(99, 60))
+        # then
+        self.assertEqual(state.remain, 99)
+
+    def test_should_ignore_headers_from_past_window(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        governor.record_headers(error_limit_headers(80, 30))
+        headers = error_limit_headers(5, 30)
+        headers["Date"] = http_date(clock.now - 300)  # e.g. served from cache
+        # when
+        result = governor.record_headers(headers)
+        # then
+        self.assertIsNone(result)
+        self.assertEqual(governor.backend.get().remain, 80)
+
+    def test_should_measure_window_from_response_date(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        headers = error_limit_headers(70, 30)
+        headers["Date"] = http_date(clock.now - 10)
+        # when
+        result = governor.record_headers(headers)
+        # then
+        self.assertEqual(result, ErrorLimitState(70, clock.now + 20))
+
+    def test_should_ignore_responses_without_error_limit_headers(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        # when
+        result = governor.record_headers({"x-pages": 1})
+        # then
+        self.assertIsNone(result)
+        self.assertIsNone(governor.backend.get())
+
+    def test_should_return_results_and_record_headers(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        operation = BravadoOperationStub([1, 2], headers=error_limit_headers(70, 20))
+        # when
+        result = governor.results(operation)
+        # then
+        self.assertListEqual(result, [1, 2])
+        self.assertEqual(governor.backend.get(), ErrorLimitState(70, 1020.0))
+
+    def test_should_return_results_with_headers(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        headers = {"Expires": "Sun, 18 Oct 2026 12:00:00 GMT"}
+        operation = BravadoOperationStub([1, 2], headers=headers)
+        # when
+        data, result = governor.results_with_headers(operation)
+        # then
+        self.assertListEqual(data, [1, 2])
+        self.assertDictEqual(result, headers)
+
+    def test_should_record_headers_from_http_errors(self):
+        # given
+        clock = FakeClock()
+        governor = create_governor(clock)
+        exception = build_http_error(404)
+        exception.response.headers = error_limit_headers(15, 20)
+
+        class OperationStub(BravadoOperationStub):
+            def results(self, **kwargs):
+                raise exception
+
+        # when
+        with self.assertRaises(type(exception)):
+            governor.results(OperationStub([]))
+        # then
+        self.assertEqual(governor.backend.get().remain, 15)
+
+
+class TestCacheBackend(DjangoTestCase):
+    def setUp(self) -> None:
+        cache.delete("standingssync-test-esi-error-limit")
+
+    def test_should_share_state_between_governors(self):
+        # given
+        clock = FakeClock()
+        governor_1 = create_governor(
+            clock, CacheBackend("standingssync-test-esi-error-limit")
+        )
+        governor_2 = create_governor(
+            clock, CacheBackend("standingssync-test-esi-error-limit")
+        )
+        # when
+        governor_1.record_headers(error_limit_headers(15, 30))
+        # then
+        self.assertEqual(governor_2.backend.get().remain, 15)
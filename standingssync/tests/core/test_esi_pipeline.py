@@ -0,0 +1,235 @@
+import threading
+import time
+from unittest import TestCase
+
+from app_utils.esi_testing import BravadoOperationStub
+
+from ...core.contacts_plan import ContactsPlan, ContactState
+from ...core.esi_pipeline import ContactsWritePipeline, EsiWriteError
+
+
+class EsiContactsStub:
+    """Simulates the ESI write endpoints for contacts of one character."""
+
+    def __init__(
+        self, contacts=None, delay=0.0, failing=None, failing_ids=None
+    ) -> None:
+        self.contacts = dict(contacts) if contacts else dict()
+        self.delay = delay
+        self.failing = set(failing) if failing else set()
+        self.failing_ids = set(failing_ids) if failing_ids else set()
+        self.calls = list()
+        self._lock = threading.Lock()
+
+    def create_pipeline(self, **kwargs) -> ContactsWritePipeline:
+        return ContactsWritePipeline(
+            delete_method=self.delete,
+            put_method=self.put,
+            post_method=self.post,
+            semaphore=threading.BoundedSemaphore(10),
+            **kwargs,
+        )
+
+    def delete(self, character_id, contact_ids, token):
+        self._process("delete", contact_ids)
+        with self._lock:
+            for contact_id in contact_ids:
+                del self.contacts[contact_id]
+        return BravadoOperationStub([])
+
+    def put(self, character_id, contact_ids, standing, token, label_ids=None):
+        self._process("put", contact_ids)
+        with self._lock:
+            for contact_id in contact_ids:
+                old = self.contacts[contact_id]
+                self.contacts[contact_id] = ContactState(
+                    standing, old.label_ids.union(label_ids or [])
+                )
+        return BravadoOperationStub([])
+
+    def post(self, character_id, contact_ids, standing, token, label_ids=None):
+        self._process("post", contact_ids)
+        with self._lock:
+            for contact_id in contact_ids:
+                if contact_id in self.contacts:
+                    raise ValueError(f"Contact already exists: {contact_id}")
+                self.contacts[contact_id] = ContactState(standing, label_ids or [])
+        return BravadoOperationStub([])
+
+    def _process(self, operation, contact_ids):
+        with self._lock:
+            self.calls.append((operation, tuple(contact_ids)))
+        if self.delay:
+            time.sleep(self.delay)
+        if operation in self.failing or self.failing_ids.intersection(contact_ids):
+            raise OSError("Test exception")
+
+
+class TestContactsWritePipeline(TestCase):
+    def test_should_apply_plan(self):
+        # given
+        current = {
+            1001: ContactState(5.0),
+            1002: ContactState(-5.0),
+            1003: ContactState(10.0, [1]),
+        }
+        desired = {
+            1001: ContactState(10.0),
+            1003: ContactState(10.0),
+            1004: ContactState(-10.0, [1]),
+        }
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current)
+        pipeline = esi.create_pipeline(max_workers=4)
+        # when
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        # then
+        self.assertTrue(result.is_ok)
+        self.assertEqual(result.calls_count, 5)  # deletes split for re-adding
+        self.assertDictEqual(esi.contacts, desired)
+
+    def test_should_apply_plan_serially(self):
+        # given
+        current = {1001: ContactState(5.0), 1002: ContactState(-5.0, [1])}
+        desired = {1002: ContactState(-5.0), 1003: ContactState(10.0)}
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current)
+        pipeline = esi.create_pipeline(max_workers=1)
+        # when
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        # then
+        self.assertTrue(result.is_ok)
+        self.assertDictEqual(esi.contacts, desired)
+
+    def test_should_readd_contacts_after_they_have_been_deleted(self):
+        # given
+        current = {
+            contact_id: ContactState(5.0, [1]) for contact_id in range(1001, 1101)
+        }
+        desired = {contact_id: ContactState(5.0) for contact_id in range(1001, 1101)}
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current, delay=0.01)
+        pipeline = esi.create_pipeline(max_workers=4)
+        # when
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        # then
+        self.assertTrue(result.is_ok)
+        self.assertDictEqual(esi.contacts, desired)
+        operations = [operation for operation, _ in esi.calls]
+        self.assertEqual(operations, ["delete"] * 5 + ["post"])
+
+    def test_should_delete_all_contacts_before_adding_new_ones(self):
+        # given
+        current = {
+            contact_id: ContactState(5.0) for contact_id in range(1001, 1101)
+        }  # 5 delete calls
+        desired = {
+            contact_id: ContactState(-5.0) for contact_id in range(2001, 2401)
+        }  # 4 post calls
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current, delay=0.05)
+        pending_deletes = set()
+        original_delete = esi.delete
+        original_post = esi.post
+        lock = threading.Lock()
+
+        def delete(character_id, contact_ids, token):
+            with lock:
+                pending_deletes.add(tuple(contact_ids))
+            try:
+                return original_delete(character_id, contact_ids, token)
+            finally:
+                with lock:
+                    pending_deletes.discard(tuple(contact_ids))
+
+        def post(character_id, contact_ids, standing, token, label_ids=None):
+            with lock:
+                if pending_deletes:
+                    raise ValueError("Contact limit reached")
+            return original_post(character_id, contact_ids, standing, token, label_ids)
+
+        esi.delete = delete
+        esi.post = post
+        pipeline = esi.create_pipeline(max_workers=9)
+        # when
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        # then
+        self.assertTrue(result.is_ok)
+        self.assertDictEqual(esi.contacts, desired)
+        operations = [operation for operation, _ in esi.calls]
+        self.assertEqual(operations, ["delete"] * 5 + ["post"] * 4)
+
+    def test_should_run_independent_calls_in_parallel(self):
+        # given
+        current = {
+            contact_id: ContactState(5.0) for contact_id in range(1001, 1101)
+        }  # 5 delete calls
+        desired = {
+            contact_id: ContactState(-5.0) for contact_id in range(2001, 2401)
+        }  # 4 post calls
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current, delay=0.1)
+        pipeline = esi.create_pipeline(max_workers=9)
+        # when
+        started = time.monotonic()
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        duration = time.monotonic() - started
+        # then
+        self.assertTrue(result.is_ok)
+        self.assertEqual(result.calls_count, 9)
+        self.assertLess(duration, 0.5)
+        self.assertDictEqual(esi.contacts, desired)
+
+    def test_should_collect_errors(self):
+        # given
+        current = {1001: ContactState(5.0)}
+        desired = {1001: ContactState(10.0), 1002: ContactState(-5.0)}
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current, failing={"put"})
+        pipeline = esi.create_pipeline(max_workers=4)
+        # when
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        # then
+        self.assertFalse(result.is_ok)
+        self.assertEqual(result.calls_count, 2)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.errors[0].call.operation, "put")
+        self.assertIn(1002, esi.contacts)
+        with self.assertRaises(EsiWriteError):
+            result.raise_for_errors()
+
+    def test_should_skip_readding_contacts_when_delete_failed(self):
+        # given
+        current = {1001: ContactState(5.0, [1])}
+        desired = {1001: ContactState(5.0), 1002: ContactState(-5.0)}
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current, failing={"delete"})
+        pipeline = esi.create_pipeline(max_workers=4)
+        # when
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        # then
+        self.assertFalse(result.is_ok)
+        self.assertEqual(result.skipped_count, 1)
+        self.assertNotIn(("post", (1001,)), esi.calls)
+        self.assertIn(1002, esi.contacts)
+
+    def test_should_readd_contacts_which_were_deleted(self):
+        # given
+        current = {
+            contact_id: ContactState(5.0, [1]) for contact_id in range(1001, 1026)
+        }
+        desired = {contact_id: ContactState(5.0) for contact_id in range(1001, 1026)}
+        plan = ContactsPlan.create(current, desired)
+        esi = EsiContactsStub(current, failing_ids={1025})
+        pipeline = esi.create_pipeline(max_workers=4)
+        # when
+        result = pipeline.execute(character_id=1, access_token="abc", plan=plan)
+        # then
+        self.assertFalse(result.is_ok)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.skipped_count, 5)
+        expected = {contact_id: ContactState(5.0) for contact_id in range(1001, 1021)}
+        expected.update(
+            {contact_id: ContactState(5.0, [1]) for contact_id in range(1021, 1026)}
+        )
+        self.assertDictEqual(esi.contacts, expected)
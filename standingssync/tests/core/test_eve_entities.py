@@ -0,0 +1,36 @@
+from eveuniverse.models import EveEntity
+
+from app_utils.testing import NoSocketsTestCase
+
+from ...core.eve_entities import bulk_get_or_create_eve_entities
+from ..factories import EveEntityCharacterFactory
+
+
+class TestBulkGetOrCreateEveEntities(NoSocketsTestCase):
+    def test_should_create_missing_entities_only(self):
+        # given
+        existing = EveEntityCharacterFactory()
+        # when
+        result = bulk_get_or_create_eve_entities([existing.id, 8000001, 8000002])
+        # then
+        self.assertSetEqual(result, {8000001, 8000002})
+        self.assertTrue(EveEntity.objects.filter(id=8000001, name="").exists())
+        existing.refresh_from_db()
+        self.assertNotEqual(existing.name, "")
+
+    def test_should_need_constant_number_of_queries(self):
+        # given
+        ids = range(8000001, 8000201)
+        # when
+        with self.assertNumQueries(2):
+            result = bulk_get_or_create_eve_entities(ids, batch_size=len(ids))
+        # then
+        self.assertEqual(len(result), 200)
+        self.assertEqual(EveEntity.objects.filter(id__in=ids).count(), 200)
+
+    def test_should_do_nothing_when_no_ids(self):
+        # when
+        with self.assertNumQueries(0):
+            result = bulk_get_or_create_eve_entities([])
+        # then
+        self.assertSetEqual(result, set())
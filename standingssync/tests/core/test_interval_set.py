@@ -0,0 +1,86 @@
+import pickle
+import random
+from unittest import TestCase
+
+from ...core.interval_set import IntervalSet
+
+
+class TestIntervalSet(TestCase):
+    def setUp(self) -> None:
+        self.ids = IntervalSet.from_ids([7, 1, 2, 3, 5, 6, 10])
+
+    def test_should_store_ids_as_intervals(self):
+        self.assertListEqual(list(self.ids), [1, 2, 3, 5, 6, 7, 10])
+        self.assertListEqual(list(self.ids.intervals()), [(1, 4), (5, 8), (10, 11)])
+        self.assertEqual(len(self.ids), 7)
+        self.assertEqual(self.ids.interval_count, 3)
+        self.assertEqual(self.ids.min(), 1)
+        self.assertEqual(self.ids.max(), 10)
+
+    def test_should_support_membership(self):
+        self.assertIn(1, self.ids)
+        self.assertIn(7, self.ids)
+        self.assertNotIn(0, self.ids)
+        self.assertNotIn(4, self.ids)
+        self.assertNotIn(8, self.ids)
+        self.assertNotIn(11, self.ids)
+        self.assertNotIn(1, IntervalSet())
+
+    def test_should_create_union(self):
+        # when
+        result = self.ids.union([4, 8, 12], IntervalSet.from_ids([11]))
+        # then
+        self.assertListEqual(list(result.intervals()), [(1, 9), (10, 13)])
+        self.assertEqual(self.ids | {0}, IntervalSet.from_ids([0, *self.ids]))
+
+    def test_should_create_difference(self):
+        # when
+        result = self.ids.difference(IntervalSet.from_intervals([(2, 3), (6, 11)]))
+        # then
+        self.assertListEqual(list(result), [1, 3, 5])
+        self.assertEqual(self.ids - [1, 10], IntervalSet.from_ids([2, 3, 5, 6, 7]))
+
+    def test_should_match_difference_of_python_sets(self):
+        # given
+        rnd = random.Random(42)
+        for _ in range(50):
+            ids_1 = {rnd.randint(0, 200) for _ in range(120)}
+            ids_2 = {rnd.randint(0, 200) for _ in range(80)}
+            # when
+            result = IntervalSet.from_ids(ids_1) - IntervalSet.from_ids(ids_2)
+            # then
+            self.assertSetEqual(set(result), ids_1 - ids_2)
+
+    def test_should_merge_overlapping_intervals(self):
+        # when
+        result = IntervalSet.from_intervals([(5, 8), (1, 3), (3, 6), (10, 10)])
+        # then
+        self.assertListEqual(list(result.intervals()), [(1, 8)])
+
+    def test_should_compare_with_sets(self):
+        self.assertEqual(self.ids, {1, 2, 3, 5, 6, 7, 10})
+        self.assertNotEqual(self.ids, IntervalSet.from_ids([1]))
+        self.assertSetEqual({1, 2, 4}.difference(self.ids), {4})
+
+    def test_should_serialize_to_list(self):
+        # when
+        data = self.ids.to_list()
+        # then
+        self.assertListEqual(data, [[1, 3], [5, 7], [10, 10]])
+        self.assertEqual(IntervalSet.from_list(data), self.ids)
+
+    def test_should_serialize_to_bytes(self):
+        # given
+        ids = IntervalSet.from_intervals([(700_000, 720_000), (730_000, 731_000)])
+        # when
+        data = ids.to_bytes()
+        # then
+        self.assertLess(len(data), 100)
+        self.assertEqual(IntervalSet.from_bytes(data), ids)
+        self.assertEqual(pickle.loads(pickle.dumps(ids)), ids)
+
+    def test_should_reject_invalid_bytes(self):
+        with self.assertRaises(ValueError):
+            IntervalSet.from_bytes(b"invalid")
+        with self.assertRaises(ValueError):
+            IntervalSet.from_bytes(self.ids.to_bytes()[:-1])
@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from allianceauth.eveonline.models import EveCharacter
+
+from ...core.standings import EffectiveStandingResolver
+
+
+def create_character(character_id, corporation_id, alliance_id=None) -> EveCharacter:
+    return EveCharacter(
+        character_id=character_id,
+        character_name=f"Character {character_id}",
+        corporation_id=corporation_id,
+        corporation_name=f"Corporation {corporation_id}",
+        corporation_ticker="ABC",
+        alliance_id=alliance_id,
+    )
+
+
+class TestEffectiveStandingResolver(TestCase):
+    def setUp(self) -> None:
+        self.resolver = EffectiveStandingResolver({1001: -10.0, 2001: 10.0, 3001: 5.0})
+
+    def test_should_prefer_character_standing(self):
+        # given
+        character = create_character(1001, 2001, 3001)
+        # when/then
+        self.assertEqual(self.resolver.effective_standing(character), -10.0)
+
+    def test_should_use_corporation_standing(self):
+        # given
+        character = create_character(1002, 2001, 3001)
+        # when/then
+        self.assertEqual(self.resolver.effective_standing(character), 10.0)
+
+    def test_should_use_alliance_standing(self):
+        # given
+        character = create_character(1002, 2002, 3001)
+        # when/then
+        self.assertEqual(self.resolver.effective_standing(character), 5.0)
+
+    def test_should_return_neutral_standing_when_no_contact(self):
+        # given
+        character = create_character(1002, 2002)
+        # when/then
+        self.assertEqual(self.resolver.effective_standing(character), 0.0)
+
+    def test_should_resolve_many_characters(self):
+        # given
+        characters = [
+            create_character(1001, 2002),
+            create_character(1002, 2001),
+            create_character(1003, 2003, 3001),
+            create_character(1004, 2004, 3004),
+        ]
+        # when
+        result = self.resolver.effective_standings(characters)
+        # then
+        self.assertDictEqual(result, {1001: -10.0, 1002: 10.0, 1003: 5.0, 1004: 0.0})
+
+    def test_should_return_entity_ids_for_characters(self):
+        # given
+        characters = [create_character(1001, 2001), create_character(1002, 2001, 3001)]
+        # when
+        result = EffectiveStandingResolver.entity_ids_for(characters)
+        # then
+        self.assertSetEqual(result, {1001, 1002, 2001, 3001})
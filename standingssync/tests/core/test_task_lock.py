@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ...core.task_lock import TaskLock
+
+
+class TestTaskLock(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_acquire_free_lock(self):
+        # given
+        lock = TaskLock("dummy", 1, 60)
+        # when/then
+        self.assertTrue(lock.acquire())
+
+    def test_should_not_acquire_lock_held_by_other(self):
+        # given
+        TaskLock("dummy", 1, 60).acquire()
+        # when/then
+        self.assertFalse(TaskLock("dummy", 1, 60).acquire())
+        self.assertTrue(TaskLock("dummy", 2, 60).acquire())
+
+    def test_should_release_lock(self):
+        # given
+        lock = TaskLock("dummy", 1, 60)
+        lock.acquire()
+        # when
+        result = lock.release()
+        # then
+        self.assertIsNone(result)
+        self.assertTrue(TaskLock("dummy", 1, 60).acquire())
+
+    def test_should_not_release_lock_owned_by_other(self):
+        # given
+        lock_1 = TaskLock("dummy", 1, 60)
+        lock_1.acquire()
+        cache.clear()  # simulate expired lock
+        lock_2 = TaskLock("dummy", 1, 60)
+        lock_2.acquire()
+        # when
+        lock_1.release()
+        # then
+        self.assertFalse(TaskLock("dummy", 1, 60).acquire())
+
+    def test_should_coalesce_skipped_runs_into_one_rerun(self):
+        # given
+        lock = TaskLock("dummy", 1, 60)
+        lock.acquire()
+        duplicate = TaskLock("dummy", 1, 60)
+        # when
+        duplicate.skip(force_sync=True)
+        duplicate.skip(force_sync=False)
+        # then
+        self.assertTrue(lock.release())  # force flag is kept
+        self.assertIsNone(lock.release())
+        self.assertEqual(lock.skipped_count(), 2)
+
+    def test_should_not_lose_rerun_requested_during_release(self):
+        # given
+        lock = TaskLock("dummy", 1, 60)
+        lock.acquire()
+        duplicate = TaskLock("dummy", 1, 60)
+        duplicate.skip()
+        cache_get = cache.get
+        requested = []
+
+        def get_and_request_rerun(key, *args, **kwargs):
+            value = cache_get(key, *args, **kwargs)
+            if key.endswith("-rerun") and not requested:
+                requested.append(key)
+                duplicate.skip()  # arrives during release
+            return value
+
+        # when
+        with patch.object(cache, "get", side_effect=get_and_request_rerun):
+            result_1 = lock.release()
+        # then
+        self.assertIsNotNone(result_1)
+        self.assertTrue(lock.acquire())
+        self.assertIsNotNone(lock.release())  # second request is kept
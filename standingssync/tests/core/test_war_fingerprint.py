@@ -0,0 +1,33 @@
+import datetime as dt
+from unittest import TestCase
+
+from ...core.war_fingerprint import war_fingerprint
+
+DECLARED = dt.datetime(2026, 10, 18, 12, 0, tzinfo=dt.timezone.utc)
+
+
+class TestWarFingerprint(TestCase):
+    def test_should_return_same_fingerprint_for_same_payload(self):
+        # when
+        fingerprint_1 = war_fingerprint(1, 2, [3, 4], declared=DECLARED, mutual=False)
+        fingerprint_2 = war_fingerprint(1, 2, [4, 3], declared=DECLARED, mutual=False)
+        # then
+        self.assertEqual(fingerprint_1, fingerprint_2)
+        self.assertEqual(len(fingerprint_1), 32)
+
+    def test_should_ignore_timezone_of_dates(self):
+        # given
+        declared = DECLARED.astimezone(dt.timezone(dt.timedelta(hours=2)))
+        # when/then
+        self.assertEqual(
+            war_fingerprint(1, 2, [], declared=DECLARED),
+            war_fingerprint(1, 2, [], declared=declared),
+        )
+
+    def test_should_return_different_fingerprint_for_changed_payload(self):
+        # given
+        fingerprint = war_fingerprint(1, 2, [3], finished=None)
+        # when/then
+        self.assertNotEqual(fingerprint, war_fingerprint(1, 2, [3, 4], finished=None))
+        self.assertNotEqual(fingerprint, war_fingerprint(2, 1, [3], finished=None))
+        self.assertNotEqual(fingerprint, war_fingerprint(1, 2, [3], finished=DECLARED))
@@ -0,0 +1,94 @@
+import random
+import threading
+from typing import List, Optional
+from unittest import TestCase
+
+from ...core.war_pager import SpeculativeWarPager
+
+
+class WarsListStandIn:
+    """Serves synthetic war IDs like the ESI wars list."""
+
+    def __init__(self, war_ids, page_size: int) -> None:
+        self.war_ids = sorted(war_ids, reverse=True)
+        self.page_size = page_size
+        self.cursors = []
+        self._lock = threading.Lock()
+
+    def __call__(self, max_war_id: Optional[int] = None) -> List[int]:
+        with self._lock:
+            self.cursors.append(max_war_id)
+        war_ids = (
+            [obj for obj in self.war_ids if obj < max_war_id]
+            if max_war_id
+            else self.war_ids
+        )
+        return war_ids[: self.page_size]
+
+    def expected(self, min_war_id: int) -> set:
+        """Return all war IDs down to min_war_id."""
+        return {obj for obj in self.war_ids if obj >= min_war_id}
+
+
+class TestSpeculativeWarPager(TestCase):
+    def fetch(self, stand_in, min_war_id, max_workers=4):
+        pager = SpeculativeWarPager(
+            stand_in, page_size=stand_in.page_size, max_workers=max_workers
+        )
+        result = pager.fetch(stand_in(), min_war_id)
+        return {obj for obj in result if obj >= min_war_id}, pager
+
+    def test_should_fetch_all_war_ids_for_dense_ids(self):
+        # given
+        stand_in = WarsListStandIn(range(1, 10_001), page_size=100)
+        # when
+        result, pager = self.fetch(stand_in, min_war_id=2_000)
+        # then
+        self.assertSetEqual(result, stand_in.expected(2_000))
+        self.assertLess(pager.rounds_count, 30)
+
+    def test_should_fill_gaps_for_ids_with_changing_density(self):
+        # given
+        rnd = random.Random(42)
+        war_ids = set(range(5_000, 10_000))
+        war_ids |= {obj for obj in range(1, 5_000) if rnd.random() < 0.2}
+        war_ids -= set(range(7_000, 7_500))
+        stand_in = WarsListStandIn(war_ids, page_size=100)
+        # when
+        result, _ = self.fetch(stand_in, min_war_id=500)
+        # then
+        self.assertSetEqual(result, stand_in.expected(500))
+
+    def test_should_stop_at_end_of_list(self):
+        # given
+        stand_in = WarsListStandIn(range(1, 1_001), page_size=100)
+        # when
+        result, _ = self.fetch(stand_in, min_war_id=0)
+        # then
+        self.assertSetEqual(result, set(range(1, 1_001)))
+
+    def test_should_fetch_pages_one_after_the_other_with_one_worker(self):
+        # given
+        stand_in = WarsListStandIn(range(1, 1_001), page_size=100)
+        # when
+        result, pager = self.fetch(stand_in, min_war_id=650, max_workers=1)
+        # then
+        self.assertSetEqual(result, stand_in.expected(650))
+        self.assertListEqual(stand_in.cursors, [None, 901, 801, 701])
+
+    def test_should_return_first_page_only_when_it_is_enough(self):
+        # given
+        stand_in = WarsListStandIn(range(1, 1_001), page_size=100)
+        # when
+        result, pager = self.fetch(stand_in, min_war_id=950)
+        # then
+        self.assertSetEqual(result, set(range(950, 1_001)))
+        self.assertEqual(pager.requests_count, 0)
+
+    def test_should_return_empty_set_for_empty_list(self):
+        # given
+        stand_in = WarsListStandIn([], page_size=100)
+        # when
+        result, _ = self.fetch(stand_in, min_war_id=1)
+        # then
+        self.assertSetEqual(result, set())
@@ -0,0 +1,61 @@
+import datetime as dt
+from unittest import TestCase
+
+from ...core.war_schedule import calc_war_next_check_at
+
+NOW = dt.datetime(2026, 10, 18, 12, 0, tzinfo=dt.timezone.utc)
+EXPIRES = NOW + dt.timedelta(hours=1)
+
+
+class TestCalcWarNextCheckAt(TestCase):
+    def test_should_check_active_war_when_it_expires(self):
+        # when
+        result = calc_war_next_check_at(
+            started=NOW - dt.timedelta(days=1),
+            finished=None,
+            expires=EXPIRES,
+            now=NOW,
+        )
+        # then
+        self.assertEqual(result, EXPIRES)
+
+    def test_should_check_finishing_war_only_when_it_is_finished(self):
+        # given
+        finished = NOW + dt.timedelta(days=1)
+        # when
+        result = calc_war_next_check_at(
+            started=NOW - dt.timedelta(days=1),
+            finished=finished,
+            expires=EXPIRES,
+            now=NOW,
+        )
+        # then
+        self.assertEqual(result, finished)
+
+    def test_should_check_war_not_yet_started_when_it_starts(self):
+        # given
+        started = NOW + dt.timedelta(days=1)
+        # when
+        result = calc_war_next_check_at(
+            started=started, finished=None, expires=EXPIRES, now=NOW
+        )
+        # then
+        self.assertEqual(result, started)
+
+    def test_should_not_check_war_before_it_expires(self):
+        # given
+        started = NOW + dt.timedelta(minutes=5)
+        # when
+        result = calc_war_next_check_at(
+            started=started, finished=None, expires=EXPIRES, now=NOW
+        )
+        # then
+        self.assertEqual(result, EXPIRES)
+
+    def test_should_return_none_when_expiry_is_unknown(self):
+        # when
+        result = calc_war_next_check_at(
+            started=NOW - dt.timedelta(days=1), finished=None, expires=None, now=NOW
+        )
+        # then
+        self.assertIsNone(result)
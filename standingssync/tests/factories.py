@@ -13,7 +13,7 @@ from app_utils.testdata_factories import (
     UserMainFactory,
 )
 
-from ..models import EveContact, EveWar, SyncedCharacter, SyncManager
+from ..models import EveContact, EveWar, EveWarTarget, SyncedCharacter, SyncManager
 
 
 class EveEntityFactory(factory.django.DjangoModelFactory):
@@ -75,6 +75,13 @@ class EveWarFactory(factory.django.DjangoModelFactory):
             for ally in extracted:
                 self.allies.add(ally)
 
+    @factory.post_generation
+    def war_targets(self, create, extracted, **kwargs):
+        if not create:
+            return
+
+        EveWarTarget.objects.update_for_wars([self.id])
+
 
 class UserMainManagerFactory(UserMainFactory):
     main_character__scopes = ["esi-alliances.read_contacts.v1"]
@@ -1,6 +1,8 @@
 import datetime as dt
+from email.utils import format_datetime
 from unittest.mock import patch
 
+from django.db.models import Q
 from django.utils.timezone import now
 from eveuniverse.models import EveEntity
 
@@ -8,11 +10,13 @@ from allianceauth.authentication.models import CharacterOwnership
 from app_utils.esi_testing import BravadoOperationStub
 from app_utils.testing import NoSocketsTestCase, create_user_from_evecharacter
 
-from ..managers import EveWarManager
-from ..models import EveWar
+from ..core.eve_entities import bulk_get_or_create_eve_entities
+from ..managers import ContactsChangeSet, EveWarManager
+from ..models import EveContact, EveWar, EveWarSyncState, EveWarTarget, SyncManager
 from .factories import (
     EveContactFactory,
     EveEntityAllianceFactory,
+    EveEntityCharacterFactory,
     EveWarFactory,
     SyncedCharacterFactory,
     SyncManagerFactory,
@@ -64,6 +68,88 @@ class TestEveContactManager(LoadTestDataMixin, NoSocketsTestCase):
         self.maxDiff = None
         self.assertDictEqual(result, expected)
 
+    def test_should_return_contact_set(self):
+        # when
+        with self.assertNumQueries(1):
+            result = self.sync_manager.contacts.contact_set()
+        # then
+        self.assertEqual(len(result), len(ALLIANCE_CONTACTS))
+        self.assertEqual(result[1005], -10.0)
+        self.assertFalse(result.is_war_target(1005))
+
+
+class TestEveContactManagerUpdateForManager(NoSocketsTestCase):
+    def test_should_apply_changes_incrementally(self):
+        # given
+        sync_manager = SyncManagerFactory()
+        unchanged = EveContactFactory(
+            manager=sync_manager, eve_entity=EveEntityCharacterFactory(), standing=5
+        )
+        changed = EveContactFactory(
+            manager=sync_manager, eve_entity=EveEntityCharacterFactory(), standing=5
+        )
+        war_target = EveContactFactory(
+            manager=sync_manager, eve_entity=EveEntityCharacterFactory(), standing=-10
+        )
+        removed = EveContactFactory(
+            manager=sync_manager, eve_entity=EveEntityCharacterFactory(), standing=10
+        )
+        new_entity = EveEntityAllianceFactory()
+        contacts = {
+            unchanged.eve_entity_id: {"standing": 5.0},
+            changed.eve_entity_id: {"standing": -5.0},
+            war_target.eve_entity_id: {"standing": -10.0},
+            new_entity.id: {"standing": 10.0},
+        }
+        # when
+        result = EveContact.objects.update_for_manager(
+            manager=sync_manager,
+            contacts=contacts,
+            war_target_ids={war_target.eve_entity_id},
+        )
+        # then
+        self.assertEqual(result, ContactsChangeSet(added=1, removed=1, changed=2))
+        self.assertSetEqual(
+            set(sync_manager.contacts.values_list("eve_entity_id", flat=True)),
+            set(contacts.keys()),
+        )
+        self.assertFalse(EveContact.objects.filter(pk=removed.pk).exists())
+        self.assertTrue(EveContact.objects.filter(pk=unchanged.pk).exists())
+        changed.refresh_from_db()
+        self.assertEqual(changed.standing, -5.0)
+        war_target.refresh_from_db()
+        self.assertTrue(war_target.is_war_target)
+        new_contact = sync_manager.contacts.get(eve_entity_id=new_entity.id)
+        self.assertEqual(new_contact.standing, 10.0)
+        self.assertFalse(new_contact.is_war_target)
+
+    def test_should_report_no_changes(self):
+        # given
+        sync_manager = SyncManagerFactory()
+        contact = EveContactFactory(
+            manager=sync_manager, eve_entity=EveEntityCharacterFactory(), standing=5
+        )
+        contacts = {contact.eve_entity_id: {"standing": 5.0}}
+        # when
+        with self.assertNumQueries(1):
+            result = EveContact.objects.update_for_manager(
+                manager=sync_manager, contacts=contacts, war_target_ids=set()
+            )
+        # then
+        self.assertFalse(result)
+
+    def test_should_not_touch_contacts_of_other_managers(self):
+        # given
+        sync_manager = SyncManagerFactory()
+        other_contact = EveContactFactory(eve_entity=EveEntityCharacterFactory())
+        # when
+        result = EveContact.objects.update_for_manager(
+            manager=sync_manager, contacts={}, war_target_ids=set()
+        )
+        # then
+        self.assertFalse(result)
+        self.assertTrue(EveContact.objects.filter(pk=other_contact.pk).exists())
+
 
 class TestEveWarManager(LoadTestDataMixin, NoSocketsTestCase):
     @classmethod
@@ -175,6 +261,12 @@ class TestEveWarManager(LoadTestDataMixin, NoSocketsTestCase):
         self.assertTrue(war.is_open_for_allies)
         self.assertEqual(war.retracted, retracted)
         self.assertEqual(war.started, started)
+        self.assertSetEqual(
+            set(
+                war.targets.filter(alliance_id=3001).values_list("target_id", flat=True)
+            ),
+            {2003, 3002, 3003},
+        )
 
     @patch(MANAGERS_PATH + ".esi")
     def test_should_create_full_war_object_from_esi_2(self, mock_esi):
@@ -298,7 +390,7 @@ class TestEveWarManager(LoadTestDataMixin, NoSocketsTestCase):
 
 
 class TestEveWarManager2(NoSocketsTestCase):
-    @patch(MANAGERS_PATH + ".STANDINGSSYNC_SPECIAL_WAR_IDS", [3, 4])
+    @patch(MODELS_PATH + ".STANDINGSSYNC_SPECIAL_WAR_IDS", [3, 4])
     @patch(MODELS_PATH + ".EveWar.objects.fetch_war_ids_from_esi")
     def test_should_return_relevant_war_ids(self, mock_fetch_war_ids_from_esi):
         # given
@@ -309,7 +401,34 @@ class TestEveWarManager2(NoSocketsTestCase):
         # then
         self.assertSetEqual(result, {1, 2, 3, 4})
 
-    @patch(MANAGERS_PATH + ".STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID", 4)
+    def test_should_filter_given_war_ids_in_chunks(self):
+        # given
+        finished = now() - dt.timedelta(days=1)
+        EveWarFactory(id=1, finished=finished)
+        EveWarFactory(id=2, finished=finished)
+        EveWarFactory(id=3, finished=finished)
+        EveWarFactory(id=4)
+        # when
+        with self.assertNumQueries(2):
+            result = EveWar.objects._filter_war_ids(
+                [1, 3, 4, 5], Q(finished__lte=now()), chunk_size=2
+            )
+        # then
+        self.assertSetEqual(result, {1, 3})
+
+    @patch(MODELS_PATH + ".STANDINGSSYNC_SPECIAL_WAR_IDS", [])
+    @patch(MODELS_PATH + ".EveWar.objects.fetch_war_ids_from_esi")
+    def test_should_return_only_wars_which_are_due(self, mock_fetch_war_ids_from_esi):
+        # given
+        mock_fetch_war_ids_from_esi.return_value = {1, 2, 3}
+        EveWarFactory(id=1, next_check_at=now() - dt.timedelta(minutes=1))
+        EveWarFactory(id=2, next_check_at=now() + dt.timedelta(minutes=5))
+        # when
+        result = EveWar.objects.calc_relevant_war_ids()
+        # then
+        self.assertSetEqual(result, {1, 3})
+
+    @patch(MODELS_PATH + ".STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID", 4)
     @patch(MANAGERS_PATH + ".esi")
     def test_should_fetch_war_ids_with_paging(self, mock_esi):
         def esi_get_wars(max_war_id=None):
@@ -328,6 +447,381 @@ class TestEveWarManager2(NoSocketsTestCase):
         # then
         self.assertSetEqual(result, {4, 5, 6, 7, 8})
 
+    @patch(MODELS_PATH + ".STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID", 4)
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_fetch_only_new_war_ids_after_full_sync(self, mock_esi):
+        def esi_get_wars(max_war_id=None):
+            requested_max_war_ids.append(max_war_id)
+            if max_war_id:
+                war_ids = [war_id for war_id in esi_war_ids if war_id < max_war_id]
+            else:
+                war_ids = esi_war_ids
+            return BravadoOperationStub(sorted(war_ids, reverse=True)[:page_size])
+
+        # given
+        esi_war_ids = [1, 2, 3, 4, 5, 6, 7, 8]
+        page_size = 3
+        requested_max_war_ids = []
+        mock_esi.client.Wars.get_wars.side_effect = esi_get_wars
+        EveWarManager.fetch_war_ids_from_esi(max_items=3)
+        esi_war_ids += [9, 10, 11, 12]
+        EveWarFactory(id=5, finished=now() - dt.timedelta(days=1))
+        requested_max_war_ids = []
+        # when
+        result = EveWarManager.fetch_war_ids_from_esi(max_items=3)
+        # then
+        self.assertSetEqual(result, {4, 6, 7, 8, 9, 10, 11, 12})
+        self.assertListEqual(requested_max_war_ids, [None, 10])
+        state = EveWarSyncState.load()
+        self.assertEqual(state.max_war_id, 12)
+        self.assertListEqual(state.open_war_ids, [[4, 4], [6, 12]])
+
+    @patch(MODELS_PATH + ".STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID", 4)
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_fetch_all_war_ids_when_full_sync_is_due(self, mock_esi):
+        def esi_get_wars(max_war_id=None):
+            requested_max_war_ids.append(max_war_id)
+            if max_war_id:
+                war_ids = [war_id for war_id in esi_war_ids if war_id < max_war_id]
+            else:
+                war_ids = esi_war_ids
+            return BravadoOperationStub(sorted(war_ids, reverse=True)[:page_size])
+
+        # given
+        esi_war_ids = [1, 2, 3, 4, 5, 6, 7, 8]
+        page_size = 3
+        mock_esi.client.Wars.get_wars.side_effect = esi_get_wars
+        EveWarSyncState.objects.create(
+            pk=1,
+            max_war_id=8,
+            open_war_ids=[[4, 8], [42, 42]],
+            last_full_sync_at=now() - dt.timedelta(days=2),
+        )
+        requested_max_war_ids = []
+        # when
+        result = EveWarManager.fetch_war_ids_from_esi(max_items=3)
+        # then
+        self.assertSetEqual(result, {4, 5, 6, 7, 8})
+        self.assertListEqual(requested_max_war_ids, [None, 6])
+        self.assertGreater(
+            EveWarSyncState.load().last_full_sync_at, now() - dt.timedelta(hours=1)
+        )
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_record_when_war_ids_expire(self, mock_esi):
+        # given
+        mock_esi.client.Wars.get_wars.return_value = BravadoOperationStub(
+            [1], headers={"Expires": "Sun, 18 Oct 2026 12:00:00 GMT"}
+        )
+        # when
+        EveWarManager.fetch_war_ids_from_esi()
+        # then
+        self.assertEqual(
+            EveWarSyncState.load().next_sync_at,
+            dt.datetime(2026, 10, 18, 12, 0, tzinfo=dt.timezone.utc),
+        )
+
+
+class TestEveWarSyncStateWatermark(NoSocketsTestCase):
+    def test_should_advance_watermark_to_smallest_open_war(self):
+        # given
+        EveWarSyncState.objects.create(
+            pk=1,
+            max_war_id=14,
+            open_war_ids=[[10, 14]],
+            min_unfinished_war_id=10,
+            special_war_ids=[3, 4],
+        )
+        EveWarFactory(id=3, finished=now() - dt.timedelta(days=1))
+        EveWarFactory(id=4)
+        EveWarFactory(id=10, finished=now() - dt.timedelta(days=1))
+        EveWarFactory(id=11, finished=now() - dt.timedelta(days=1))
+        EveWarFactory(id=13)
+        # when
+        state = EveWarSyncState.update_war_id_watermark()
+        # then
+        self.assertEqual(state.min_unfinished_war_id, 12)
+        self.assertListEqual(state.special_war_ids, [4])
+
+    def test_should_not_advance_past_unfinished_stored_war(self):
+        # given
+        EveWarSyncState.objects.create(
+            pk=1, max_war_id=14, open_war_ids=[[14, 14]], min_unfinished_war_id=10
+        )
+        EveWarFactory(id=12, finished=now() + dt.timedelta(days=1))
+        # when
+        state = EveWarSyncState.update_war_id_watermark()
+        # then
+        self.assertEqual(state.min_unfinished_war_id, 12)
+
+    def test_should_advance_past_newest_war_when_all_are_finished(self):
+        # given
+        EveWarSyncState.objects.create(
+            pk=1, max_war_id=14, open_war_ids=[], min_unfinished_war_id=10
+        )
+        # when
+        state = EveWarSyncState.update_war_id_watermark()
+        # then
+        self.assertEqual(state.min_unfinished_war_id, 15)
+
+    def test_should_never_move_watermark_back(self):
+        # given
+        EveWarSyncState.objects.create(
+            pk=1,
+            max_war_id=14,
+            open_war_ids=[[8, 8], [14, 14]],
+            min_unfinished_war_id=10,
+        )
+        EveWarFactory(id=9)
+        # when
+        state = EveWarSyncState.update_war_id_watermark()
+        # then
+        self.assertEqual(state.min_unfinished_war_id, 14)
+
+    @patch(MODELS_PATH + ".STANDINGSSYNC_MINIMUM_UNFINISHED_WAR_ID", 42)
+    @patch(MODELS_PATH + ".STANDINGSSYNC_SPECIAL_WAR_IDS", [1, 2])
+    def test_should_use_settings_as_override(self):
+        # given
+        state = EveWarSyncState.objects.create(
+            pk=1, min_unfinished_war_id=10, special_war_ids=[3]
+        )
+        # when/then
+        self.assertEqual(state.effective_min_unfinished_war_id(), 42)
+        self.assertSetEqual(state.effective_special_war_ids(), {1, 2})
+
+    def test_should_use_stored_values_by_default(self):
+        # given
+        state = EveWarSyncState.objects.create(
+            pk=1, min_unfinished_war_id=10, special_war_ids=[3]
+        )
+        # when/then
+        self.assertEqual(state.effective_min_unfinished_war_id(), 10)
+        self.assertSetEqual(state.effective_special_war_ids(), {3})
+
+
+class TestEveWarManagerUpdateFromEsiBulk(NoSocketsTestCase):
+    @staticmethod
+    def esi_war(war_id, aggressor_id, defender_id, ally_ids=None, **kwargs) -> dict:
+        declared = now() - dt.timedelta(days=5)
+        return {
+            "aggressor": {"alliance_id": aggressor_id},
+            "allies": [{"alliance_id": obj} for obj in ally_ids] if ally_ids else None,
+            "declared": declared,
+            "defender": {"alliance_id": defender_id},
+            "finished": None,
+            "id": war_id,
+            "mutual": False,
+            "open_for_allies": True,
+            "retracted": None,
+            "started": declared + dt.timedelta(days=1),
+            **kwargs,
+        }
+
+    def setup_esi(self, mock_esi, esi_wars: dict):
+        def esi_get_wars_war_id(war_id):
+            if war_id not in esi_wars:
+                raise OSError("Test exception")
+            return BravadoOperationStub(esi_wars[war_id])
+
+        mock_esi.client.Wars.get_wars_war_id.side_effect = esi_get_wars_war_id
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_create_and_update_wars(self, mock_esi):
+        # given
+        finished = now()
+        EveWarFactory(id=1, allies=[EveEntityAllianceFactory(id=3009)])
+        self.setup_esi(
+            mock_esi,
+            {
+                1: self.esi_war(1, 3001, 3002, [3003], finished=finished),
+                2: self.esi_war(2, 3004, 3005, [3006, 3007]),
+            },
+        )
+        # when
+        result = EveWar.objects.update_or_create_from_esi_bulk([1, 2], max_workers=2)
+        # then
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.updated, 1)
+        self.assertEqual(result.failed, 0)
+        war_1 = EveWar.objects.get(id=1)
+        self.assertEqual(war_1.aggressor_id, 3001)
+        self.assertEqual(war_1.defender_id, 3002)
+        self.assertEqual(war_1.finished, finished)
+        self.assertSetEqual(set(war_1.allies.values_list("id", flat=True)), {3003})
+        war_2 = EveWar.objects.get(id=2)
+        self.assertEqual(war_2.aggressor_id, 3004)
+        self.assertSetEqual(
+            set(war_2.allies.values_list("id", flat=True)), {3006, 3007}
+        )
+        self.assertTrue(EveEntity.objects.filter(id=3007).exists())
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_skip_writing_wars_with_unchanged_payload(self, mock_esi):
+        # given
+        self.setup_esi(
+            mock_esi,
+            {
+                1: self.esi_war(1, 3001, 3002, [3003]),
+                2: self.esi_war(2, 3004, 3005),
+            },
+        )
+        EveWar.objects.update_or_create_from_esi_bulk([1])
+        # when
+        with patch(
+            MODELS_PATH + ".EveWarTarget.objects.update_for_wars"
+        ) as mock_update_for_wars:
+            mock_update_for_wars.return_value = set()
+            result = EveWar.objects.update_or_create_from_esi_bulk([1, 2])
+        # then
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.updated, 0)
+        self.assertEqual(result.unchanged, 1)
+        args, _ = mock_update_for_wars.call_args
+        self.assertListEqual(list(args[0]), [2])
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_handle_wars_created_by_other_batch(self, mock_esi):
+        # given
+        self.setup_esi(
+            mock_esi,
+            {
+                1: self.esi_war(1, 3001, 3002, [3003]),
+                2: self.esi_war(2, 3004, 3005, [3006]),
+            },
+        )
+        other_batch = EveWar.objects.update_or_create_from_esi_bulk
+
+        def create_wars_in_other_batch(entity_ids):
+            bulk_get_or_create_eve_entities(entity_ids)
+            with patch(MANAGERS_PATH + ".bulk_get_or_create_eve_entities"):
+                other_batch([1])  # same payload
+            EveWarFactory(
+                id=2,
+                aggressor=EveEntityAllianceFactory(id=3010),
+                allies=[EveEntity.objects.get(id=3006)],
+            )  # different payload
+
+        # when
+        with patch(
+            MANAGERS_PATH + ".bulk_get_or_create_eve_entities",
+            side_effect=create_wars_in_other_batch,
+        ):
+            result = EveWar.objects.update_or_create_from_esi_bulk([1, 2])
+        # then
+        self.assertEqual(result.failed, 0)
+        war_1 = EveWar.objects.get(id=1)
+        self.assertSetEqual(set(war_1.allies.values_list("id", flat=True)), {3003})
+        war_2 = EveWar.objects.get(id=2)
+        self.assertEqual(war_2.aggressor_id, 3004)
+        self.assertSetEqual(set(war_2.allies.values_list("id", flat=True)), {3006})
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_only_look_up_allies_of_updated_wars(self, mock_esi):
+        # given
+        esi_wars = {
+            1: self.esi_war(1, 3001, 3002, [3003]),
+            2: self.esi_war(2, 3004, 3005, [3006]),
+        }
+        self.setup_esi(mock_esi, esi_wars)
+        EveWar.objects.update_or_create_from_esi_bulk([1, 2])
+        esi_wars[2] = {**esi_wars[2], "allies": [{"alliance_id": 3007}]}
+        # when
+        with patch.object(
+            EveWar.objects,
+            "_bulk_write_allies",
+            wraps=EveWar.objects._bulk_write_allies,
+        ) as spy:
+            EveWar.objects.update_or_create_from_esi_bulk([1, 2])
+        # then
+        args, _ = spy.call_args
+        self.assertSetEqual(args[1], {2})
+        war_2 = EveWar.objects.get(id=2)
+        self.assertSetEqual(set(war_2.allies.values_list("id", flat=True)), {3007})
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_only_write_changed_allies(self, mock_esi):
+        # given
+        ally_1 = EveEntityAllianceFactory(id=3011)
+        ally_2 = EveEntityAllianceFactory(id=3012)
+        EveWarFactory(id=1, allies=[ally_1, ally_2])
+        AlliesRelation = EveWar.allies.through
+        relation_pk = AlliesRelation.objects.get(evewar_id=1, eveentity_id=3012).pk
+        self.setup_esi(mock_esi, {1: self.esi_war(1, 3001, 3002, [3012, 3013])})
+        # when
+        EveWar.objects.update_or_create_from_esi_bulk([1])
+        # then
+        war = EveWar.objects.get(id=1)
+        self.assertSetEqual(set(war.allies.values_list("id", flat=True)), {3012, 3013})
+        self.assertTrue(AlliesRelation.objects.filter(pk=relation_pk).exists())
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_update_war_with_many_allies_with_few_queries(self, mock_esi):
+        # given
+        ally_ids = list(range(3100, 3150))
+        EveWarFactory(
+            id=1, allies=[EveEntityAllianceFactory(id=obj) for obj in ally_ids]
+        )
+        EveEntityAllianceFactory(id=3001)
+        EveEntityAllianceFactory(id=3002)
+        self.setup_esi(mock_esi, {1: self.esi_war(1, 3001, 3002, ally_ids)})
+        # when
+        with self.assertNumQueries(11):
+            EveWar.objects.update_or_create_from_esi(1)
+        # then
+        war = EveWar.objects.get(id=1)
+        self.assertSetEqual(set(war.allies.values_list("id", flat=True)), set(ally_ids))
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_schedule_next_check_of_wars(self, mock_esi):
+        # given
+        expires = now().replace(microsecond=0).astimezone(
+            dt.timezone.utc
+        ) + dt.timedelta(hours=1)
+        finished = now() + dt.timedelta(days=1)
+        esi_wars = {
+            1: self.esi_war(1, 3001, 3002),
+            2: self.esi_war(2, 3004, 3005, finished=finished),
+        }
+
+        def esi_get_wars_war_id(war_id):
+            return BravadoOperationStub(
+                esi_wars[war_id], headers={"Expires": format_datetime(expires, True)}
+            )
+
+        mock_esi.client.Wars.get_wars_war_id.side_effect = esi_get_wars_war_id
+        # when
+        EveWar.objects.update_or_create_from_esi_bulk([1, 2])
+        # then
+        self.assertEqual(EveWar.objects.get(id=1).next_check_at, expires)
+        self.assertEqual(EveWar.objects.get(id=2).next_check_at, finished)
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_count_failed_wars(self, mock_esi):
+        # given
+        invalid_war = self.esi_war(3, 3001, 3002)
+        invalid_war["defender"] = {}
+        self.setup_esi(mock_esi, {1: self.esi_war(1, 3001, 3002), 3: invalid_war})
+        # when
+        result = EveWar.objects.update_or_create_from_esi_bulk([1, 2, 3])
+        # then
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.failed, 2)
+        self.assertSetEqual(set(EveWar.objects.values_list("id", flat=True)), {1})
+
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_write_wars_with_constant_number_of_queries(self, mock_esi):
+        # given
+        esi_wars = {
+            war_id: self.esi_war(war_id, 3001, 3002, [3003, 3004])
+            for war_id in range(1, 51)
+        }
+        self.setup_esi(mock_esi, esi_wars)
+        # when
+        with self.assertNumQueries(13):  # incl. re-reading created wars
+            EveWar.objects.update_or_create_from_esi_bulk(esi_wars.keys())
+        # then
+        self.assertEqual(EveWar.objects.count(), 50)
+
 
 class TestEveWarManagerActiveWars(NoSocketsTestCase):
     def test_should_return_started_war_as_defender(self):
@@ -408,3 +902,160 @@ class TestEveWarManagerActiveWars(NoSocketsTestCase):
         result = EveWar.objects.active_wars()
         # then
         self.assertEqual(result.count(), 0)
+
+
+class TestEveWarManagerWarTargetIds(NoSocketsTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # given 5.000 active wars, some with our alliance as participant
+        alliance_ids = [*range(3_100_001, 3_105_001), *range(3_200_001, 3_205_001)]
+        EveEntity.objects.bulk_create(
+            [
+                EveEntity(id=obj, category=EveEntity.CATEGORY_ALLIANCE)
+                for obj in [3001, 3_300_001, 3_300_002, *alliance_ids]
+            ],
+            batch_size=200,
+        )
+        started = now() - dt.timedelta(days=1)
+        declared = started - dt.timedelta(days=1)
+        wars = [
+            EveWar(
+                id=war_id,
+                aggressor_id=3_100_000 + war_id,
+                defender_id=3_200_000 + war_id,
+                declared=declared,
+                started=started,
+                is_mutual=False,
+                is_open_for_allies=True,
+            )
+            for war_id in range(1, 5_001)
+        ]
+        wars[0].aggressor_id = 3001
+        wars[1].defender_id = 3001
+        EveWar.objects.bulk_create(wars, batch_size=200)
+        EveWar.allies.through.objects.bulk_create(
+            [
+                EveWar.allies.through(evewar_id=1, eveentity_id=3_300_001),
+                EveWar.allies.through(evewar_id=3, eveentity_id=3001),
+                EveWar.allies.through(evewar_id=4, eveentity_id=3_300_002),
+            ]
+        )
+        EveWarTarget.objects.update_for_wars(range(1, 5_001))
+
+    def test_should_return_war_targets_with_one_query(self):
+        # when
+        with self.assertNumQueries(1):
+            result = EveWar.objects.war_target_ids(3001)
+        # then
+        self.assertSetEqual(result, {3_200_001, 3_300_001, 3_100_002, 3_100_003})
+
+    def test_should_return_no_war_targets_for_unrelated_alliance(self):
+        # when
+        with self.assertNumQueries(1):
+            result = EveWar.objects.war_target_ids(3_999_999)
+        # then
+        self.assertSetEqual(result, set())
+
+    def test_should_return_war_targets_as_eve_entities(self):
+        # when
+        with self.assertNumQueries(1):
+            result = list(EveWar.objects.war_targets(3001))
+        # then
+        self.assertSetEqual(
+            {obj.id for obj in result}, {3_200_001, 3_300_001, 3_100_002, 3_100_003}
+        )
+
+
+class TestEveWarTargetManager(NoSocketsTestCase):
+    def test_should_create_war_targets_for_war(self):
+        # given
+        war = EveWarFactory.build(
+            started=now() - dt.timedelta(days=1), finished=now() + dt.timedelta(days=1)
+        )
+        war.aggressor.save()
+        war.defender.save()
+        war.save()
+        ally = EveEntityAllianceFactory()
+        war.allies.add(ally)
+        # when
+        result = EveWarTarget.objects.update_for_wars([war.id])
+        # then
+        self.assertSetEqual(result, {war.aggressor_id, war.defender_id, ally.id})
+        pairs = set(
+            EveWarTarget.objects.filter(war=war).values_list("alliance_id", "target_id")
+        )
+        self.assertSetEqual(
+            pairs,
+            {
+                (war.aggressor_id, war.defender_id),
+                (war.aggressor_id, ally.id),
+                (war.defender_id, war.aggressor_id),
+                (ally.id, war.aggressor_id),
+            },
+        )
+        obj = EveWarTarget.objects.get(war=war, alliance=war.defender)
+        self.assertEqual(obj.active_from, war.started)
+        self.assertEqual(obj.active_until, war.finished)
+
+    def test_should_report_no_changes_when_war_unchanged(self):
+        # given
+        war = EveWarFactory()
+        # when
+        result = EveWarTarget.objects.update_for_wars([war.id])
+        # then
+        self.assertSetEqual(result, set())
+
+    def test_should_end_war_targets_no_longer_in_war(self):
+        # given
+        ally = EveEntityAllianceFactory()
+        war = EveWarFactory(allies=[ally])
+        war.allies.remove(ally)
+        # when
+        result = EveWarTarget.objects.update_for_wars([war.id])
+        # then
+        self.assertSetEqual(result, {war.aggressor_id, ally.id})
+        self.assertSetEqual(EveWar.objects.war_target_ids(ally.id), set())
+        self.assertSetEqual(
+            EveWar.objects.war_target_ids(war.aggressor_id), {war.defender_id}
+        )
+
+    def test_should_update_active_window_when_war_finishes(self):
+        # given
+        war = EveWarFactory()
+        war.finished = now() - dt.timedelta(seconds=1)
+        war.save()
+        # when
+        result = EveWarTarget.objects.update_for_wars([war.id])
+        # then
+        self.assertSetEqual(result, {war.aggressor_id, war.defender_id})
+        self.assertSetEqual(EveWar.objects.war_target_ids(war.aggressor_id), set())
+
+    def test_should_return_alliances_with_changed_war_targets(self):
+        # given
+        war_1 = EveWarFactory()
+        war_3 = EveWarFactory(started=now() + dt.timedelta(days=1))
+        since = now()
+        war_2 = EveWarFactory()
+        # when
+        result = EveWarTarget.objects.alliance_ids_changed_since(since)
+        # then
+        self.assertSetEqual(result, {war_2.aggressor_id, war_2.defender_id})
+        self.assertNotIn(war_1.aggressor_id, result)
+        self.assertNotIn(war_3.aggressor_id, result)
+
+
+class TestSyncManagerQuerySet(NoSocketsTestCase):
+    def test_should_return_due_sync_managers(self):
+        # given
+        sync_manager_1 = SyncManagerFactory(next_sync_at=None)
+        sync_manager_2 = SyncManagerFactory(
+            next_sync_at=now() - dt.timedelta(seconds=1)
+        )
+        SyncManagerFactory(next_sync_at=now() + dt.timedelta(minutes=5))
+        # when
+        result = SyncManager.objects.due()
+        # then
+        self.assertSetEqual(
+            set(result.values_list("pk", flat=True)),
+            {sync_manager_1.pk, sync_manager_2.pk},
+        )
@@ -1,7 +1,10 @@
 import datetime as dt
 from unittest.mock import Mock, patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 from esi.errors import TokenExpiredError, TokenInvalidError
 from esi.models import Token
@@ -9,11 +12,13 @@ from eveuniverse.models import EveEntity
 
 from allianceauth.authentication.models import CharacterOwnership
 from allianceauth.eveonline.models import EveCharacter
+from allianceauth.notifications import notify
+from allianceauth.notifications.models import Notification
 from allianceauth.tests.auth_utils import AuthUtils
 from app_utils.esi_testing import BravadoOperationStub
 from app_utils.testing import NoSocketsTestCase, create_user_from_evecharacter
 
-from ..models import EveContact, EveWar, SyncedCharacter, SyncManager
+from ..models import EveContact, SyncedCharacter, SyncManager
 from .factories import (
     EveContactFactory,
     EveContactWarTargetFactory,
@@ -28,6 +33,7 @@ from .utils import (
     EsiCharacterContactsStub,
     EsiContact,
     EsiContactLabel,
+    EsiEndpointStub,
     LoadTestDataMixin,
 )
 
@@ -124,6 +130,44 @@ class TestGetEffectiveStanding(LoadTestDataMixin, NoSocketsTestCase):
         )
         self.assertEqual(self.sync_manager.get_effective_standing(c4), 0.0)
 
+    def test_should_need_one_query_for_one_character(self):
+        c3 = EveCharacter(
+            character_id=1003,
+            character_name="Char 3",
+            corporation_id=2003,
+            corporation_name="Corporation 3",
+            corporation_ticker="C2",
+            alliance_id=3001,
+            alliance_name="Alliance 1",
+            alliance_ticker="A1",
+        )
+        with self.assertNumQueries(1):
+            self.sync_manager.get_effective_standing(c3)
+
+    def test_should_return_standings_for_many_characters_with_one_query(self):
+        # given
+        characters = [
+            EveCharacter(
+                character_id=character_id,
+                character_name=f"Char {character_id}",
+                corporation_id=2003 if character_id % 2 else 2001,
+                corporation_name="Corporation",
+                corporation_ticker="C2",
+                alliance_id=3001 if character_id % 4 == 1 else None,
+            )
+            for character_id in range(1_100_001, 1_105_001)
+        ]
+        characters[0].character_id = 1001
+        # when
+        with self.assertNumQueries(1):
+            result = self.sync_manager.get_effective_standings(characters)
+        # then
+        self.assertEqual(len(result), 5_000)
+        self.assertEqual(result[1001], -10)
+        self.assertEqual(result[1_100_002], 10)  # corporation
+        self.assertEqual(result[1_100_003], 0)  # no alliance
+        self.assertEqual(result[1_100_005], 5)  # alliance
+
 
 class TestSyncManager(LoadTestDataMixin, NoSocketsTestCase):
     @classmethod
@@ -268,7 +312,7 @@ class TestSyncManager(LoadTestDataMixin, NoSocketsTestCase):
         SyncedCharacterFactory(
             character_ownership=self.alt_ownership, manager=sync_manager
         )
-        EveWar.objects.create(
+        EveWarFactory(
             id=8,
             aggressor=EveEntity.objects.get(id=3015),
             defender=EveEntity.objects.get(id=3001),
@@ -320,6 +364,248 @@ def fetch_war_targets():
     )
 
 
+class TestSyncManagerDeactivateIneligibleCharacters(LoadTestDataMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_1, _ = create_user_from_evecharacter(
+            cls.character_1.character_id, permissions=["standingssync.add_syncmanager"]
+        )
+        cls.user_2, _ = create_user_from_evecharacter(cls.character_2.character_id)
+        cls.alt_ownership_4 = CharacterOwnership.objects.create(
+            character=cls.character_4, owner_hash="x4", user=cls.user_2
+        )
+        cls.alt_ownership_5 = CharacterOwnership.objects.create(
+            character=cls.character_5, owner_hash="x5", user=cls.user_2
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.sync_manager = SyncManagerFactory(user=self.user_1)
+        for contact in ALLIANCE_CONTACTS:
+            EveContactFactory(
+                manager=self.sync_manager,
+                eve_entity=EveEntity.objects.get(id=contact["contact_id"]),
+                standing=contact["standing"],
+            )
+
+    def test_should_deactivate_characters_which_are_no_longer_blue(self):
+        # given
+        synced_character_4 = SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_4, manager=self.sync_manager
+        )
+        synced_character_5 = SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_5, manager=self.sync_manager
+        )
+        # when
+        result = self.sync_manager.deactivate_ineligible_characters()
+        # then
+        self.assertSetEqual(result, {synced_character_5.pk})
+        self.assertSetEqual(
+            set(self.sync_manager.synced_characters.values_list("pk", flat=True)),
+            {synced_character_4.pk},
+        )
+        notification = self.user_2.notification_set.get()
+        self.assertIn(self.character_5.character_name, notification.title)
+        self.assertIn("-10.0", notification.message)
+
+    def test_should_update_unread_notification_count(self):
+        # given
+        SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_5, manager=self.sync_manager
+        )
+        self.assertEqual(Notification.objects.user_unread_count(self.user_2.pk), 0)
+        # when
+        self.sync_manager.deactivate_ineligible_characters()
+        # then
+        self.assertEqual(Notification.objects.user_unread_count(self.user_2.pk), 1)
+
+    @override_settings(NOTIFICATIONS_MAX_PER_USER=1)
+    def test_should_respect_notification_limit_per_user(self):
+        # given
+        SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_5, manager=self.sync_manager
+        )
+        notify(self.user_2, "Old notification")
+        # when
+        self.sync_manager.deactivate_ineligible_characters()
+        # then
+        notification = self.user_2.notification_set.get()
+        self.assertIn(self.character_5.character_name, notification.title)
+
+    def test_should_need_constant_number_of_queries(self):
+        # given
+        SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_4, manager=self.sync_manager
+        )
+        SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_5, manager=self.sync_manager
+        )
+        # when
+        with CaptureQueriesContext(connection) as context:
+            self.sync_manager.deactivate_ineligible_characters()
+        # then
+        self.assertLess(len(context.captured_queries), 10)
+
+    def test_should_do_nothing_when_all_characters_are_blue(self):
+        # given
+        SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_4, manager=self.sync_manager
+        )
+        # when
+        result = self.sync_manager.deactivate_ineligible_characters()
+        # then
+        self.assertSetEqual(result, set())
+        self.assertEqual(self.sync_manager.synced_characters.count(), 1)
+
+
+class TestSyncManagerContactsSnapshot(LoadTestDataMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_1, _ = create_user_from_evecharacter(
+            cls.character_1.character_id, permissions=["standingssync.add_syncmanager"]
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.sync_manager = SyncManagerFactory(user=self.user_1, version_hash="v1")
+        EveContactFactory(
+            manager=self.sync_manager,
+            eve_entity=EveEntity.objects.get(id=1002),
+            standing=10,
+        )
+
+    def test_should_create_snapshot_from_db_on_cache_miss(self):
+        # when
+        with self.assertNumQueries(4):  # incl. savepoint and release
+            snapshot = self.sync_manager.contacts_snapshot()
+        # then
+        self.assertEqual(snapshot.version_hash, "v1")
+        self.assertDictEqual(snapshot.standings(), {1002: 10.0})
+
+    def test_should_return_snapshot_from_cache(self):
+        # given
+        self.sync_manager.contacts_snapshot()
+        # when
+        with self.assertNumQueries(0):
+            snapshot = self.sync_manager.contacts_snapshot()
+        # then
+        self.assertDictEqual(snapshot.standings(), {1002: 10.0})
+
+    def test_should_create_new_snapshot_when_version_changed(self):
+        # given
+        self.sync_manager.contacts_snapshot()
+        EveContactFactory(
+            manager=self.sync_manager,
+            eve_entity=EveEntity.objects.get(id=1004),
+            standing=5,
+        )
+        self.sync_manager.version_hash = "v2"
+        self.sync_manager.save()
+        # when
+        snapshot = self.sync_manager.contacts_snapshot()
+        # then
+        self.assertEqual(snapshot.version_hash, "v2")
+        self.assertDictEqual(snapshot.standings(), {1002: 10.0, 1004: 5.0})
+
+    def test_should_store_snapshot_under_version_of_its_contacts(self):
+        # given
+        other = SyncManager.objects.get(pk=self.sync_manager.pk)
+        EveContactFactory(
+            manager=other, eve_entity=EveEntity.objects.get(id=1004), standing=5
+        )
+        other.version_hash = "v2"
+        other.save()  # contacts changed after version was read by sync_manager
+        # when
+        snapshot = self.sync_manager.contacts_snapshot()
+        # then
+        self.assertEqual(snapshot.version_hash, "v2")
+        self.assertDictEqual(snapshot.standings(), {1002: 10.0, 1004: 5.0})
+        self.assertIsNone(cache.get(self.sync_manager._contacts_snapshot_cache_key()))
+        self.assertEqual(other.contacts_snapshot(), snapshot)
+
+    @patch(MODELS_PATH + ".esi")
+    def test_should_store_snapshot_after_update_from_esi(self, mock_esi):
+        # given
+        mock_esi.client.Contacts.get_alliances_alliance_id_contacts.return_value = (
+            BravadoOperationStub(ALLIANCE_CONTACTS)
+        )
+        token = Mock(spec=Token)
+        # when
+        self.sync_manager._perform_update_from_esi(token, force_sync=False)
+        # then
+        with self.assertNumQueries(0):
+            snapshot = self.sync_manager.contacts_snapshot()
+        self.assertEqual(len(snapshot), len(ALLIANCE_CONTACTS) + 1)
+
+
+@patch("standingssync.core.esi_etags.STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS", True)
+@patch(MODELS_PATH + ".esi")
+class TestSyncManagerConditionalRequests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_skip_update_when_contacts_are_not_modified(self, mock_esi):
+        # given
+        endpoint = EsiEndpointStub(ALLIANCE_CONTACTS)
+        mock_esi.client.Contacts.get_alliances_alliance_id_contacts = endpoint
+        sync_manager = SyncManagerFactory()
+        version_hash = sync_manager.update_from_esi()
+        # when
+        with patch(
+            MODELS_PATH + ".EveContact.objects.update_for_manager"
+        ) as mock_update_for_manager:
+            result = sync_manager.update_from_esi()
+        # then
+        self.assertEqual(result, version_hash)
+        self.assertFalse(mock_update_for_manager.called)
+        self.assertIn("_request_options", endpoint.calls[1])
+
+    @patch(MODELS_PATH + ".STANDINGSSYNC_ADD_WAR_TARGETS", True)
+    def test_should_update_when_war_targets_changed(self, mock_esi):
+        # given
+        endpoint = EsiEndpointStub([])
+        mock_esi.client.Contacts.get_alliances_alliance_id_contacts = endpoint
+        sync_manager = SyncManagerFactory()
+        sync_manager.update_from_esi()
+        war = EveWarFactory(
+            aggressor=EveEntityAllianceFactory(id=sync_manager.alliance.alliance_id)
+        )
+        # when
+        sync_manager.update_from_esi()
+        # then
+        self.assertSetEqual(fetch_war_targets(), {war.defender.id})
+        self.assertNotIn("_request_options", endpoint.calls[2])
+
+    @patch(MODELS_PATH + ".STANDINGSSYNC_ADD_WAR_TARGETS", True)
+    def test_should_update_when_war_targets_changed_during_last_sync(self, mock_esi):
+        # given
+        endpoint = EsiEndpointStub([])
+        mock_esi.client.Contacts.get_alliances_alliance_id_contacts = endpoint
+        sync_manager = SyncManagerFactory()
+        aggressor = EveEntityAllianceFactory(id=sync_manager.alliance.alliance_id)
+        wars = []
+        set_sync_status = sync_manager.set_sync_status
+
+        def create_war_and_set_sync_status(status):
+            # war is stored after war targets were read by the sync
+            wars.append(EveWarFactory(aggressor=aggressor))
+            set_sync_status(status)
+
+        with patch.object(
+            sync_manager,
+            "set_sync_status",
+            side_effect=create_war_and_set_sync_status,
+        ):
+            sync_manager.update_from_esi()
+        self.assertSetEqual(fetch_war_targets(), set())
+        # when
+        sync_manager.update_from_esi()
+        # then
+        self.assertSetEqual(fetch_war_targets(), {wars[0].defender.id})
+
+
 @patch(MODELS_PATH + ".STANDINGSSYNC_ADD_WAR_TARGETS", True)
 @patch(MODELS_PATH + ".esi")
 class TestSyncManager2(NoSocketsTestCase):
@@ -339,6 +625,24 @@ class TestSyncManager2(NoSocketsTestCase):
         sync_manager.refresh_from_db()
         self.assertSetEqual(fetch_war_targets(), {war.defender.id})
 
+    def test_should_record_when_contacts_expire(self, mock_esi):
+        # given
+        mock_esi.client.Contacts.get_alliances_alliance_id_contacts.return_value = (
+            BravadoOperationStub(
+                [], headers={"Expires": "Sun, 18 Oct 2026 12:00:00 GMT"}
+            )
+        )
+        sync_manager = SyncManagerFactory()
+        # when
+        result = sync_manager.update_from_esi()
+        # then
+        self.assertTrue(result)
+        sync_manager.refresh_from_db()
+        self.assertEqual(
+            sync_manager.next_sync_at,
+            dt.datetime(2026, 10, 18, 12, 0, tzinfo=dt.timezone.utc),
+        )
+
     def test_should_add_war_target_contact_as_aggressor_2(self, mock_esi):
         # given
         mock_esi.client.Contacts.get_alliances_alliance_id_contacts.return_value = (
@@ -422,6 +726,24 @@ class TestSyncManager2(NoSocketsTestCase):
         sync_manager.refresh_from_db()
         self.assertSetEqual(fetch_war_targets(), set())
 
+    def test_should_store_many_contacts_with_few_queries(self, mock_esi):
+        # given
+        contacts = [
+            {"contact_id": contact_id, "contact_type": "character", "standing": 5.0}
+            for contact_id in range(8000001, 8002001)
+        ]
+        mock_esi.client.Contacts.get_alliances_alliance_id_contacts.return_value = (
+            BravadoOperationStub(contacts)
+        )
+        sync_manager = SyncManagerFactory()
+        # when
+        with CaptureQueriesContext(connection) as context:
+            result = sync_manager.update_from_esi()
+        # then
+        self.assertTrue(result)
+        self.assertEqual(sync_manager.contacts.count(), 2001)
+        self.assertLess(len(context.captured_queries), 50)
+
     def test_do_nothing_when_contacts_are_unchanged(self, mock_esi):
         # given
         mock_esi.client.Contacts.get_alliances_alliance_id_contacts.return_value = (
@@ -487,6 +809,7 @@ class TestSyncCharacter(LoadTestDataMixin, TestCase):
 
     def setUp(self) -> None:
         self.maxDiff = None
+        cache.clear()  # contact snapshots of other tests can have the same key
         self.synced_character_2 = SyncedCharacterFactory(
             character_ownership=self.alt_ownership_2, manager=self.sync_manager
         )
@@ -619,6 +942,40 @@ class TestSyncCharacter(LoadTestDataMixin, TestCase):
             set(self.alliance_contacts),
         )
 
+    @patch(MODELS_PATH + ".STANDINGSSYNC_ADD_WAR_TARGETS", False)
+    @patch(MODELS_PATH + ".STANDINGSSYNC_REPLACE_CONTACTS", True)
+    @patch(MODELS_PATH + ".STANDINGSSYNC_CHAR_MIN_STANDING", 0.0)
+    @patch(MODELS_PATH + ".Token")
+    @patch(MODELS_PATH + ".esi")
+    def test_should_only_write_changed_contacts_when_replacing(
+        self, mock_esi, mock_Token
+    ):
+        # given
+        character_id = self.synced_character_3.character.character_id
+        character_contacts = [
+            EsiContact(obj.contact_id, obj.contact_type, obj.standing)
+            for obj in self.alliance_contacts
+            if obj.contact_id != 3015
+        ]
+        character_contacts.append(
+            EsiContact(3015, EsiContact.ContactType.ALLIANCE, standing=-5.0)
+        )
+        esi_character_contacts = EsiCharacterContactsStub()
+        esi_character_contacts.setup_contacts(character_id, character_contacts)
+        # when
+        result = self._run_sync(
+            mock_esi, mock_Token, self.synced_character_3, esi_character_contacts
+        )
+        # then
+        self.assertTrue(result)
+        self.assertSetEqual(
+            set(esi_character_contacts.contacts(character_id)),
+            set(self.alliance_contacts),
+        )
+        self.assertListEqual(
+            esi_character_contacts.write_calls, [("put", frozenset([3015]))]
+        )
+
     @patch(MODELS_PATH + ".STANDINGSSYNC_ADD_WAR_TARGETS", True)
     @patch(MODELS_PATH + ".STANDINGSSYNC_REPLACE_CONTACTS", True)
     @patch(MODELS_PATH + ".STANDINGSSYNC_CHAR_MIN_STANDING", 0.01)
@@ -947,6 +1304,109 @@ class TestSyncCharacter(LoadTestDataMixin, TestCase):
         )
 
 
+@patch("standingssync.core.esi_etags.STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS", True)
+@patch(MODELS_PATH + ".STANDINGSSYNC_WAR_TARGETS_LABEL_NAME", "WAR TARGETS")
+@patch(MODELS_PATH + ".STANDINGSSYNC_ADD_WAR_TARGETS", True)
+@patch(MODELS_PATH + ".STANDINGSSYNC_REPLACE_CONTACTS", False)
+@patch(MODELS_PATH + ".STANDINGSSYNC_CHAR_MIN_STANDING", 0.01)
+@patch(MODELS_PATH + ".Token")
+@patch(MODELS_PATH + ".esi")
+class TestSyncCharacterConditionalRequests(LoadTestDataMixin, TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        user, _ = create_user_from_evecharacter(
+            self.character_1.character_id,
+            permissions=["standingssync.add_syncedcharacter"],
+        )
+        ownership = CharacterOwnership.objects.create(
+            character=self.character_2, owner_hash="x2", user=user
+        )
+        self.sync_manager = SyncManagerFactory(user=user, version_hash="new")
+        for contact in ALLIANCE_CONTACTS:
+            EveContactFactory(
+                manager=self.sync_manager,
+                eve_entity=EveEntity.objects.get(id=contact["contact_id"]),
+                standing=contact["standing"],
+            )
+        self.sync_manager.contacts.filter(eve_entity_id__in=[1014, 3013]).update(
+            is_war_target=True, standing=-10.0
+        )
+        self.synced_character = SyncedCharacterFactory(
+            character_ownership=ownership, manager=self.sync_manager
+        )
+        self.character_id = self.character_2.character_id
+        self.esi_character_contacts = EsiCharacterContactsStub()
+        self.esi_character_contacts.setup_labels(
+            self.character_id, [EsiContactLabel(99, "war targets")]
+        )
+        self.esi_character_contacts.setup_contacts(
+            self.character_id,
+            [
+                EsiContact(1014, EsiContact.ContactType.CHARACTER, standing=10.0),
+                EsiContact(2011, EsiContact.ContactType.CORPORATION, standing=5.0),
+            ],
+        )
+
+    def _run_sync(self, mock_esi, mock_Token):
+        self.esi_character_contacts.setup_esi_mock(mock_esi)
+        mock_Token.objects.filter = Mock()
+        self.esi_character_contacts.write_calls.clear()
+        return self.synced_character.update(force_sync=True)
+
+    def _contacts_request_options(self) -> list:
+        return [
+            options
+            for endpoint, options in self.esi_character_contacts.read_calls
+            if endpoint == "contacts"
+        ]
+
+    def test_should_reuse_stored_contacts_when_not_modified(self, mock_esi, mock_Token):
+        # given
+        self._run_sync(mock_esi, mock_Token)  # adds war targets
+        self._run_sync(mock_esi, mock_Token)  # stores ETag
+        # when
+        result = self._run_sync(mock_esi, mock_Token)
+        # then
+        self.assertTrue(result)
+        self.assertIn("If-None-Match", self._contacts_request_options()[2]["headers"])
+        self.assertListEqual(self.esi_character_contacts.write_calls, [])
+
+    def test_should_not_send_etag_after_contacts_were_changed(
+        self, mock_esi, mock_Token
+    ):
+        # given
+        self._run_sync(mock_esi, mock_Token)
+        self.assertTrue(self.esi_character_contacts.write_calls)
+        # when
+        result = self._run_sync(mock_esi, mock_Token)
+        # then
+        self.assertTrue(result)
+        self.assertIsNone(self._contacts_request_options()[1])
+
+    def test_should_update_from_stored_contacts_when_war_targets_changed(
+        self, mock_esi, mock_Token
+    ):
+        # given
+        self._run_sync(mock_esi, mock_Token)
+        self._run_sync(mock_esi, mock_Token)
+        self.sync_manager.contacts.filter(eve_entity_id=3015).update(
+            is_war_target=True, standing=-10.0
+        )
+        self.sync_manager.version_hash = "changed"
+        self.sync_manager.save()
+        # when
+        result = self._run_sync(mock_esi, mock_Token)
+        # then
+        self.assertTrue(result)
+        self.assertIn("If-None-Match", self._contacts_request_options()[2]["headers"])
+        self.assertListEqual(
+            self.esi_character_contacts.write_calls, [("post", frozenset({3015}))]
+        )
+        self._run_sync(mock_esi, mock_Token)
+        self.assertIsNone(self._contacts_request_options()[3])
+        self.assertListEqual(self.esi_character_contacts.write_calls, [])
+
+
 class TestSyncCharacter2(NoSocketsTestCase):
     def test_should_not_sync_when_no_contacts(self):
         # given
@@ -1,17 +1,23 @@
+import datetime as dt
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase, override_settings
+from django.utils.timezone import now
 from eveuniverse.models import EveEntity
 
 from allianceauth.authentication.models import CharacterOwnership
 from app_utils.testing import (
     NoSocketsTestCase,
+    add_new_token,
     create_user_from_evecharacter,
     generate_invalid_pk,
 )
 
 from .. import tasks
-from ..models import SyncedCharacter, SyncManager
+from ..core.task_lock import TaskLock
+from ..managers import WarsUpdateResult
+from ..models import EveWarSyncState, SyncedCharacter, SyncManager
 from .factories import EveContactFactory, SyncedCharacterFactory, SyncManagerFactory
 from .utils import ALLIANCE_CONTACTS, LoadTestDataMixin
 
@@ -40,6 +46,27 @@ class TestRunRegularSync(LoadTestDataMixin, NoSocketsTestCase):
         _, kwargs = mock_run_manager_sync.apply_async.call_args
         self.assertListEqual(kwargs["args"], [sync_manager.pk])
 
+    def test_should_start_tasks_only_when_due(
+        self, mock_update_all_wars, mock_run_manager_sync
+    ):
+        # given
+        sync_manager_1 = SyncManagerFactory(
+            user=self.user_1, next_sync_at=now() - dt.timedelta(seconds=1)
+        )
+        user_2, _ = create_user_from_evecharacter(self.character_3.character_id)
+        SyncManagerFactory(user=user_2, next_sync_at=now() + dt.timedelta(minutes=5))
+        EveWarSyncState.objects.create(
+            pk=1, next_sync_at=now() + dt.timedelta(minutes=5)
+        )
+        with patch(TASKS_PATH + ".is_esi_online", lambda: True):
+            # when
+            tasks.run_regular_sync()
+        # then
+        self.assertFalse(mock_update_all_wars.apply_async.called)
+        self.assertEqual(mock_run_manager_sync.apply_async.call_count, 1)
+        _, kwargs = mock_run_manager_sync.apply_async.call_args
+        self.assertListEqual(kwargs["args"], [sync_manager_1.pk])
+
     def test_abort_when_esi_if_offline(
         self, mock_update_all_wars, mock_run_manager_sync
     ):
@@ -52,7 +79,7 @@ class TestRunRegularSync(LoadTestDataMixin, NoSocketsTestCase):
         self.assertFalse(mock_run_manager_sync.apply_async.called)
 
 
-class TestCharacterSync(LoadTestDataMixin, NoSocketsTestCase):
+class TestCharacterSync(LoadTestDataMixin, TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -83,6 +110,9 @@ class TestCharacterSync(LoadTestDataMixin, NoSocketsTestCase):
             character_ownership=alt_ownership_3, manager=cls.sync_manager
         )
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_run_character_sync_wrong_pk(self):
         """calling for an non existing sync character should raise an exception"""
         with self.assertRaises(SyncedCharacter.DoesNotExist):
@@ -106,6 +136,139 @@ class TestCharacterSync(LoadTestDataMixin, NoSocketsTestCase):
         with self.assertRaises(RuntimeError):
             tasks.run_character_sync(self.synced_character_2)
 
+    @patch(TASKS_PATH + ".run_character_sync.apply_async")
+    @patch(TASKS_PATH + ".SyncedCharacter.update")
+    def test_should_skip_duplicate_run_and_rerun_after_finish(
+        self, mock_update, mock_apply_async
+    ):
+        # given
+        pk = self.synced_character_2.pk
+
+        def update_with_duplicate(force_sync):
+            return tasks.run_character_sync(pk, force_sync=True)
+
+        mock_update.side_effect = update_with_duplicate
+        # when
+        result = tasks.run_character_sync(pk)
+        # then
+        self.assertFalse(result)  # result of the skipped duplicate
+        self.assertEqual(mock_update.call_count, 1)
+        mock_apply_async.assert_called_once()
+        _, kwargs = mock_apply_async.call_args
+        self.assertDictEqual(kwargs["kwargs"], {"sync_char_pk": pk, "force_sync": True})
+        lock = TaskLock("run_character_sync", pk, 60)
+        self.assertEqual(lock.skipped_count(), 1)
+        self.assertTrue(lock.acquire())  # lock was released
+
+    @patch(TASKS_PATH + ".run_character_sync.apply_async")
+    @patch(TASKS_PATH + ".SyncedCharacter.update")
+    def test_should_release_lock_after_exception(self, mock_update, mock_apply_async):
+        # given
+        mock_update.side_effect = RuntimeError
+        pk = self.synced_character_2.pk
+        # when
+        with self.assertRaises(RuntimeError):
+            tasks.run_character_sync(pk)
+        # then
+        self.assertTrue(TaskLock("run_character_sync", pk, 60).acquire())
+        self.assertFalse(mock_apply_async.called)
+
+
+@patch(TASKS_PATH + ".STANDINGSSYNC_CHARACTER_SYNC_MAX_WORKERS", 1)
+class TestCharacterSyncs(LoadTestDataMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_1, _ = create_user_from_evecharacter(
+            cls.character_1.character_id,
+            permissions=["standingssync.add_syncedcharacter"],
+        )
+        cls.token_2 = add_new_token(
+            cls.user_1, cls.character_2, SyncedCharacter.get_esi_scopes()
+        )
+        alt_ownership_2 = CharacterOwnership.objects.get(character=cls.character_2)
+        cls.user_2, _ = create_user_from_evecharacter(cls.character_3.character_id)
+        alt_ownership_4 = CharacterOwnership.objects.create(
+            character=cls.character_4, owner_hash="x4", user=cls.user_2
+        )
+        cls.sync_manager = SyncManagerFactory(user=cls.user_1, version_hash="new")
+        cls.synced_character_2 = SyncedCharacterFactory(
+            character_ownership=alt_ownership_2, manager=cls.sync_manager
+        )
+        cls.synced_character_4 = SyncedCharacterFactory(
+            character_ownership=alt_ownership_4, manager=cls.sync_manager
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    @patch(TASKS_PATH + ".SyncedCharacter.update", autospec=True)
+    def test_should_sync_characters_with_prefetched_objects(self, mock_update):
+        # given
+        mock_update.return_value = True
+        pks = [self.synced_character_2.pk, self.synced_character_4.pk]
+        # when
+        with self.assertNumQueries(10):
+            result = tasks.run_character_syncs(pks)
+        # then
+        self.assertDictEqual(result, {pk: "ok" for pk in pks})
+        calls = {call.args[0].pk: call.kwargs for call in mock_update.call_args_list}
+        self.assertEqual(calls[self.synced_character_2.pk]["token"], self.token_2)
+        self.assertTrue(calls[self.synced_character_2.pk]["has_permission"])
+        self.assertIsNone(calls[self.synced_character_4.pk]["token"])
+        self.assertFalse(calls[self.synced_character_4.pk]["has_permission"])
+
+    @patch(TASKS_PATH + ".SyncedCharacter.update", autospec=True)
+    def test_should_report_outcome_for_each_character(self, mock_update):
+        # given
+        def update(synced_character, force_sync, token, has_permission):
+            if synced_character.pk == self.synced_character_4.pk:
+                raise RuntimeError
+            return False
+
+        mock_update.side_effect = update
+        invalid_pk = generate_invalid_pk(SyncedCharacter)
+        # when
+        result = tasks.run_character_syncs(
+            [self.synced_character_2.pk, self.synced_character_4.pk, invalid_pk]
+        )
+        # then
+        self.assertDictEqual(
+            result,
+            {
+                self.synced_character_2.pk: "deactivated",
+                self.synced_character_4.pk: "error",
+                invalid_pk: "not_found",
+            },
+        )
+        self.synced_character_4.refresh_from_db()
+        self.assertEqual(
+            self.synced_character_4.last_error, SyncedCharacter.Error.UNKNOWN
+        )
+
+    @patch(TASKS_PATH + ".SyncedCharacter.update", autospec=True)
+    def test_should_skip_characters_which_are_already_syncing(self, mock_update):
+        # given
+        mock_update.return_value = True
+        TaskLock("run_character_sync", self.synced_character_2.pk, 60).acquire()
+        # when
+        result = tasks.run_character_syncs([self.synced_character_2.pk])
+        # then
+        self.assertDictEqual(result, {self.synced_character_2.pk: "skipped"})
+        self.assertFalse(mock_update.called)
+
+    @patch(TASKS_PATH + ".STANDINGSSYNC_CHARACTER_SYNC_MAX_WORKERS", 2)
+    @patch(TASKS_PATH + ".SyncedCharacter.update", autospec=True)
+    def test_should_sync_characters_in_parallel(self, mock_update):
+        # given
+        mock_update.return_value = True
+        pks = [self.synced_character_2.pk, self.synced_character_4.pk]
+        # when
+        result = tasks.run_character_syncs(pks)
+        # then
+        self.assertDictEqual(result, {pk: "ok" for pk in pks})
+        self.assertEqual(mock_update.call_count, 2)
+
 
 @patch(TASKS_PATH + ".run_character_sync")
 class TestManagerSync(LoadTestDataMixin, TestCase):
@@ -127,11 +290,32 @@ class TestManagerSync(LoadTestDataMixin, TestCase):
             character=cls.character_4, owner_hash="x4", user=cls.user_2
         )
 
+    def setUp(self) -> None:
+        cache.clear()
+
     # run for non existing sync manager
     def test_run_sync_wrong_pk(self, mock_run_character_sync):
         with self.assertRaises(SyncManager.DoesNotExist):
             tasks.run_manager_sync(99999)
 
+    @patch(TASKS_PATH + ".run_manager_sync.apply_async")
+    @patch(MODELS_PATH + ".SyncManager.update_from_esi")
+    def test_should_skip_when_already_running(
+        self, mock_update_from_esi, mock_apply_async, mock_run_character_sync
+    ):
+        # given
+        sync_manager = SyncManagerFactory(user=self.user_1)
+        lock = TaskLock("run_manager_sync", sync_manager.pk, 60)
+        lock.acquire()
+        # when
+        result = tasks.run_manager_sync(sync_manager.pk)
+        # then
+        self.assertFalse(result)
+        self.assertFalse(mock_update_from_esi.called)
+        self.assertEqual(lock.skipped_count(), 1)
+        self.assertFalse(lock.release())  # rerun requested without force
+        self.assertFalse(mock_apply_async.called)
+
     @patch(MODELS_PATH + ".SyncManager.update_from_esi")
     def test_should_report_error_when_unexpected_exception_occurs(
         self, mock_update_from_esi, mock_run_character_sync
@@ -147,8 +331,9 @@ class TestManagerSync(LoadTestDataMixin, TestCase):
         self.assertEqual(sync_manager.last_error, SyncManager.Error.UNKNOWN)
 
     @patch(MODELS_PATH + ".SyncManager.update_from_esi")
+    @patch(TASKS_PATH + ".run_character_syncs")
     def test_should_normally_run_character_sync(
-        self, mock_update_from_esi, mock_run_character_sync
+        self, mock_run_character_syncs, mock_update_from_esi, mock_run_character_sync
     ):
         # given
         mock_update_from_esi.return_value = "abc"
@@ -162,10 +347,64 @@ class TestManagerSync(LoadTestDataMixin, TestCase):
         sync_manager.refresh_from_db()
         self.assertTrue(result)
         self.assertEqual(sync_manager.last_error, SyncManager.Error.NONE)
+        _, kwargs = mock_run_character_syncs.apply_async.call_args
+        self.assertEqual(kwargs["kwargs"]["sync_char_pks"], [synced_character.pk])
+        self.assertFalse(kwargs["kwargs"]["force_sync"])
+        self.assertFalse(mock_run_character_sync.apply_async.called)
+
+    @patch(TASKS_PATH + ".STANDINGSSYNC_CHARACTER_SYNC_BATCH_SIZE", 0)
+    @patch(MODELS_PATH + ".SyncManager.update_from_esi")
+    def test_should_run_character_sync_for_each_character(
+        self, mock_update_from_esi, mock_run_character_sync
+    ):
+        # given
+        mock_update_from_esi.return_value = "abc"
+        sync_manager = SyncManagerFactory(user=self.user_1)
+        synced_character = SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_2, manager=sync_manager
+        )
+        # when
+        result = tasks.run_manager_sync(sync_manager.pk)
+        # then
+        self.assertTrue(result)
         _, kwargs = mock_run_character_sync.apply_async.call_args
         self.assertEqual(kwargs["kwargs"]["sync_char_pk"], synced_character.pk)
         self.assertFalse(kwargs["kwargs"]["force_sync"])
 
+    @patch(TASKS_PATH + ".run_character_syncs")
+    @patch(MODELS_PATH + ".SyncManager.update_from_esi")
+    def test_should_run_character_sync_only_for_eligible_characters(
+        self, mock_update_from_esi, mock_run_character_syncs, mock_run_character_sync
+    ):
+        # given
+        mock_update_from_esi.return_value = "abc"
+        sync_manager = SyncManagerFactory(user=self.user_1)
+        for contact in ALLIANCE_CONTACTS:
+            EveContactFactory(
+                manager=sync_manager,
+                eve_entity=EveEntity.objects.get(id=contact["contact_id"]),
+                standing=contact["standing"],
+            )
+        synced_character = SyncedCharacterFactory(
+            character_ownership=self.alt_ownership_2, manager=sync_manager
+        )
+        alt_ownership_5 = CharacterOwnership.objects.create(
+            character=self.character_5, owner_hash="x5", user=self.user_2
+        )
+        SyncedCharacterFactory(
+            character_ownership=alt_ownership_5, manager=sync_manager
+        )
+        # when
+        result = tasks.run_manager_sync(sync_manager.pk)
+        # then
+        self.assertTrue(result)
+        self.assertEqual(mock_run_character_syncs.apply_async.call_count, 1)
+        _, kwargs = mock_run_character_syncs.apply_async.call_args
+        self.assertEqual(kwargs["kwargs"]["sync_char_pks"], [synced_character.pk])
+        self.assertFalse(
+            SyncedCharacter.objects.filter(character_ownership=alt_ownership_5).exists()
+        )
+
 
 @override_settings(CELERY_ALWAYS_EAGER=True, CELERY_EAGER_PROPAGATES_EXCEPTIONS=True)
 class TestUpdateWars(LoadTestDataMixin, NoSocketsTestCase):
@@ -173,6 +412,7 @@ class TestUpdateWars(LoadTestDataMixin, NoSocketsTestCase):
     def setUpClass(cls):
         super().setUpClass()
 
+    @patch(TASKS_PATH + ".STANDINGSSYNC_WARS_UPDATE_BATCH_SIZE", 0)
     @patch(TASKS_PATH + ".update_war")
     @patch(TASKS_PATH + ".EveWar.objects.calc_relevant_war_ids")
     def test_should_start_tasks_for_each_war_id(
@@ -188,6 +428,22 @@ class TestUpdateWars(LoadTestDataMixin, NoSocketsTestCase):
         }
         self.assertSetEqual(result, {1, 2, 3})
 
+    @patch(TASKS_PATH + ".STANDINGSSYNC_WARS_UPDATE_BATCH_SIZE", 2)
+    @patch(TASKS_PATH + ".update_wars")
+    @patch(TASKS_PATH + ".EveWar.objects.calc_relevant_war_ids")
+    def test_should_start_tasks_for_batches_of_war_ids(
+        self, mock_calc_relevant_war_ids, mock_update_wars
+    ):
+        # given
+        mock_calc_relevant_war_ids.return_value = {3, 1, 2}
+        # when
+        tasks.update_all_wars()
+        # then
+        result = [
+            obj[1]["args"][0] for obj in mock_update_wars.apply_async.call_args_list
+        ]
+        self.assertListEqual(result, [[1, 2], [3]])
+
     # @patch(TASKS_PATH + ".update_war")
     # @patch(TASKS_PATH + ".EveWar.objects.calc_relevant_war_ids")
     # def test_should_remove_older_finished_wars(
@@ -210,3 +466,26 @@ class TestUpdateWars(LoadTestDataMixin, NoSocketsTestCase):
         # then
         args, _ = mock_update_from_esi.call_args
         self.assertEqual(args[0], 42)
+
+    @patch(TASKS_PATH + ".EveWar.objects.update_or_create_from_esi_bulk")
+    def test_should_update_batch_of_wars(self, mock_update_from_esi_bulk):
+        # given
+        mock_update_from_esi_bulk.return_value = WarsUpdateResult(
+            created=1, updated=1, failed=1, changed_alliances=2, duration=0.5
+        )
+        # when
+        result = tasks.update_wars([41, 42, 43])
+        # then
+        args, _ = mock_update_from_esi_bulk.call_args
+        self.assertListEqual(args[0], [41, 42, 43])
+        self.assertDictEqual(
+            result,
+            {
+                "created": 1,
+                "updated": 1,
+                "unchanged": 0,
+                "failed": 1,
+                "changed_alliances": 2,
+                "duration": 0.5,
+            },
+        )
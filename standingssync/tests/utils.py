@@ -1,8 +1,12 @@
 """Utility functions and classes for tests"""
 import copy
+import hashlib
+import json
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import FrozenSet, List
+from typing import FrozenSet, List, Optional
+
+from bravado.exception import HTTPNotModified
 
 from eveuniverse.models import EveEntity
 
@@ -11,7 +15,7 @@ from allianceauth.eveonline.models import (
     EveCharacter,
     EveCorporationInfo,
 )
-from app_utils.esi_testing import BravadoOperationStub
+from app_utils.esi_testing import BravadoOperationStub, BravadoResponseStub
 
 
 def create_esi_contact(eve_entity: EveEntity, standing: int = 5.0) -> dict:
@@ -247,6 +251,9 @@ class EsiCharacterContactsStub:
     def __init__(self) -> None:
         self._contacts = dict()
         self._labels = dict()
+        self.write_calls = list()
+        self.read_calls = list()
+        self._categories = dict()
 
     def setup_contacts(self, character_id: int, contacts: List[EsiContact]):
         self._contacts[character_id] = dict()
@@ -273,6 +280,8 @@ class EsiCharacterContactsStub:
 
     def setup_esi_mock(self, mock_esi):
         """Sets the mock for ESI to this object."""
+        # write calls can come from other threads, which must not use the DB
+        self._categories = dict(EveEntity.objects.values_list("id", "category"))
         mock_esi.client.Contacts.get_characters_character_id_contacts.side_effect = (
             self._esi_get_characters_character_id_contacts
         )
@@ -289,17 +298,20 @@ class EsiCharacterContactsStub:
             self._esi_get_characters_character_id_contacts_labels
         )
 
-    def _esi_get_characters_character_id_contacts(self, character_id, token, page=None):
+    def _esi_get_characters_character_id_contacts(
+        self, character_id, token, page=None, _request_options=None
+    ):
         if character_id in self._contacts:
             contacts = [
                 obj.to_esi_dict() for obj in self._contacts[character_id].values()
             ]
         else:
             contacts = []
-        return BravadoOperationStub(contacts)
+        self.read_calls.append(("contacts", _request_options))
+        return self._conditional_operation(contacts, _request_options)
 
     def _esi_get_characters_character_id_contacts_labels(
-        self, character_id, token, page=None
+        self, character_id, token, page=None, _request_options=None
     ):
         if character_id in self._labels:
             labels = [
@@ -308,12 +320,34 @@ class EsiCharacterContactsStub:
             ]
         else:
             labels = []
-        return BravadoOperationStub(labels)
+        self.read_calls.append(("labels", _request_options))
+        return self._conditional_operation(labels, _request_options)
+
+    @staticmethod
+    def _conditional_operation(data: list, request_options: Optional[dict]):
+        """Return operation for data, which supports ETags."""
+        etag = hashlib.md5(
+            json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        headers = {"ETag": etag, "X-Pages": 1}
+        request_headers = (request_options or {}).get("headers", {})
+        if request_headers.get("If-None-Match") == etag:
+            exception = HTTPNotModified(
+                response=BravadoResponseStub(304, headers=headers)
+            )
+
+            class OperationStub(BravadoOperationStub):
+                def results(self, **kwargs):
+                    raise exception
+
+            return OperationStub([])
+        return BravadoOperationStub(data, headers=headers)
 
     def _esi_post_characters_character_id_contacts(
         self, character_id, contact_ids, standing, token, label_ids=None
     ):
         self._check_label_ids_valid(character_id, label_ids)
+        self.write_calls.append(("post", frozenset(contact_ids)))
         contact_type_map = {
             EveEntity.CATEGORY_CHARACTER: EsiContact.ContactType.CHARACTER,
             EveEntity.CATEGORY_CORPORATION: EsiContact.ContactType.CORPORATION,
@@ -322,10 +356,13 @@ class EsiCharacterContactsStub:
         if character_id not in self._contacts:
             self._contacts[character_id] = dict()
         for contact_id in contact_ids:
-            eve_entity = EveEntity.objects.get(id=contact_id)
+            try:
+                category = self._categories[contact_id]
+            except KeyError:
+                category = EveEntity.objects.get(id=contact_id).category
             self._contacts[character_id][contact_id] = EsiContact(
                 contact_id=contact_id,
-                contact_type=contact_type_map[eve_entity.category],
+                contact_type=contact_type_map[category],
                 standing=standing,
                 label_ids=label_ids,
             )
@@ -335,18 +372,19 @@ class EsiCharacterContactsStub:
         self, character_id, contact_ids, standing, token, label_ids=None
     ):
         self._check_label_ids_valid(character_id, label_ids)
+        self.write_calls.append(("put", frozenset(contact_ids)))
         for contact_id in contact_ids:
             self._contacts[character_id][contact_id].standing = standing
             if label_ids:
-                if not self._contacts[character_id][contact_id].label_ids:
-                    self._contacts[character_id][contact_id].label_ids = label_ids
-                else:
-                    self._contacts[character_id][contact_id].label_ids += label_ids
+                self._contacts[character_id][contact_id].label_ids = self._contacts[
+                    character_id
+                ][contact_id].label_ids.union(label_ids)
         return BravadoOperationStub([])
 
     def _esi_delete_characters_character_id_contacts(
         self, character_id, contact_ids, token
     ):
+        self.write_calls.append(("delete", frozenset(contact_ids)))
         for contact_id in contact_ids:
             del self._contacts[character_id][contact_id]
         return BravadoOperationStub([])
@@ -356,3 +394,32 @@ class EsiCharacterContactsStub:
             for label_id in label_ids:
                 if label_id not in self.labels(character_id).keys():
                     raise ValueError(f"Invalid label_id: {label_id}")
+
+
+class EsiEndpointStub:
+    """Simulates an ESI endpoint supporting ETags."""
+
+    def __init__(self, data, etag="abc", headers=None) -> None:
+        self.data = data
+        self.etag = etag
+        self.headers = headers if headers else {}
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        request_headers = kwargs.get("_request_options", {}).get("headers", {})
+        if request_headers.get("If-None-Match") == self.etag:
+            exception = HTTPNotModified(
+                response=BravadoResponseStub(
+                    304, headers={"ETag": self.etag, **self.headers}
+                )
+            )
+
+            class OperationStub(BravadoOperationStub):
+                def results(self, **kwargs):
+                    raise exception
+
+            return OperationStub([])
+        return BravadoOperationStub(
+            self.data, headers={"ETag": self.etag, **self.headers}
+        )
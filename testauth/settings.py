@@ -305,3 +305,7 @@ DEFAULT_FROM_EMAIL = ""
 #######################################
 # Add any custom settings below here. #
 #######################################
+
+# ESI error limit state is kept in memory, because tests must not use sockets
+STANDINGSSYNC_ESI_ERROR_LIMIT_BACKEND = "memory"
+STANDINGSSYNC_ESI_CONDITIONAL_REQUESTS = False